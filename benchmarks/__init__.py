@@ -0,0 +1,9 @@
+"""
+  pyacd benchmarks
+
+  The benchmarks run on synthetic ACD files and QA databases (see
+  benchmarks.corpus), so that they do not need an EMBOSS installation:
+
+      python -m benchmarks.suite --output results.json
+      python -m benchmarks.suite --compare results.json
+"""
@@ -0,0 +1,334 @@
+"""
+  synthetic ACD files and QA databases
+
+  The ACD files use the datatypes, attributes and qualifiers of
+  pyacd/data/datatypes.yml (through pyacd.acd.PARAMETER_CLASSES), with
+  configurable numbers of sections, nesting levels, parameters, attributes
+  and qualifiers. The QA tests of each application use its parameters and
+  qualifiers on their command lines, and are valid for the generated ACD.
+  The generation is deterministic for a given seed.
+
+      python -m benchmarks.corpus --applications 50 --tests 20 corpus/
+"""
+import argparse
+import io
+import os
+import random
+import sys
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+        __file__))))
+
+from pyacd.acd import PARAMETER_CLASSES  # noqa: E402
+from pyacd.cli import CommandLineParser, FLAG_DATATYPES, \
+    AmbiguousOptionParseException, UnknownOptionParseException  # noqa: E402
+from pyacd.fastparser import parse_acd  # noqa: E402
+
+COMMON_DATATYPES = ['sequence', 'seqall', 'seqset', 'seqout', 'seqoutall',
+                    'outfile', 'infile', 'integer', 'integer', 'float',
+                    'boolean', 'boolean', 'toggle', 'string', 'list',
+                    'selection', 'align', 'report', 'array', 'range']
+""" datatypes of most EMBOSS parameters, drawn more often than others """
+
+COMMON_PROBABILITY = 0.8
+""" probability to draw a parameter datatype from COMMON_DATATYPES rather
+than from all the datatypes """
+
+POSITION_ATTRIBUTES = ['parameter', 'standard', 'additional']
+""" attributes which define how a parameter is set on command lines, set
+on each parameter """
+
+RELATIONS = ['EDAM_data:0849 Sequence record', 'EDAM_format:1929 FASTA',
+             'EDAM_data:1384 Sequence alignment (protein)',
+             'EDAM_operation:0292 Sequence alignment',
+             'EDAM_topic:0091 Data handling']
+
+WORDS = ['sequence', 'alignment', 'protein', 'nucleotide', 'window',
+         'score', 'matrix', 'feature', 'report', 'output']
+
+GROUPS = ['Alignment:Global', 'Edit', 'Display', 'Protein:Composition',
+          'Nucleic:Restriction', 'Utils:Database creation']
+
+SECTION_NAMES = ['input', 'required', 'additional', 'advanced', 'output']
+
+
+def _suffix(number):
+    """ letters appended to the names of the parameters of a datatype used
+    more than once: '', 'b', 'c', ..., 'ba', ... """
+    letters = ''
+    while number:
+        number, digit = divmod(number, 26)
+        letters = chr(ord('a') + digit) + letters
+    return letters
+
+
+class CorpusGenerator(object):
+    """
+    Generator of synthetic ACD files and QA databases
+    """
+
+    def __init__(self, sections=3, depth=2, parameters=4, attributes=3,
+                 qualifiers=2, options=4, seed=0):
+        """
+        :param sections: number of top-level sections of each ACD
+        :type sections: int
+        :param depth: nesting levels of sections, each section but the
+        deepest containing one subsection
+        :type depth: int
+        :param parameters: number of parameters of each section
+        :type parameters: int
+        :param attributes: number of optional attributes set on each
+        parameter
+        :type attributes: int
+        :param qualifiers: number of qualifiers set on each parameter
+        :type qualifiers: int
+        :param options: number of options on each QA test command line
+        :type options: int
+        :param seed: seed of the random generator
+        :type seed: int
+        """
+        self.sections = sections
+        self.depth = depth
+        self.parameters = parameters
+        self.attributes = attributes
+        self.qualifiers = qualifiers
+        self.options = options
+        self.random = random.Random(seed)
+        self._datatypes = sorted(PARAMETER_CLASSES)
+
+    def value(self, value_type):
+        """ random value of an attribute or qualifier of a value type """
+        if value_type == 'bool':
+            return self.random.choice(['Y', 'N'])
+        if value_type == 'int':
+            return str(self.random.randint(1, 100))
+        if value_type == 'float':
+            return '{0:.2f}'.format(self.random.uniform(0, 10))
+        if value_type == 'relations':
+            return self.random.choice(RELATIONS)
+        return self.random.choice(WORDS)
+
+    def _datatype(self):
+        if self.random.random() < COMMON_PROBABILITY:
+            return self.random.choice(COMMON_DATATYPES)
+        return self.random.choice(self._datatypes)
+
+    def _sample(self, schema, count, excluded=()):
+        names = sorted(name for name in schema if name not in excluded)
+        return self.random.sample(names, min(count, len(names)))
+
+    def _parameter_lines(self, datatype, name, position, indent):
+        parameter_class = PARAMETER_CLASSES[datatype]
+        lines = ['{0}{1}: {2} ['.format(indent, datatype, name),
+                 '{0}  {1}: "Y"'.format(indent, position),
+                 '{0}  information: "{1} {2}"'.format(
+                     indent, self.random.choice(WORDS).capitalize(),
+                     datatype)]
+        schema = parameter_class.attributes_schema
+        for attribute in self._sample(schema, self.attributes,
+                                      POSITION_ATTRIBUTES + ['information']):
+            lines.append('{0}  {1}: "{2}"'.format(
+                indent, attribute,
+                self.value(schema[attribute]['value_type'])))
+        schema = parameter_class.qualifiers_schema
+        for qualifier in self._sample(schema, self.qualifiers):
+            lines.append('{0}  {1}: "{2}"'.format(
+                indent, qualifier,
+                self.value(schema[qualifier]['value_type'])))
+        lines.append('{0}]'.format(indent))
+        lines.append('')
+        return lines
+
+    def _section_lines(self, name, level, names, indent):
+        lines = ['{0}section: {1} ['.format(indent, name),
+                 '{0}  information: "{1} section"'.format(
+                     indent, name.capitalize()),
+                 '{0}  type: "page"'.format(indent),
+                 '{0}]'.format(indent), '']
+        for _ in range(self.parameters):
+            datatype = self._datatype()
+            count = names.get(datatype, 0)
+            # the first parameters are positional, as in EMBOSS ACD files
+            position = sum(names.values())
+            if position < 2:
+                position = 'parameter'
+            else:
+                position = 'standard' if position % 3 else 'additional'
+            names[datatype] = count + 1
+            lines.extend(self._parameter_lines(
+                datatype, datatype + _suffix(count), position,
+                indent + '  '))
+        if level + 1 < self.depth:
+            lines.extend(self._section_lines(
+                '{0}{1}'.format(name, level + 1), level + 1, names,
+                indent + '  '))
+        lines.append('{0}endsection: {1}'.format(indent, name))
+        lines.append('')
+        return lines
+
+    def acd_string(self, application):
+        """
+        Generate an ACD file
+        :param application: name of the application
+        :type application: basestring
+        :rtype: str
+        """
+        lines = ['application: {0} ['.format(application),
+                 '  documentation: "Synthetic {0} application"'.format(
+                     self.random.choice(WORDS)),
+                 '  groups: "{0}"'.format(self.random.choice(GROUPS)),
+                 '  relations: "{0}"'.format(self.random.choice(RELATIONS)),
+                 ']', '']
+        names = {}
+        for position in range(self.sections):
+            name = SECTION_NAMES[position % len(SECTION_NAMES)]
+            if position >= len(SECTION_NAMES):
+                name += _suffix(position // len(SECTION_NAMES))
+            lines.extend(self._section_lines(name, 0, names, ''))
+        return '\n'.join(lines)
+
+    def _option(self, parser, name, value_type):
+        """ option tokens setting a parameter or qualifier, or None if the
+        name does not resolve to a single parameter or qualifier """
+        if value_type == 'bool' and self.random.random() < 0.5:
+            name = 'no' + name
+        try:
+            resolution = parser.resolve(name)
+        except (AmbiguousOptionParseException, UnknownOptionParseException):
+            return None
+        if resolution.takes_value:
+            return ['-' + name, self.value(value_type)]
+        return ['-' + name]
+
+    def command_line(self, acd_def, parser=None):
+        """
+        Generate a command line of an application
+        :param acd_def: the ACD of the application
+        :type acd_def: pyacd.acd.Acd
+        :param parser: command line parser of the ACD
+        :type parser: pyacd.cli.CommandLineParser
+        :return: the command line tokens
+        :rtype: list
+        """
+        parser = parser or CommandLineParser(acd_def)
+        index = acd_def.get_index()
+        tokens = ['{0}{1}.dat'.format(parameter.name,
+                                      self.random.randint(1, 9))
+                  for parameter in index.positional_parameters]
+        candidates = [(parameter.name, 'bool' if parameter.datatype in
+                       FLAG_DATATYPES else 'str')
+                      for parameter in index.parameters
+                      if parameter not in index.positional_parameters]
+        candidates.extend((name, parameter.qualifiers.schema[name]
+                           ['value_type']) for name, _, _, parameter in
+                          index.qualifier_names)
+        for name, value_type in self.random.sample(
+                candidates, min(self.options, len(candidates))):
+            tokens.extend(self._option(parser, name, value_type) or [])
+        return tokens
+
+    def qa_string(self, acd_def, tests):
+        """
+        Generate the QA tests of an application
+        :param acd_def: the ACD of the application
+        :type acd_def: pyacd.acd.Acd
+        :param tests: number of tests
+        :type tests: int
+        :rtype: str
+        """
+        name = acd_def.application.name
+        parser = CommandLineParser(acd_def)
+        records = []
+        for number in range(1, tests + 1):
+            lines = ['ID {0}-ex{1}'.format(name, number),
+                     'AP {0}'.format(name),
+                     'CL {0}'.format(' '.join(self.command_line(acd_def,
+                                                                 parser)))]
+            if number % 3 == 0:
+                lines.append('IN {0}'.format(self.random.choice(WORDS)))
+            if number % 5 == 0:
+                lines.append('TI 120')
+            lines.extend(['FI stderr', 'FC = 0',
+                          'FI {0}{1}.out'.format(name, number),
+                          'FP /^{0}/'.format(self.random.choice(WORDS)),
+                          'FP 0 /Error: /', '//', ''])
+            records.append('\n'.join(lines))
+        return ''.join(records)
+
+    def generate(self, applications, tests):
+        """
+        Generate ACD files and their QA database
+        :param applications: number of applications
+        :type applications: int
+        :param tests: number of QA tests per application
+        :type tests: int
+        :return: the ACD strings, by application name, and the QA database
+        :rtype: tuple
+        """
+        acd_strings = {}
+        qa_records = []
+        for number in range(applications):
+            name = 'app{0}{1}'.format(self.random.choice(WORDS)[:4], number)
+            acd_strings[name] = self.acd_string(name)
+            qa_records.append(self.qa_string(parse_acd(acd_strings[name]),
+                                             tests))
+        return acd_strings, ''.join(qa_records)
+
+    def write(self, directory, applications, tests):
+        """
+        Write generated ACD files and their QA database to a directory, as
+        in an EMBOSS installation: acd/*.acd and test/qatest.dat
+        :param directory: the directory
+        :type directory: basestring
+        :param applications: number of applications
+        :type applications: int
+        :param tests: number of QA tests per application
+        :type tests: int
+        :return: the path of the QA database
+        :rtype: str
+        """
+        acd_strings, qa_string = self.generate(applications, tests)
+        for subdirectory in ['acd', 'test']:
+            if not os.path.isdir(os.path.join(directory, subdirectory)):
+                os.makedirs(os.path.join(directory, subdirectory))
+        for name, acd_string in acd_strings.items():
+            with io.open(os.path.join(directory, 'acd', name + '.acd'), 'w',
+                         encoding='utf-8') as acd_fh:
+                acd_fh.write(acd_string)
+        qa_path = os.path.join(directory, 'test', 'qatest.dat')
+        with io.open(qa_path, 'w', encoding='utf-8') as qa_fh:
+            qa_fh.write(qa_string)
+        return qa_path
+
+
+def add_arguments(arg_parser):
+    """ add the generator options to an argument parser """
+    for name, default in [('sections', 3), ('depth', 2), ('parameters', 4),
+                          ('attributes', 3), ('qualifiers', 2),
+                          ('options', 4), ('seed', 0)]:
+        arg_parser.add_argument('--' + name, type=int, default=default)
+
+
+def get_generator(args):
+    """ generator configured from parsed arguments (see add_arguments) """
+    return CorpusGenerator(sections=args.sections, depth=args.depth,
+                           parameters=args.parameters,
+                           attributes=args.attributes,
+                           qualifiers=args.qualifiers, options=args.options,
+                           seed=args.seed)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    arg_parser.add_argument('directory')
+    arg_parser.add_argument('--applications', type=int, default=50)
+    arg_parser.add_argument('--tests', type=int, default=20)
+    add_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    print(get_generator(args).write(args.directory, args.applications,
+                                    args.tests))
+
+
+if __name__ == '__main__':
+    main()
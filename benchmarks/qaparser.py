@@ -0,0 +1,71 @@
+"""
+QA parser benchmark: throughput of the pyparsing and fast QA parsing
+engines on a synthetic QA database.
+
+    python benchmarks/qaparser.py [--records N] [--runs N]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from pyacd.qaparser import iter_qa  # noqa: E402
+
+RECORD_TEMPLATE = """ID {app}-{index}
+AP {app}
+CL -sequence tsw:opsd_human -outseq {app}{index}.out
+CL -sbegin {index} -auto
+IN stdout
+FI stderr
+FC = 2
+FP 0 /Warning: /
+FP 0 /Error: /
+FP 0 /Died: /
+FI {app}{index}.out
+FP /^>OPSD_HUMAN/
+FP 1 /^MNGTEGPNFYVPFSNATGVVR/
+//
+"""
+
+APPLICATIONS = ['seqret', 'needle', 'water', 'transeq', 'infoseq']
+
+
+def generate_qa_database(records):
+    """ synthetic QA database with the given number of records """
+    return ''.join(RECORD_TEMPLATE.format(
+        app=APPLICATIONS[index % len(APPLICATIONS)], index=index)
+        for index in range(records))
+
+
+def time_engine(database, engine, runs):
+    """ best time to parse the whole database with an engine """
+    timings = []
+    for _ in range(runs):
+        start = time.time()
+        count = sum(1 for _ in iter_qa(io.StringIO(database), engine=engine))
+        timings.append(time.time() - start)
+    return count, min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    arg_parser.add_argument('--records', type=int, default=5000)
+    arg_parser.add_argument('--runs', type=int, default=3)
+    args = arg_parser.parse_args()
+    database = generate_qa_database(args.records)
+    results = {}
+    for engine in ['pyparsing', 'fast']:
+        count, timing = time_engine(database, engine, args.runs)
+        results[engine] = {'records': count, 'seconds': timing,
+                           'records_per_second': count / timing}
+    json.dump(results, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
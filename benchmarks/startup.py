@@ -0,0 +1,54 @@
+"""
+Startup benchmark: time to load the Parameter classes in a new Python
+process, with the datatypes definitions loaded from the YAML file or from
+their compiled form.
+
+    python benchmarks/startup.py [--runs N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = {
+    'import': 'import pyacd.parser',
+    'yaml': 'from pyacd import acd, datatypes; '
+            'datatypes.load_datatypes = lambda: '
+            'datatypes.load_yaml_datatypes(); '
+            'len(acd.PARAMETER_CLASSES)',
+    'compiled': 'from pyacd import acd; len(acd.PARAMETER_CLASSES)',
+}
+
+
+def time_script(script, runs):
+    """ best wall-clock time of a script run in a new interpreter """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [path for path in [env.get('PYTHONPATH')] if path])
+    timings = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', script], env=env)
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    arg_parser.add_argument('--runs', type=int, default=10)
+    args = arg_parser.parse_args()
+    # make sure the compiled definitions exist before timing them
+    time_script(SCRIPTS['compiled'], 1)
+    results = {name: time_script(script, args.runs)
+               for name, script in SCRIPTS.items()}
+    results['baseline'] = time_script('pass', args.runs)
+    json.dump(results, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
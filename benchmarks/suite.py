@@ -0,0 +1,298 @@
+"""
+Benchmark suite: throughput of ACD and QA parsing, command line translation
+and ACD lookups on a synthetic corpus, with JSON results which can be
+compared between runs.
+
+    python -m benchmarks.suite [--applications N] [--tests N] [--runs N]
+        [--only PATTERN] [--output results.json]
+        [--compare baseline.json [--threshold 0.1]]
+"""
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+        __file__))))
+
+from benchmarks.corpus import add_arguments, get_generator  # noqa: E402
+from pyacd.cli import CommandLineParser, tokenize  # noqa: E402
+from pyacd.codegen import compile_parser  # noqa: E402
+from pyacd.parser import parse_acd  # noqa: E402
+from pyacd.qaparser import iter_qa, iter_qa_records  # noqa: E402
+from pyacd.serialization import acd_from_dict, dumps, loads  # noqa: E402
+
+RESULTS_FORMAT = 1
+""" version of the results layout """
+
+
+class Corpus(object):
+    """
+    Synthetic corpus, and the inputs of the benchmarks derived from it
+    """
+
+    def __init__(self, generator, applications, tests):
+        """
+        :param generator: the corpus generator
+        :type generator: benchmarks.corpus.CorpusGenerator
+        :param applications: number of applications
+        :type applications: int
+        :param tests: number of QA tests per application
+        :type tests: int
+        """
+        self.acd_strings, self.qa_string = generator.generate(applications,
+                                                              tests)
+        self.acds = {name: parse_acd(acd_string, engine='fast')
+                     for name, acd_string in self.acd_strings.items()}
+        self.command_lines = {name: [] for name in self.acds}
+        """ tokenized command lines of the QA tests, by application """
+        for _, application, record in iter_qa_records(
+                io.StringIO(self.qa_string)):
+            command_line = ' '.join(line[3:] for line in record.split('\n')
+                                    if line.startswith('CL '))
+            self.command_lines[application].append(tokenize(command_line))
+        self.lookups = {name: self._lookup_names(acd_def) for name, acd_def
+                        in self.acds.items()}
+        """ parameter names and qualifier names (and their prefixes) looked
+        up in each ACD """
+        self.compiled_parsers = None
+        """ compiled command line parsers, by application, see
+        compile_parsers """
+        self.serialized = None
+        """ compact dictionaries and JSON documents of the ACDs, see
+        serialize """
+
+    @staticmethod
+    def _lookup_names(acd_def):
+        index = acd_def.get_index()
+        names = [parameter.name for parameter in index.parameters]
+        qualifiers = sorted(set(entry[0] for entry in index.qualifier_names))
+        return (names + [name[:3] for name in names],
+                qualifiers + [name[:3] for name in qualifiers])
+
+
+def bench_parse_acd(corpus, engine):
+    for acd_string in corpus.acd_strings.values():
+        parse_acd(acd_string, engine=engine)
+    return len(corpus.acd_strings)
+
+
+def bench_parse_qa(corpus, engine):
+    return sum(1 for _ in iter_qa(io.StringIO(corpus.qa_string),
+                                  engine=engine))
+
+
+def compile_parsers(corpus):
+    """ compile the command line parsers of the corpus, once """
+    if corpus.compiled_parsers is None:
+        corpus.compiled_parsers = {name: compile_parser(acd_def) for
+                                   name, acd_def in corpus.acds.items()}
+
+
+def bench_compile_parser(corpus):
+    for acd_def in corpus.acds.values():
+        compile_parser(acd_def)
+    return len(corpus.acds)
+
+
+def bench_parse_command_lines(corpus, compiled):
+    count = 0
+    for name, command_lines in corpus.command_lines.items():
+        if compiled:
+            parser = corpus.compiled_parsers[name]
+        else:
+            # option resolutions are computed, then cached, by each parser
+            parser = CommandLineParser(corpus.acds[name])
+        for command_line in command_lines:
+            parser.parse(command_line)
+        count += len(command_lines)
+    return count
+
+
+def serialize(corpus):
+    """ serialize the ACDs of the corpus, once """
+    if corpus.serialized is None:
+        corpus.serialized = [(acd_def.to_dict(compact=True),
+                              dumps(acd_def, compact=True))
+                             for acd_def in corpus.acds.values()]
+
+
+def bench_to_dict(corpus, compact):
+    for acd_def in corpus.acds.values():
+        acd_def.to_dict(compact=compact)
+    return len(corpus.acds)
+
+
+def bench_from_dict(corpus):
+    for data, _ in corpus.serialized:
+        acd_from_dict(data)
+    return len(corpus.serialized)
+
+
+def bench_loads(corpus):
+    for _, data in corpus.serialized:
+        loads(data)
+    return len(corpus.serialized)
+
+
+def bench_parameter_by_name(corpus):
+    count = 0
+    for name, acd_def in corpus.acds.items():
+        for parameter_name in corpus.lookups[name][0]:
+            acd_def.parameter_by_name(parameter_name)
+        count += len(corpus.lookups[name][0])
+    return count
+
+
+def bench_parameter_by_qualifier_name(corpus):
+    count = 0
+    for name, acd_def in corpus.acds.items():
+        for qualifier_name in corpus.lookups[name][1]:
+            acd_def.parameter_by_qualifier_name(qualifier_name)
+        count += len(corpus.lookups[name][1])
+    return count
+
+
+def bench_get_index(corpus):
+    for acd_def in corpus.acds.values():
+        acd_def.reindex()
+        acd_def.get_index()
+    return len(corpus.acds)
+
+
+BENCHMARKS = [
+    ('parse_acd.pyparsing', 'acds',
+     lambda corpus: bench_parse_acd(corpus, 'pyparsing'), None),
+    ('parse_acd.fast', 'acds',
+     lambda corpus: bench_parse_acd(corpus, 'fast'), None),
+    ('parse_qa.pyparsing', 'records',
+     lambda corpus: bench_parse_qa(corpus, 'pyparsing'), None),
+    ('parse_qa.fast', 'records',
+     lambda corpus: bench_parse_qa(corpus, 'fast'), None),
+    ('parse_command_lines.generic', 'command_lines',
+     lambda corpus: bench_parse_command_lines(corpus, False), None),
+    ('parse_command_lines.compiled', 'command_lines',
+     lambda corpus: bench_parse_command_lines(corpus, True),
+     compile_parsers),
+    ('codegen.compile_parser', 'acds', bench_compile_parser, None),
+    ('serialization.to_dict.full', 'acds',
+     lambda corpus: bench_to_dict(corpus, False), None),
+    ('serialization.to_dict.compact', 'acds',
+     lambda corpus: bench_to_dict(corpus, True), None),
+    ('serialization.from_dict', 'acds', bench_from_dict, serialize),
+    ('serialization.loads.json', 'acds', bench_loads, serialize),
+    ('acd.parameter_by_name', 'lookups', bench_parameter_by_name, None),
+    ('acd.parameter_by_qualifier_name', 'lookups',
+     bench_parameter_by_qualifier_name, None),
+    ('acd.get_index', 'acds', bench_get_index, None),
+]
+""" (name, unit, function, setup) tuples of the benchmarks, each function
+taking the corpus and returning the number of units processed, after the
+untimed setup function, if any, is called with the corpus """
+
+
+def run_benchmarks(corpus, runs, only=None):
+    """
+    Run the benchmarks
+    :param corpus: the synthetic corpus
+    :type corpus: Corpus
+    :param runs: number of runs of each benchmark, of which the best is kept
+    :type runs: int
+    :param only: fnmatch pattern of the benchmarks to run
+    :type only: basestring
+    :return: the count, unit, best time and throughput of each benchmark,
+    by benchmark name
+    :rtype: dict
+    """
+    results = {}
+    for name, unit, function, setup in BENCHMARKS:
+        if only and not fnmatch.fnmatch(name, only):
+            continue
+        if setup is not None:
+            setup(corpus)
+        timings = []
+        for _ in range(runs):
+            start = time.time()
+            count = function(corpus)
+            timings.append(time.time() - start)
+        seconds = max(min(timings), 1e-9)
+        results[name] = {'count': count, 'unit': unit, 'seconds': seconds,
+                         'per_second': count / seconds}
+    return results
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compare benchmark results to a baseline
+    :param results: the results (see run_benchmarks)
+    :type results: dict
+    :param baseline: the baseline results
+    :type baseline: dict
+    :param threshold: relative throughput loss above which a benchmark is
+    reported as a regression, e.g. 0.1 for 10%
+    :type threshold: float
+    :return: (name, baseline throughput, throughput, relative change,
+    regression) tuples of the benchmarks in both results
+    :rtype: list
+    """
+    comparisons = []
+    for name in sorted(set(results) & set(baseline)):
+        before = baseline[name]['per_second']
+        after = results[name]['per_second']
+        change = after / before - 1
+        comparisons.append((name, before, after, change,
+                            change < -threshold))
+    return comparisons
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    arg_parser.add_argument('--applications', type=int, default=20)
+    arg_parser.add_argument('--tests', type=int, default=20)
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--only', help='fnmatch pattern of the '
+                            'benchmarks to run, e.g. "parse_acd.*"')
+    arg_parser.add_argument('--output', help='JSON results file, defaults '
+                            'to the standard output')
+    arg_parser.add_argument('--compare', help='JSON results of a previous '
+                            'run to compare with')
+    arg_parser.add_argument('--threshold', type=float, default=0.1)
+    add_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    corpus = Corpus(get_generator(args), args.applications, args.tests)
+    config = {name: getattr(args, name) for name in
+              ['applications', 'tests', 'runs', 'sections', 'depth',
+               'parameters', 'attributes', 'qualifiers', 'options', 'seed']}
+    report = {'format': RESULTS_FORMAT, 'python': platform.python_version(),
+              'platform': platform.platform(), 'config': config,
+              'results': run_benchmarks(corpus, args.runs, args.only)}
+    if args.output:
+        with open(args.output, 'w') as output_fh:
+            json.dump(report, output_fh, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    if args.compare:
+        with open(args.compare) as baseline_fh:
+            baseline = json.load(baseline_fh)
+        if baseline.get('config') != config:
+            sys.stderr.write('warning: the baseline was run with a '
+                             'different configuration\n')
+        regressions = 0
+        for name, before, after, change, regression in compare_results(
+                report['results'], baseline['results'], args.threshold):
+            sys.stderr.write('{0:<36} {1:>12.1f} {2:>12.1f} {3:>+8.1%}{4}\n'
+                             .format(name, before, after, change,
+                                     '  REGRESSION' if regression else ''))
+            regressions += regression
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
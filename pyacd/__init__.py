@@ -0,0 +1,4 @@
+def main(argv=None):
+    """ entry point of the pyacd command (see pyacd.commands) """
+    from .commands import main as run
+    return run(argv)
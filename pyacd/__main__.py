@@ -0,0 +1,5 @@
+import sys
+
+from pyacd import main
+
+sys.exit(main())
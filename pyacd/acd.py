@@ -4,388 +4,74 @@ The acd module defines an object model for ACD files contents
 # pylint: disable=too-few-public-methods, missing-docstring
 import sys
 import os
-import copy
+import re
+import threading
+from bisect import bisect_left
+from collections import namedtuple
 
-import ruamel.yaml as yaml
 import six
-
-SEQUENCE_FORMATS = {
-    'abi': {'try': True,
-            'Nuc': True,
-            'Pro': True,
-            'Feat': False,
-            'Gap': True,
-            'Mset': False,
-            'description': 'ABI trace file',
-            'input': True},
-    'acedb': {'try': True,
-              'Nuc': True,
-              'Pro': True,
-              'Feat': False,
-              'Gap': True,
-              'Mset': False,
-              'description': 'ACEDB sequence format',
-              'input': True,
-              'output': True,
-              'Sngl': False,
-              'Save': False},
-    'asn1': {'Nuc': True,
-             'Pro': True,
-             'Feat': False,
-             'Gap': True,
-             'Mset': False,
-             'description': 'NCBI ASN.1 format',
-             'input': True,
-             'output': True,
-             'Sngl': False,
-             'Save': False},
-    'clustal': {'try': True,
-                'Nuc': True,
-                'Pro': True,
-                'Feat': False,
-                'Gap': True,
-                'Mset': False,
-                'description': 'Clustalw output format',
-                'input': True,
-                'output': True,
-                'Sngl': False,
-                'Save': True},
-    'codata': {'try': True,
-               'Nuc': True,
-               'Pro': True,
-               'Feat': True,
-               'Gap': True,
-               'Mset': False,
-               'description': 'CODATA entry format',
-               'input': True,
-               'output': True,
-               'Sngl': False,
-               'Save': False},
-    'das': {'Nuc': True,
-            'Pro': True,
-            'Feat': False,
-            'Gap': True,
-            'Mset': False,
-            'description': 'DASSEQUENCE DAS any sequence',
-            'input': False,
-            'output': True,
-            'Sngl': False,
-            'Save': False},
-    'dasdna': {'Nuc': True,
-               'Pro': False,
-               'Feat': False,
-               'Gap': True,
-               'Mset': False,
-               'description': 'DASDNA DAS nucleotide-only sequence',
-               'input': False,
-               'output': True,
-               'Sngl': False,
-               'Save': False},
-    'dbid': {'try': False,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': False,
-             'Gap': True,
-             'Mset': False,
-             'description':
-             'FASTA format variant with database name before ID'},
-    'embl': {'try': True,
-             'Nuc': True,
-             'Pro': False,
-             'Feat': True,
-             'Gap': True,
-             'Mset': False,
-             'description': 'EMBL entry format'},
-    'experiment': {'try': True,
-                   'Nuc': True,
-                   'Pro': True,
-                   'Feat': False,
-                   'Gap': True,
-                   'Mset': False,
-                   'description': 'Staden experiment file'},
-    'fasta': {'try': True,
-              'Nuc': True,
-              'Pro': True,
-              'Feat': False,
-              'Gap': True,
-              'Mset': False,
-              'description': 'FASTA format including NCBI-style IDs'},
-    'fastq': {'try': True,
-              'Nuc': True,
-              'Pro': False,
-              'Feat': False,
-              'Gap': False,
-              'Mset': False,
-              'description':
-              'Fastq short read format ignoring quality scores'},
-    'fastq-illumina': {'try': False,
-                       'Nuc': True,
-                       'Pro': False,
-                       'Feat': False,
-                       'Gap': False,
-                       'Mset': False,
-                       'description': 'Fastq Illumina 1.3 short read format'},
-    'fastq-sanger': {'try': False,
-                     'Nuc': True,
-                     'Pro': False,
-                     'Feat': False,
-                     'Gap': False,
-                     'Mset': False,
-                     'description':
-                     'Fastq short read format with Phred quality'},
-    'fastq-solexa': {'try': False,
-                     'Nuc': True,
-                     'Pro': False,
-                     'Feat': False,
-                     'Gap': False,
-                     'Mset': False,
-                     'description':
-                     'Fastq Solexa/Illumina 1.0 short read format'},
-    'fitch': {'try': True,
-              'Nuc': True,
-              'Pro': True,
-              'Feat': False,
-              'Gap': True,
-              'Mset': False,
-              'description': 'Fitch program format'},
-    'gcg': {'try': True,
-            'Nuc': True,
-            'Pro': True,
-            'Feat': False,
-            'Gap': True,
-            'Mset': False,
-            'description': 'GCG sequence format'},
-    'genbank': {'try': True,
-                'Nuc': True,
-                'Pro': False,
-                'Feat': True,
-                'Gap': True,
-                'Mset': False,
-                'description': 'Genbank entry format'},
-    'genpept': {'try': False,
-                'Nuc': False,
-                'Pro': True,
-                'Feat': True,
-                'Gap': True,
-                'Mset': False,
-                'description': 'Refseq protein entry format (alias)'},
-    'gff2': {'try': True,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': True,
-             'Gap': True,
-             'Mset': False,
-             'description': 'GFF feature file with sequence in the header'},
-    'gff3': {'try': True,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': True,
-             'Gap': True,
-             'Mset': False,
-             'description': 'GFF3 feature file with sequence'},
-    'gifasta': {'try': False,
-                'Nuc': True,
-                'Pro': True,
-                'Feat': False,
-                'Gap': True,
-                'Mset': False,
-                'description':
-                'FASTA format including NCBI-style GIs (alias)'},
-    'hennig86': {'try': True,
-                 'Nuc': True,
-                 'Pro': True,
-                 'Feat': False,
-                 'Gap': True,
-                 'Mset': False,
-                 'description': 'Hennig86 output format'},
-    'ig': {'try': False,
-           'Nuc': True,
-           'Pro': True,
-           'Feat': False,
-           'Gap': True,
-           'Mset': False,
-           'description': 'Intelligenetics sequence format'},
-    'igstrict': {'try': True,
-                 'Nuc': True,
-                 'Pro': True,
-                 'Feat': False,
-                 'Gap': True,
-                 'Mset': False,
-                 'description':
-                 'Intelligenetics sequence format strict parser'},
-    'jackkniffer': {'try': True,
-                    'Nuc': True,
-                    'Pro': True,
-                    'Feat': False,
-                    'Gap': True,
-                    'Mset': False,
-                    'description':
-                    'Jackknifer interleaved and non-interleaved formats'},
-    'mase': {'try': False,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': False,
-             'Gap': True,
-             'Mset': False,
-             'description': 'MASE program format'},
-    'mega': {'try': True,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': False,
-             'Gap': True,
-             'Mset': False,
-             'description': 'MEGA interleaved and non-interleaved formats'},
-    'msf': {'try': True,
-            'Nuc': True,
-            'Pro': True,
-            'Feat': False,
-            'Gap': True,
-            'Mset': False,
-            'description': 'GCG MSF (multiple sequence file) file format'},
-    'nbrf': {'try': True,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': True,
-             'Gap': True,
-             'Mset': False,
-             'description': 'NBRF/PIR entry format'},
-    'nexus': {'try': True,
-              'Nuc': True,
-              'Pro': True,
-              'Feat': False,
-              'Gap': True,
-              'Mset': False,
-              'description': 'NEXUS/PAUP interleaved format'},
-    'pdb': {'try': True,
-            'Nuc': False,
-            'Pro': True,
-            'Feat': False,
-            'Gap': False,
-            'Mset': False,
-            'description': 'PDB protein databank format ATOM lines'},
-    'pdbnuc': {'try': False,
-               'Nuc': True,
-               'Pro': False,
-               'Feat': False,
-               'Gap': False,
-               'Mset': False,
-               'description':
-               'PDB protein databank format nucleotide ATOM lines'},
-    'pdbnucseq': {'try': False,
-                  'Nuc': True,
-                  'Pro': False,
-                  'Feat': False,
-                  'Gap': False,
-                  'Mset': False,
-                  'description':
-                  'PDB protein databank format nucleotide SEQRES lines'},
-    'pdbseq': {'try': True,
-               'Nuc': False,
-               'Pro': True,
-               'Feat': False,
-               'Gap': False,
-               'Mset': False,
-               'description': 'PDB protein databank format SEQRES lines'},
-    'pearson': {'try': True,
-                'Nuc': True,
-                'Pro': True,
-                'Feat': False,
-                'Gap': True,
-                'Mset': False,
-                'description':
-                'Plain old FASTA format with IDs not parsed further'},
-    'phylip': {'try': True,
-               'Nuc': True,
-               'Pro': True,
-               'Feat': False,
-               'Gap': True,
-               'Mset': True,
-               'description':
-               'PHYLIP interleaved and non-interleaved formats'},
-    'phylipnon': {'try': False,
-                  'Nuc': True,
-                  'Pro': True,
-                  'Feat': False,
-                  'Gap': True,
-                  'Mset': True,
-                  'description': 'PHYLIP non-interleaved format'},
-    'raw': {'try': True,
-            'Nuc': True,
-            'Pro': True,
-            'Feat': False,
-            'Gap': False,
-            'Mset': False,
-            'description': 'Raw sequence with no non-sequence characters'},
-    'refseqp': {'try': False,
-                'Nuc': False,
-                'Pro': True,
-                'Feat': True,
-                'Gap': True,
-                'Mset': False,
-                'description': 'RefseqP entry format'},
-    'selex': {'try': False,
-              'Nuc': True,
-              'Pro': True,
-              'Feat': False,
-              'Gap': True,
-              'Mset': False,
-              'description': 'SELEX format'},
-    'staden': {'try': False,
-               'Nuc': True,
-               'Pro': True,
-               'Feat': False,
-               'Gap': True,
-               'Mset': True,
-               'description': 'Old Staden package sequence format'},
-    'stockholm': {'try': True,
-                  'Nuc': True,
-                  'Pro': True,
-                  'Feat': False,
-                  'Gap': True,
-                  'Mset': False,
-                  'description': 'Stockholm (pfam) format'},
-    'strider': {'try': True,
-                'Nuc': True,
-                'Pro': True,
-                'Feat': False,
-                'Gap': True,
-                'Mset': False,
-                'description': 'DNA Strider output format'},
-    'swiss': {'try': True,
-              'Nuc': False,
-              'Pro': True,
-              'Feat': True,
-              'Gap': True,
-              'Mset': False,
-              'description': 'SwissProt entry format'},
-    'text': {'try': False,
-             'Nuc': True,
-             'Pro': True,
-             'Feat': False,
-             'Gap': True,
-             'Mset': False,
-             'description': 'Plain text'},
-    'treecon': {'try': True,
-                'Nuc': True,
-                'Pro': True,
-                'Feat': False,
-                'Gap': True,
-                'Mset': False,
-                'description': 'Treecon output format'},
-}
+from six.moves import intern
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
 
 _ROOT = os.path.abspath(os.path.dirname(__file__))
 
 def get_data_path(path):
     return os.path.join(_ROOT, 'data', path)
 
+def get_cache_dir():
+    """ pyacd cache directory, following the XDG base directory spec """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'pyacd')
+
 class Acd(object):
     """
     ACD description
     """
+    __slots__ = ('application', 'sections', '_index', '_expressions')
+
     def __init__(self, application=None, sections=None):
         self.application = application
-        self.sections = sections or []
+        self.sections = list(sections or [])
+        self._index = None
+        self._expressions = None
+
+    def __getstate__(self):
+        # the lookup index and the expression graph are rebuilt on demand
+        # rather than serialized
+        return {'application': self.application, 'sections': self.sections}
+
+    def __setstate__(self, state):
+        self.application = state['application']
+        self.sections = state['sections']
+        self._index = None
+        self._expressions = None
+
+    def to_dict(self, compact=False):
+        """
+        Convert the ACD into a dictionary of JSON-compatible values (see
+        pyacd.serialization)
+        :param compact: write only the attributes and qualifiers set in the
+        ACD file, rather than the values of the whole schemas
+        :type compact: bool
+        :rtype: dict
+        """
+        from .serialization import acd_to_dict
+        return acd_to_dict(self, compact)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build an ACD from its dictionary (see to_dict)
+        :param data: the dictionary, compact or not
+        :type data: dict
+        :rtype: Acd
+        """
+        from .serialization import acd_from_dict
+        return acd_from_dict(data, cls)
 
     def desc_parameters(self):
         parameters = []
@@ -407,33 +93,110 @@ class Acd(object):
                 section.parameters for qualifier in
                 parameter.qualifiers.keys()]
 
+    def get_index(self):
+        """
+        Get the lookup index of the parameters, building it on first access
+        :rtype: AcdIndex
+        """
+        if self._index is None:
+            self._index = AcdIndex(self)
+        return self._index
+
+    def get_expression_graph(self):
+        """
+        Get the compiled computed values of the ACD, sorted by dependencies,
+        building them on first access
+        :rtype: pyacd.expressions.ExpressionGraph
+        """
+        if self._expressions is None:
+            from .expressions import ExpressionGraph
+            self._expressions = ExpressionGraph(self)
+        return self._expressions
+
+    def reindex(self):
+        """
+        Discard the lookup index of the parameters and the expression
+        graph, which must be done whenever the sections, parameters or
+        attributes are modified after a lookup
+        """
+        self._index = None
+        self._expressions = None
+
     def parameter_by_name(self, name):
-        partial_matches = []
-        for parameter in self.desc_parameters():
-            if parameter.name==name:
-                return parameter
-            elif parameter.name.startswith(name):
-                partial_matches.append(parameter)
+        index = self.get_index()
+        parameter = index.parameters_by_name.get(name)
+        if parameter is not None:
+            return parameter
+        partial_matches = index.prefix_matches(index.parameter_names, name)
         if len(partial_matches)>0:
-            return max(partial_matches,key=lambda parameter: len(
-                parameter.name))
+            # longest parameter name, the first one in case of a tie
+            return min(partial_matches, key=lambda match: (-len(match[0]),
+                                                           match[1]))[2]
         return None
 
     def parameter_by_index(self, index):
-        return [parameter for parameter in self.desc_parameters() if
-                parameter.attributes['parameter']['default_value']==True][index]
+        return self.get_index().positional_parameters[index]
 
     def parameter_by_qualifier_name(self, name):
-        results = []
-        for parameter in self.desc_parameters():
-            for qualifier_name in parameter.qualifiers.keys():
-                if name==qualifier_name:
-                    results.append((parameter, qualifier_name,
-                                    parameter.qualifiers[qualifier_name]))
-                elif qualifier_name.startswith(name):
-                    results.append((parameter, qualifier_name,
-                                    parameter.qualifiers[qualifier_name]))
-        return results
+        index = self.get_index()
+        return [(parameter, qualifier_name,
+                 parameter.qualifiers[qualifier_name])
+                for qualifier_name, _, _, parameter in
+                sorted(index.prefix_matches(index.qualifier_names, name),
+                       key=lambda match: (match[1], match[2]))]
+
+class AcdIndex(object):
+    """
+    Lookup index of the parameters of an ACD, built once so that looking
+    up a parameter does not scan all of them
+    """
+    __slots__ = ('parameters', 'positional_parameters', 'parameters_by_name',
+                 'parameter_names', 'qualifier_names')
+
+    def __init__(self, acd_object):
+        """
+        :param acd_object: the indexed ACD
+        :type acd_object: Acd
+        """
+        self.parameters = acd_object.desc_parameters()
+        """ parameters, in description order """
+        self.positional_parameters = [
+            parameter for parameter in self.parameters
+            if parameter.attributes.get_value('parameter')==True]
+        """ parameters which can be set by position on the command line """
+        self.parameters_by_name = {}
+        """ parameters by exact name """
+        for parameter in reversed(self.parameters):
+            self.parameters_by_name[parameter.name] = parameter
+        self.parameter_names = sorted(
+            (parameter.name, position, parameter)
+            for position, parameter in enumerate(self.parameters))
+        """ (name, position, parameter) tuples, sorted for prefix
+        lookups """
+        self.qualifier_names = sorted(
+            (qualifier_name, position, qualifier_position, parameter)
+            for position, parameter in enumerate(self.parameters)
+            for qualifier_position, qualifier_name in
+            enumerate(parameter.qualifiers.keys()))
+        """ (qualifier name, parameter position, qualifier position,
+        parameter) tuples, sorted for prefix lookups """
+
+    @staticmethod
+    def prefix_matches(names, prefix):
+        """
+        Get the entries of a sorted names index whose name starts with a
+        prefix
+        :param names: sorted tuples, whose first item is a name
+        :type names: list
+        :param prefix: prefix to look up
+        :type prefix: basestring
+        """
+        matches = []
+        for position in range(bisect_left(names, (prefix,)), len(names)):
+            if not names[position][0].startswith(prefix):
+                break
+            matches.append(names[position])
+        return matches
 
 class UnknownAcdPropertyException(Exception):
     """
@@ -468,32 +231,196 @@ class InvalidAcdPropertyValue(Exception):
         return template.format(self.attribute_name, self.attribute_value,
                                self.parameter_name)
 
-def set_att_def_value(attribute, value, att_name, el_name):
+def get_att_value(value_type, current_value, value, att_name, el_name):
+    """
+    Compute the new value of an attribute from its string value in the ACD
+    :param value_type: value type of the attribute (list, relations, bool,
+    float, int or str)
+    :type value_type: basestring
+    :param current_value: current value of the attribute
+    :param value: string value to set
+    :type value: basestring
+    :param att_name: name of the attribute
+    :type att_name: basestring
+    :param el_name: name of the element the attribute belongs to
+    :type el_name: basestring
+    """
     if value.startswith('$') or value.startswith('@'):
         # computed attribute values
-        attribute['default_value'] = value
-    elif attribute['value_type']=='list':
-        attribute['default_value'].append(value)
-    elif attribute['value_type']=='bool':
+        return value
+    elif value_type=='list':
+        return current_value + [value]
+    elif value_type=='relations':
+        return current_value + [Relation.parse(value)]
+    elif value_type=='bool':
         if value in ['yes', 'Y', 'y', 'true']:
-            attribute['default_value'] = True
+            return True
         elif value in ['no', 'N', 'n', 'false']:
-            attribute['default_value'] = False
+            return False
         else:
             raise InvalidAcdPropertyValue(att_name, value, el_name)
-    elif attribute['value_type']=='float':
-        attribute['default_value'] = float(value)
-    elif attribute['value_type']=='int':
-        attribute['default_value'] = int(value)
-    elif attribute['value_type']=='str':
-        attribute['default_value'] = str(value)
-    elif attribute['value_type']=='str':
-        attribute['default_value'] = str(value)
+    elif value_type=='float':
+        return float(value)
+    elif value_type=='int':
+        return int(value)
+    elif value_type=='str':
+        return str(value)
+    return current_value
+
+class Relation(namedtuple('Relation', ['namespace', 'id', 'label'])):
+    """
+    Relation of an ACD element to an ontology term, e.g.
+    "EDAM_operation:1813 Sequence retrieval" is parsed into the
+    ('EDAM_operation', '1813', 'Sequence retrieval') tuple
+    """
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Parse the value of a relations attribute
+        :param value: the value, e.g. "EDAM_data:0849 Sequence record"
+        :type value: basestring
+        :return: the relation, with no namespace nor id if the value does
+        not start with a term
+        :rtype: Relation
+        """
+        match = _RELATION.match(value)
+        if match is None:
+            return cls(None, None, value.strip())
+        return cls(intern(str(match.group(1))), intern(str(match.group(2))),
+                   match.group(3))
+
+    @property
+    def term(self):
+        """ term identifier, e.g. 'EDAM_data:0849' """
+        if self.namespace is None:
+            return None
+        return '{0}:{1}'.format(self.namespace, self.id)
+
+    def __str__(self):
+        if self.namespace is None:
+            return self.label
+        return '{0} {1}'.format(self.term, self.label).rstrip()
+
+_RELATION = re.compile(r'\s*([A-Za-z][\w.-]*):(\S+)\s*(.*?)\s*$')
 
+
+class AttributeValues(MutableMapping):
+    """
+    Attributes (or qualifiers) of an ACD element
+
+    Only the values of the attributes which are explicitly set are stored
+    for each element, the attribute definitions (default value, value type
+    and description) are read from the attributes schema of the element
+    class, which is shared by all its instances. The definitions returned
+    when accessing an attribute are therefore copies: changing them, e.g.
+    attributes[name]['default_value'] = value, does not change the element.
+    Values are set with set_value(), or by assigning a whole definition,
+    e.g. attributes[name] = definition.
+    """
+    __slots__ = ('schema', 'values')
+
+    def __init__(self, schema):
+        """
+        :param schema: attribute definitions of the element class
+        :type schema: dict
+        """
+        self.schema = schema
+        self.values = {}
+
+    def __getitem__(self, name):
+        attribute = dict(self.schema[name])
+        if name in self.values:
+            attribute['default_value'] = self.values[name]
+        elif isinstance(attribute['default_value'], list):
+            # list defaults are shared by all the instances too
+            attribute['default_value'] = list(attribute['default_value'])
+        return attribute
+
+    def __setitem__(self, name, attribute):
+        if name not in self.schema:
+            self.schema = dict(self.schema)
+            self.schema[name] = attribute
+        self.values[name] = attribute['default_value']
+
+    def __delitem__(self, name):
+        if name not in self.schema:
+            raise KeyError(name)
+        self.schema = dict(self.schema)
+        del self.schema[name]
+        self.values.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self.schema
+
+    def __iter__(self):
+        return iter(self.schema)
+
+    def __len__(self):
+        return len(self.schema)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, dict(self))
+
+    def is_set(self, name):
+        """ check whether the value of an attribute has been set """
+        return name in self.values
+
+    def get_value(self, name):
+        """
+        Get the value of an attribute, without building its definition
+        :param name: name of the attribute
+        :type name: basestring
+        """
+        try:
+            return self.values[name]
+        except KeyError:
+            return self.schema[name]['default_value']
+
+    def set_value(self, name, value, el_name):
+        """
+        Set the value of an attribute from its string value in the ACD
+        :param name: name of the attribute
+        :type name: basestring
+        :param value: string value to set
+        :type value: basestring
+        :param el_name: name of the element the attribute belongs to
+        :type el_name: basestring
+        """
+        value = get_att_value(self.schema[name]['value_type'],
+                              self.get_value(name), value, name, el_name)
+        self.values[intern(name)] = value
+
+class ElementClass(type):
+    """
+    Metaclass of the ACD elements, which provides the attributes and
+    qualifiers schemas of an element class under their former names, e.g.
+    SeqallParameter.attributes, while the attributes and qualifiers of the
+    instances are their AttributeValues
+    """
+
+    @property
+    def attributes(cls):
+        return cls.attributes_schema
+
+    @property
+    def qualifiers(cls):
+        return cls.qualifiers_schema
+
+@six.add_metaclass(ElementClass)
 class ElementWithAttributes(object):
     """
     Abstract class to structure an ACD element that has some attributes
     """
+    __slots__ = ()
+
+    attributes_schema = {}
+    """ attributes schema of the element class """
+
+    qualifiers_schema = {}
+    """ qualifiers schema of the element class """
+
     def set_attributes(self, attributes):
         """
         Set the values for the attributes of the element, based on
@@ -505,18 +432,18 @@ class ElementWithAttributes(object):
         # pylint: disable=no-member
         for attribute in attributes:
             if attribute.name in self.attributes:
-                set_att_def_value(self.attributes[attribute.name], attribute.value, attribute.name, self.name)
                 try:
-                    set_att_def_value(self.attributes[attribute.name], attribute.value, attribute.name, self.name)
+                    self.attributes.set_value(attribute.name,
+                                              attribute.value, self.name)
                 except TypeError as terr:
                     six.print_("Error while trying to set value of attribute {0} to {1} in " \
                           "parameter {2}" \
                           "".format(attribute.name, attribute.value, self.name))
                     raise terr
             elif attribute.name in self.qualifiers:
-                set_att_def_value(self.qualifiers[attribute.name], attribute.value, attribute.name, self.name)
                 try:
-                    set_att_def_value(self.qualifiers[attribute.name], attribute.value, attribute.name, self.name)
+                    self.qualifiers.set_value(attribute.name,
+                                              attribute.value, self.name)
                 except TypeError as terr:
                     six.print_("Error while trying to set value of qualifier {0} to " \
                                "{1} in parameter {2}".format(attribute.name,
@@ -532,6 +459,26 @@ class Application(ElementWithAttributes):
     """
     ACD Application block
     """
+    __slots__ = ('name', 'attributes', 'qualifiers')
+
+    attributes_schema = {'documentation': {'default_value': '', 'value_type': 'str', 'description': 'Short description of the application function'},
+                         'relations': {'default_value': [], 'value_type': 'relations', 'description': 'Relationships between the application and ontology terms'},
+                         'groups': {'default_value': '', 'value_type': 'str', 'description': 'Standard application group(s) for wossname and GUIs'},
+                         'keywords': {'default_value': '', 'value_type': 'str', 'description': 'Set of keywords describing the application functionality'},
+                         'gui': {'default_value': '', 'value_type': 'str', 'description': 'Suitability for launching in a GUI'},
+                         'batch': {'default_value': '', 'value_type': 'str', 'description': 'Suitability for launching in a GUI'},
+                         'embassy': {'default_value': '', 'value_type': 'str', 'description': 'EMBASSY package name'},
+                         'external': {'default_value': '', 'value_type': 'str', 'description': 'Third party tool(s) required by this program'},
+                         'cpu': {'default_value': '', 'value_type': 'str', 'description': 'Estimated maximum CPU usage'},
+                         'supplier': {'default_value': '', 'value_type': 'str', 'description': 'Supplier name'},
+                         'version': {'default_value': '', 'value_type': 'str', 'description': 'Version number'},
+                         'nonemboss': {'default_value': '', 'value_type': 'str', 'description': 'Non-emboss application name for SoapLab'},
+                         'executable': {'default_value': '', 'value_type': 'str', 'description': 'Non-emboss executable for SoapLab'},
+                         'template': {'default_value': '', 'value_type': 'str', 'description': 'Commandline template for SoapLab\'s ACD files'},
+                         'comment': {'default_value': '', 'value_type': 'str', 'description': 'Comment for SoapLab\'s ACD files'},
+                         'obsolete': {'default_value': '', 'value_type': 'str', 'description': ''}}
+    """ attributes schema of the Application block """
+
     def __init__(self, name, attributes=None):
         """
         :param name: name of the application
@@ -540,26 +487,14 @@ class Application(ElementWithAttributes):
         :type attributes: dict
         """
         self.name = name
-        self.attributes = {'documentation': {'default_value': '', 'value_type': 'str', 'description': 'Short description of the application function'},
-                           'relations': {'default_value': [], 'value_type': 'list', 'description': ''},
-                           'groups': {'default_value': '', 'value_type': 'str', 'description': 'Standard application group(s) for wossname and GUIs'},
-                           'keywords': {'default_value': '', 'value_type': 'str', 'description': 'Set of keywords describing the application functionality'},
-                           'gui': {'default_value': '', 'value_type': 'str', 'description': 'Suitability for launching in a GUI'},
-                           'batch': {'default_value': '', 'value_type': 'str', 'description': 'Suitability for launching in a GUI'},
-                           'embassy': {'default_value': '', 'value_type': 'str', 'description': 'EMBASSY package name'},
-                           'external': {'default_value': '', 'value_type': 'str', 'description': 'Third party tool(s) required by this program'},
-                           'cpu': {'default_value': '', 'value_type': 'str', 'description': 'Estimated maximum CPU usage'},
-                           'supplier': {'default_value': '', 'value_type': 'str', 'description': 'Supplier name'},
-                           'version': {'default_value': '', 'value_type': 'str', 'description': 'Version number'},
-                           'nonemboss': {'default_value': '', 'value_type': 'str', 'description': 'Non-emboss application name for SoapLab'},
-                           'executable': {'default_value': '', 'value_type': 'str', 'description': 'Non-emboss executable for SoapLab'},
-                           'template': {'default_value': '', 'value_type': 'str', 'description': 'Commandline template for SoapLab\'s ACD files'},
-                           'comment': {'default_value': '', 'value_type': 'str', 'description': 'Comment for SoapLab\'s ACD files'},
-                           'obsolete': {'default_value': '', 'value_type': 'str', 'description': ''}}
+        self.attributes = AttributeValues(self.__class__.attributes_schema)
+        self.qualifiers = AttributeValues(self.__class__.qualifiers_schema)
         if attributes is not None:
             self.set_attributes(attributes)
 
 class Variable(object):
+    __slots__ = ('name', 'expression')
+
     def __init__(self, name, expression):
         self.name = name
         self.expression = expression
@@ -568,6 +503,9 @@ class Section(ElementWithAttributes):
     """
     ACD parameters section block
     """
+    __slots__ = ('name', 'properties', 'parameters', 'subsections',
+                 'variables')
+
     def __init__(self, name, properties=None, children=None):
         """
         :param name: name of the section
@@ -578,7 +516,7 @@ class Section(ElementWithAttributes):
         :type parameters: list
         """
         self.name = name
-        self.properties = properties or []
+        self.properties = list(properties or [])
         children = children or []
         self.parameters = []
         self.subsections = []
@@ -619,6 +557,8 @@ class Parameter(ElementWithAttributes):
     """
     ACD Parameter block
     """
+    __slots__ = ('name', 'datatype', 'attributes', 'qualifiers')
+
     type = INPUT
     """ type of the parameter, input or output """
 
@@ -633,64 +573,127 @@ class Parameter(ElementWithAttributes):
         :type attributes: dict
         """
         self.name = name
-        self.datatype = datatype
-        self.attributes = copy.deepcopy(self.__class__.attributes)
+        self.datatype = intern(datatype)
+        self.attributes = AttributeValues(self.__class__.attributes_schema)
+        self.qualifiers = AttributeValues(self.__class__.qualifiers_schema)
         self.set_attributes(attributes)
 
-    attributes = {'information': {'default_value': '', 'value_type': 'str', 'description': 'Information for menus etc., and default prompt'},
-                  'prompt': {'default_value': '', 'value_type': 'str', 'description': 'Prompt (if information string is unclear)'},
-                  'code': {'default_value': '', 'value_type': 'str', 'description': 'Code name for information/prompt to be looked up in standard table'},
-                  'help': {'default_value': '', 'value_type': 'str', 'description': 'Text for help documentation'},
-                  'parameter': {'default_value': False, 'value_type': 'bool', 
-                                'description': 'Command line parameter. Can be on the command line with no qualifier name. Implies \'standard\' qualifier'},
-                  'standard': {'default_value': False, 'value_type': 'bool', 
-                                'description': 'Standard qualifier, value required. Interactive prompt if missing'},
-                  'additional': {'default_value': False, 'value_type': 'bool', 
-                                'description': 'Additional qualifier. Value required if -options is on the command line, or set by default'},
-                  'missing': {'default_value': False, 'value_type': 'bool', 
-                                'description': 'Allow with no value on the command line to set to \'\''},
-                  'valid': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Help: String description of allowed values for -help output, used if the default help is nuclear'},
-                  'expected': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Help: String description of the expected value for -help output, used if the default help is nuclear'},
-                  'needed': {'default_value': True, 'value_type': 'bool', 
-                                'description': 'Include in GUI form, used to hide options if they are unclear in GUIs'},
-                  'knowntype': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Known standard type, used to define input and output types for workflows'},
-                  'relations': {'default_value': [], 'value_type': 'str', 
-                                'description': 'Relationships between this ACD item and others, defined as specially formatted text'},
-                  'outputmodifier': {'default_value': False, 'value_type': 'bool', 
-                                'description': 'Modifies the output in ways that can break parsers'},
-                  'style': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Style for SoapLab\'s ACD files'},
-                  'qualifier': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Qualifier name for SoapLab\'s ACD files'},
-                  'template': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Commandline template for SoapLab\'s ACD files'},
-                  'comment': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Comment for SoapLab\'s ACD files'},
-                  'default': {'default_value': '', 'value_type': 'str', 
-                                'description': 'Default value'},
+    attributes_schema = {'information': {'default_value': '', 'value_type': 'str', 'description': 'Information for menus etc., and default prompt'},
+                         'prompt': {'default_value': '', 'value_type': 'str', 'description': 'Prompt (if information string is unclear)'},
+                         'code': {'default_value': '', 'value_type': 'str', 'description': 'Code name for information/prompt to be looked up in standard table'},
+                         'help': {'default_value': '', 'value_type': 'str', 'description': 'Text for help documentation'},
+                         'parameter': {'default_value': False, 'value_type': 'bool', 
+                                       'description': 'Command line parameter. Can be on the command line with no qualifier name. Implies \'standard\' qualifier'},
+                         'standard': {'default_value': False, 'value_type': 'bool', 
+                                       'description': 'Standard qualifier, value required. Interactive prompt if missing'},
+                         'additional': {'default_value': False, 'value_type': 'bool', 
+                                       'description': 'Additional qualifier. Value required if -options is on the command line, or set by default'},
+                         'missing': {'default_value': False, 'value_type': 'bool', 
+                                       'description': 'Allow with no value on the command line to set to \'\''},
+                         'valid': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Help: String description of allowed values for -help output, used if the default help is nuclear'},
+                         'expected': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Help: String description of the expected value for -help output, used if the default help is nuclear'},
+                         'needed': {'default_value': True, 'value_type': 'bool', 
+                                       'description': 'Include in GUI form, used to hide options if they are unclear in GUIs'},
+                         'knowntype': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Known standard type, used to define input and output types for workflows'},
+                         'relations': {'default_value': [], 'value_type': 'relations', 
+                                       'description': 'Relationships between this ACD item and others, defined as specially formatted text'},
+                         'outputmodifier': {'default_value': False, 'value_type': 'bool', 
+                                       'description': 'Modifies the output in ways that can break parsers'},
+                         'style': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Style for SoapLab\'s ACD files'},
+                         'qualifier': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Qualifier name for SoapLab\'s ACD files'},
+                         'template': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Commandline template for SoapLab\'s ACD files'},
+                         'comment': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Comment for SoapLab\'s ACD files'},
+                         'default': {'default_value': '', 'value_type': 'str', 
+                                       'description': 'Default value'},
                 }
 
-    qualifiers = {}
-
-PARAMETER_CLASSES = {}
-
-with open(get_data_path('datatypes.yml'), 'r') as datatypes_fh:
-    datatypes = yaml.safe_load(datatypes_fh)
-    for datatype, definition in datatypes.items():
-        bases = (Parameter,)
-        attributes = copy.deepcopy(Parameter.attributes)
-        attributes.update({key: value for key, value in definition.get('attributes',{}).items()})
-        qualifiers = copy.deepcopy(Parameter.qualifiers)
-        qualifiers.update({key: value for key, value in definition.get('qualifiers',{}).items()})
-        properties = {'description': definition.get('description'),
-                      'attributes': attributes, 'qualifiers': qualifiers}
-        new_class = type(datatype.capitalize()+'Parameter',
-                                           bases, properties)
-        PARAMETER_CLASSES[datatype] = new_class
-        globals()[new_class.__name__] = new_class
+    qualifiers_schema = {}
+
+class ParameterClasses(Mapping):
+    """
+    Registry of the Parameter classes of each datatype
+
+    The classes are built from the datatypes definitions on first access to
+    the registry, and are then also available as attributes of this module
+    (e.g. pyacd.acd.SeqallParameter).
+    """
+    def __init__(self):
+        self._classes = None
+        self._lock = threading.Lock()
+
+    def _get_classes(self):
+        if self._classes is not None:
+            return self._classes
+        # the classes must be built once, even on concurrent first accesses,
+        # for isinstance checks and pickling
+        with self._lock:
+            if self._classes is None:
+                self._build_classes()
+        return self._classes
+
+    def _build_classes(self):
+        from .datatypes import load_datatypes
+        classes = {}
+        for datatype, definition in load_datatypes().items():
+            bases = (Parameter,)
+            # attribute definitions are shared between the parameter
+            # classes
+            attributes = dict(Parameter.attributes_schema)
+            attributes.update({key: value for key, value in definition.get('attributes',{}).items()})
+            qualifiers = dict(Parameter.qualifiers_schema)
+            qualifiers.update({key: value for key, value in definition.get('qualifiers',{}).items()})
+            properties = {'description': definition.get('description'),
+                          'type': OUTPUT if definition.get('type') ==
+                          'OUTPUT' else INPUT,
+                          'attributes_schema': attributes,
+                          'qualifiers_schema': qualifiers,
+                          '__slots__': ()}
+            new_class = type(datatype.capitalize()+'Parameter',
+                             bases, properties)
+            classes[datatype] = new_class
+            globals()[new_class.__name__] = new_class
+        self._classes = classes
+
+    def __getitem__(self, datatype):
+        return self._get_classes()[datatype]
+
+    def __contains__(self, datatype):
+        return datatype in self._get_classes()
+
+    def __iter__(self):
+        return iter(self._get_classes())
+
+    def __len__(self):
+        return len(self._get_classes())
+
+PARAMETER_CLASSES = ParameterClasses()
+""" Parameter classes, by datatype name """
+
+def __getattr__(name):
+    """
+    Lazily provide the Parameter classes and the sequence formats
+    """
+    if name == 'SEQUENCE_FORMATS':
+        from .sequence_formats import SEQUENCE_FORMATS
+        return SEQUENCE_FORMATS
+    if name.endswith('Parameter'):
+        PARAMETER_CLASSES._get_classes()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+        __name__, name))
+
+if sys.version_info < (3, 7):
+    # no module-level __getattr__, everything is loaded at import
+    from .sequence_formats import SEQUENCE_FORMATS
+    PARAMETER_CLASSES._get_classes()
 
 def get_parameter(name, datatype, properties):
     """
@@ -708,6 +711,8 @@ def get_parameter(name, datatype, properties):
 
 
 class Attribute(object):
+    __slots__ = ('name', 'value')
+
     def __init__(self, name=None, value=None):
         self.name = name
         self.value = value
@@ -0,0 +1,115 @@
+"""
+  persistent on-disk cache of parsed ACD files
+
+  Parsed :class:`pyacd.acd.Acd` objects are pickled in a cache directory,
+  keyed on the contents of the ACD file and of the datatypes definitions
+  (``pyacd/data/datatypes.yml``), so that any change to either invalidates
+  the cached object, and on the parsing engine, since the engines differ on
+  malformed files.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+
+from .acd import get_cache_dir
+from .datatypes import get_datatypes_digest
+from .parser import parse_acd
+
+CACHE_FORMAT = 5
+""" version of the cached object layout, bumped when the object model
+changes """
+
+
+def get_default_cache_dir():
+    """ default cache directory of the parsed ACDs """
+    return get_cache_dir()
+
+
+def get_cache_key(acd_bytes, engine='pyparsing'):
+    """
+    Compute the cache key of an ACD file
+    :param acd_bytes: raw contents of the ACD file
+    :type acd_bytes: bytes
+    :param engine: parsing engine (see pyacd.parser.parse_acd)
+    :type engine: basestring
+    """
+    digest = hashlib.sha1(acd_bytes)
+    digest.update(get_datatypes_digest().encode('ascii'))
+    digest.update(str(CACHE_FORMAT).encode('ascii'))
+    digest.update(engine.encode('ascii'))
+    return digest.hexdigest()
+
+
+def load_acd(path, cache_dir=None, engine='pyparsing'):
+    """
+    Load an ACD file, from the cache if it has already been parsed
+    :param path: path to the ACD file
+    :type path: basestring
+    :param cache_dir: cache directory, defaults to get_default_cache_dir()
+    :type cache_dir: basestring
+    :param engine: parsing engine to use on a cache miss (see
+    pyacd.parser.parse_acd)
+    :type engine: basestring
+    :return: the parsed ACD
+    :rtype: pyacd.acd.Acd
+    """
+    cache_dir = cache_dir or get_default_cache_dir()
+    with open(path, 'rb') as acd_fh:
+        acd_bytes = acd_fh.read()
+    cache_path = os.path.join(cache_dir,
+                              get_cache_key(acd_bytes, engine) + '.pickle')
+    try:
+        with open(cache_path, 'rb') as cache_fh:
+            return pickle.load(cache_fh)
+    except Exception:
+        # missing or unreadable (e.g. truncated) cache entry, parse the
+        # file and (re)write it
+        pass
+    acd_object = parse_acd(acd_bytes.decode('utf-8'), engine=engine)
+    try:
+        store_acd(acd_object, cache_path)
+    except (IOError, OSError):
+        # read-only or unavailable cache directory
+        pass
+    return acd_object
+
+
+def store_acd(acd_object, cache_path):
+    """
+    Atomically write a parsed ACD to a cache file
+    :param acd_object: the parsed ACD
+    :type acd_object: pyacd.acd.Acd
+    :param cache_path: path of the cache file
+    :type cache_path: basestring
+    """
+    cache_dir = os.path.dirname(cache_path)
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            # created concurrently by another process
+            if not os.path.isdir(cache_dir):
+                raise
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(tmp_fd, 'wb') as tmp_fh:
+            pickle.dump(acd_object, tmp_fh, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, cache_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def clear_cache(cache_dir=None):
+    """
+    Remove all the cached ACDs from a cache directory
+    :param cache_dir: cache directory, defaults to get_default_cache_dir()
+    :type cache_dir: basestring
+    """
+    cache_dir = cache_dir or get_default_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pickle') or name.endswith('.tmp'):
+            os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,285 @@
+"""
+  translation of EMBOSS command lines into job orders
+
+  A job order is a dictionary which contains, for each parameter set on the
+  command line, a dictionary with its value and the values of its
+  qualifiers, e.g.::
+
+      {'sequence': {'value': 'tsw:opsd_human', 'sbegin': '10'},
+       'outseq': {'value': 'stdout'}}
+"""
+import six
+
+GLOBAL_QUALIFIERS = ['auto', 'stdout', 'debug', 'filter', 'help', 'options']
+""" EMBOSS global qualifiers, which are not part of job orders """
+
+FLAG_DATATYPES = ['boolean', 'toggle']
+""" datatypes of the parameters that are set without a value """
+
+class AmbiguousOptionParseException(Exception):
+    """
+    Exception thrown when an option can belong to multiple parameters,
+    given as Parameter objects or names
+    """
+    def __init__(self, option_name, parameters):
+        super(AmbiguousOptionParseException, self).__init__()
+        self.option_name = option_name
+        self.parameters = parameters
+
+    def __str__(self):
+        template = 'cannot map option {0} to a parameter, since it belongs ' \
+                   'to multiple parameters: {1}'
+        return template.format(self.option_name,
+                               [getattr(p, 'name', p) for p in
+                                self.parameters])
+
+class UnknownOptionParseException(Exception):
+    """
+    Exception thrown when an option doesn't belong to any parameter
+    """
+    def __init__(self, option_name):
+        super(UnknownOptionParseException, self).__init__()
+        self.option_name = option_name
+
+    def __str__(self):
+        template = 'cannot find a parameter for option {0}'
+        return template.format(self.option_name)
+
+class MissingValueParseException(Exception):
+    """
+    Exception thrown when the value of an option is missing at the end of
+    the command line
+    """
+    def __init__(self, option_name):
+        super(MissingValueParseException, self).__init__()
+        self.option_name = option_name
+
+    def __str__(self):
+        template = 'missing value for option {0}'
+        return template.format(self.option_name)
+
+def tokenize(command_line):
+    """
+    Split a command line string into tokens, the way QA tests command
+    lines are split
+    :param command_line: the command line, without the program name
+    :type command_line: basestring
+    """
+    return [token for token in command_line.replace('=', ' ').split(' ')
+            if token != '']
+
+class OptionResolution(object):
+    """
+    The job order entries an option name resolves to
+    """
+    __slots__ = ('targets', 'takes_value', 'value')
+
+    def __init__(self, targets, takes_value=False, value=None):
+        self.targets = targets
+        """ (parameter name, job order key) tuples set by the option """
+        self.takes_value = takes_value
+        """ whether the option value is the next token on the command
+        line """
+        self.value = value
+        """ value set by the option if it does not take a value """
+
+IGNORED_OPTION = OptionResolution([])
+""" resolution of the global qualifiers """
+
+class CommandLineParser(object):
+    """
+    Command line parser for one ACD
+
+    The resolution of each option name to the parameters and qualifiers it
+    sets is computed once and reused by all the command lines parsed with
+    the same parser.
+    """
+    def __init__(self, acd_def):
+        """
+        :param acd_def: the ACD of the application
+        :type acd_def: pyacd.acd.Acd
+        """
+        self.acd_def = acd_def
+        index = acd_def.get_index()
+        self.parameter_names = [parameter.name for parameter in
+                                index.parameters]
+        self.positional_names = [parameter.name for parameter in
+                                 index.positional_parameters]
+        self.resolutions = {}
+
+    def _resolve_qualifier(self, option_name, name, index, value):
+        """
+        Resolve an option name which is a qualifier name (or abbreviation)
+        :param option_name: option name, as written on the command line
+        :param name: qualifier name, without its numeric suffix or 'no'
+        prefix
+        :param index: index of the matching parameter selected by the
+        numeric suffix, or None
+        :param value: value set by the option, or None if the option takes
+        a value (False for 'no'-prefixed qualifiers)
+        """
+        matches = self.acd_def.parameter_by_qualifier_name(name)
+        if not matches:
+            return None
+        exact_matches = [match for match in matches if match[1] == name]
+        if exact_matches:
+            matches = exact_matches
+        if index is not None:
+            if index >= len(matches):
+                raise UnknownOptionParseException(option_name)
+            matches = [matches[index]]
+        elif len(set(match[1] for match in matches)) > 1:
+            raise AmbiguousOptionParseException(
+                option_name, [match[0] for match in matches])
+        # in case multiple parameters match for the qualifier, we set it
+        # for all the parameters, assuming these are 'toggle-controlled'
+        targets = [(parameter.name, qualifier_name) for
+                   parameter, qualifier_name, _ in matches]
+        if value is None:
+            if matches[0][2]['value_type'] == 'bool':
+                value = True
+            else:
+                return OptionResolution(targets, takes_value=True)
+        return OptionResolution(targets, value=value)
+
+    def _resolve(self, name):
+        """
+        Resolve an option name to the job order entries it sets
+        :param name: option name, without its leading '-'
+        :type name: basestring
+        :rtype: OptionResolution
+        """
+        parameter = self.acd_def.parameter_by_name(name)
+        if parameter is not None:
+            if parameter.datatype in FLAG_DATATYPES:
+                return OptionResolution([(parameter.name, 'value')],
+                                        value=True)
+            return OptionResolution([(parameter.name, 'value')],
+                                    takes_value=True)
+        if name.startswith('no'):
+            parameter = self.acd_def.parameter_by_name(name[2:])
+            if parameter is not None:
+                return OptionResolution([(parameter.name, 'value')],
+                                        value=False)
+        index = None
+        qualifier_name = name
+        if name and name[-1].isdigit():
+            # if digits are used for explicit ordering of qualifiers,
+            # numbered from 1
+            if name[-1] == '0':
+                raise UnknownOptionParseException(name)
+            index = int(name[-1]) - 1
+            qualifier_name = name[:-1]
+        resolution = self._resolve_qualifier(name, qualifier_name, index,
+                                             None)
+        if resolution is None and qualifier_name.startswith('no'):
+            # testing for a no-prefixed qualifier
+            resolution = self._resolve_qualifier(name, qualifier_name[2:],
+                                                 index, False)
+        if resolution is not None:
+            return resolution
+        # if absolutely no matching parameter found, it may be an
+        # abbreviation for a global qualifier
+        if [gq for gq in GLOBAL_QUALIFIERS if gq.startswith(name)]:
+            return IGNORED_OPTION
+        raise UnknownOptionParseException(name)
+
+    def resolve(self, name):
+        """
+        Resolve an option name to the job order entries it sets, using the
+        resolutions cache
+        :param name: option name, without its leading '-'
+        :type name: basestring
+        :rtype: OptionResolution
+        """
+        try:
+            return self.resolutions[name]
+        except KeyError:
+            resolution = self._resolve(name)
+            self.resolutions[name] = resolution
+            return resolution
+
+    def parse(self, argv, input_lines=None):
+        """
+        Translate a command line into a job order
+        :param argv: command line tokens (without the program name), or
+        the command line string
+        :type argv: list
+        :param input_lines: values provided in response to prompts, which
+        are assigned in order to the parameters that are not set on the
+        command line
+        :type input_lines: list
+        :return: the job order
+        :rtype: dict
+        """
+        if isinstance(argv, six.string_types):
+            argv = tokenize(argv)
+        job_order = {name: {'value': None} for name in self.parameter_names}
+        tokens = iter(argv)
+        for token in tokens:
+            if token.replace('-', '') in GLOBAL_QUALIFIERS:
+                # global qualifiers should be set by wrappers
+                continue
+            if token.startswith('-'):
+                name, separator, value = token[1:].partition('=')
+                resolution = self.resolve(name)
+                if resolution.takes_value:
+                    if not separator:
+                        try:
+                            value = six.next(tokens)
+                        except StopIteration:
+                            raise MissingValueParseException(name)
+                else:
+                    value = resolution.value
+                for parameter_name, key in resolution.targets:
+                    job_order[parameter_name][key] = value
+            else:
+                # parameter values by position on the command line, set on
+                # the first parameter which is not already set
+                for name in self.positional_names:
+                    if job_order[name]['value'] is None:
+                        job_order[name]['value'] = token
+                        break
+                else:
+                    raise UnknownOptionParseException(token)
+        if input_lines:
+            input_lines = list(input_lines)
+            for name in self.parameter_names:
+                if not input_lines:
+                    break
+                if job_order[name]['value'] is None:
+                    # an empty input line accepts the default value
+                    job_order[name]['value'] = input_lines.pop(0) or None
+        for name in self.parameter_names:
+            if job_order[name] == {'value': None}:
+                del job_order[name]
+        return job_order
+
+def parse_command_line(acd_def, argv, input_lines=None):
+    """
+    Translate a command line into a job order
+    :param acd_def: the ACD of the application
+    :type acd_def: pyacd.acd.Acd
+    :param argv: command line tokens (without the program name), or the
+    command line string
+    :type argv: list
+    :param input_lines: values provided in response to prompts
+    :type input_lines: list
+    :return: the job order
+    :rtype: dict
+    """
+    return CommandLineParser(acd_def).parse(argv, input_lines=input_lines)
+
+def parse_command_lines(acd_def, argvs):
+    """
+    Translate a batch of command lines for the same application into job
+    orders, reusing the option resolutions between command lines
+    :param acd_def: the ACD of the application
+    :type acd_def: pyacd.acd.Acd
+    :param argvs: command lines, each one a list of tokens or a string
+    :type argvs: iterable
+    :return: a generator of job orders
+    """
+    parser = CommandLineParser(acd_def)
+    for argv in argvs:
+        yield parser.parse(argv)
@@ -0,0 +1,282 @@
+"""
+  compilation of ACDs into specialized command line parsers
+
+  :func:`compile_parser` generates the source of a Python module which
+  translates the command lines of one application into job orders (see
+  pyacd.cli). Every option spelling accepted by the application (parameter
+  and qualifier names and their unique prefixes, 'no'-prefixed booleans,
+  numbered qualifiers and global qualifiers) is resolved when the module is
+  generated, into a dispatch dictionary, so that parsing a command line is
+  a loop of dictionary lookups::
+
+      parser = compile_parser(seqret_acd, cache_dir='parsers/')
+      job_order = parser.parse('tsw:opsd_human -osformat2 embl')
+
+  Options are resolved with the same rules as pyacd.cli.CommandLineParser,
+  and the generated modules can be cached on disk, keyed on the ACD.
+"""
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+
+import six
+
+from .cli import CommandLineParser, GLOBAL_QUALIFIERS, \
+    AmbiguousOptionParseException, UnknownOptionParseException
+
+CODEGEN_FORMAT = 2
+""" version of the generated modules, bumped when the template changes """
+
+PARSER_TEMPLATE = '''
+
+def parse(argv, input_lines=None):
+    """
+    Translate a command line into a job order
+    :param argv: command line tokens (without the program name), or
+    the command line string
+    :type argv: list
+    :param input_lines: values provided in response to prompts
+    :type input_lines: list
+    :return: the job order
+    :rtype: dict
+    """
+    if isinstance(argv, string_types):
+        argv = tokenize(argv)
+    job_order = new_job_order()
+    tokens = iter(argv)
+    for token in tokens:
+        if token.replace('-', '') in GLOBAL_NAMES:
+            continue
+        if token.startswith('-'):
+            name, separator, value = token[1:].partition('=')
+            try:
+                targets, takes_value, option_value = OPTIONS[name]
+            except KeyError:
+                if name in AMBIGUOUS_OPTIONS:
+                    raise AmbiguousOptionParseException(
+                        name, AMBIGUOUS_OPTIONS[name])
+                raise UnknownOptionParseException(name)
+            if takes_value:
+                if not separator:
+                    try:
+                        value = next(tokens)
+                    except StopIteration:
+                        raise MissingValueParseException(name)
+            else:
+                value = option_value
+            for parameter_name, key in targets:
+                job_order[parameter_name][key] = value
+        else:
+            for name in POSITIONAL_NAMES:
+                if job_order[name]['value'] is None:
+                    job_order[name]['value'] = token
+                    break
+            else:
+                raise UnknownOptionParseException(token)
+    if input_lines:
+        input_lines = list(input_lines)
+        for name in PARAMETER_NAMES:
+            if not input_lines:
+                break
+            if job_order[name]['value'] is None:
+                job_order[name]['value'] = input_lines.pop(0) or None
+    return {name: entry for name, entry in job_order.items()
+            if entry != UNSET}
+'''
+""" source of the parse function of the generated modules """
+
+
+def _prefixes(names):
+    """ all the prefixes of a set of names, including the empty one """
+    return set(name[:length] for name in names
+               for length in range(len(name) + 1))
+
+
+def iter_option_names(acd_def):
+    """
+    Iterate over the candidate option names of an ACD, a superset of the
+    names its command lines can use
+    :param acd_def: the ACD
+    :type acd_def: pyacd.acd.Acd
+    :return: a generator of option names, without their leading '-'
+    """
+    index = acd_def.get_index()
+    names = _prefixes(parameter.name for parameter in index.parameters)
+    names.update(_prefixes(entry[0] for entry in index.qualifier_names))
+    names.update(['no' + name for name in names])
+    # qualifiers can be numbered from 1 to select one of the parameters
+    # they belong to
+    numbered = set(name + digit for name in names for digit in '123456789')
+    names.update(numbered)
+    names.update(_prefixes(GLOBAL_QUALIFIERS))
+    return iter(sorted(names))
+
+
+def resolve_options(acd_def):
+    """
+    Resolve all the option names accepted by an ACD
+    :param acd_def: the ACD
+    :type acd_def: pyacd.acd.Acd
+    :return: the (targets, takes_value, value) tuple of each option name,
+    and the names of the parameters of each ambiguous option name, both by
+    option name
+    :rtype: tuple
+    """
+    parser = CommandLineParser(acd_def)
+    options = {}
+    ambiguous_options = {}
+    for name in iter_option_names(acd_def):
+        try:
+            resolution = parser.resolve(name)
+        except UnknownOptionParseException:
+            continue
+        except AmbiguousOptionParseException as exc:
+            ambiguous_options[name] = tuple(parameter.name for parameter in
+                                            exc.parameters)
+            continue
+        options[name] = (tuple(resolution.targets), resolution.takes_value,
+                         resolution.value)
+    return options, ambiguous_options
+
+
+def generate_source(acd_def):
+    """
+    Generate the source of the command line parser module of an ACD
+    :param acd_def: the ACD of the application
+    :type acd_def: pyacd.acd.Acd
+    :rtype: str
+    """
+    index = acd_def.get_index()
+    options, ambiguous_options = resolve_options(acd_def)
+    # options which resolve the same way share their entry
+    resolutions = sorted(set(options.values()), key=repr)
+    positions = {resolution: position for position, resolution in
+                 enumerate(resolutions)}
+    lines = [
+        '# command line parser of {0}, generated by pyacd.codegen'.format(
+            acd_def.application.name),
+        'from six import string_types',
+        'from pyacd.cli import tokenize, GLOBAL_QUALIFIERS, \\',
+        '    AmbiguousOptionParseException, UnknownOptionParseException, \\',
+        '    MissingValueParseException',
+        '',
+        'CODEGEN_FORMAT = {0!r}'.format(CODEGEN_FORMAT),
+        'APPLICATION = {0!r}'.format(str(acd_def.application.name)),
+        'PARAMETER_NAMES = {0!r}'.format(tuple(
+            str(parameter.name) for parameter in index.parameters)),
+        'POSITIONAL_NAMES = {0!r}'.format(tuple(
+            str(parameter.name) for parameter in
+            index.positional_parameters)),
+        'GLOBAL_NAMES = frozenset(GLOBAL_QUALIFIERS)',
+        'UNSET = {\'value\': None}',
+        '',
+        'def new_job_order():',
+        '    return {{{0}}}'.format(', '.join(
+            '{0!r}: {{\'value\': None}}'.format(str(parameter.name))
+            for parameter in index.parameters)),
+        '',
+        'RESOLUTIONS = ('
+    ]
+    lines.extend('    {0!r},'.format(resolution) for resolution in
+                 resolutions)
+    lines.append(')')
+    lines.append('')
+    lines.append('OPTIONS = {')
+    lines.extend('    {0!r}: RESOLUTIONS[{1}],'.format(
+        str(name), positions[options[name]]) for name in sorted(options))
+    lines.append('}')
+    lines.append('')
+    lines.append('AMBIGUOUS_OPTIONS = {')
+    lines.extend('    {0!r}: {1!r},'.format(str(name),
+                                            ambiguous_options[name])
+                 for name in sorted(ambiguous_options))
+    lines.append('}')
+    return '\n'.join(lines) + PARSER_TEMPLATE
+
+
+class CompiledParser(object):
+    """
+    Command line parser generated for one ACD, which can be used in place
+    of a pyacd.cli.CommandLineParser
+    """
+    __slots__ = ('acd_def', 'source', 'path', 'options', 'parse')
+
+    def __init__(self, acd_def, source, path=None):
+        """
+        :param acd_def: the ACD of the application
+        :type acd_def: pyacd.acd.Acd
+        :param source: source of the generated module
+        :type source: str
+        :param path: path of the cached module, if any
+        :type path: basestring
+        """
+        self.acd_def = acd_def
+        self.source = source
+        self.path = path
+        namespace = {'__name__': 'pyacd.codegen.{0}'.format(
+            acd_def.application.name)}
+        six.exec_(compile(source, path or '<pyacd.codegen>', 'exec'),
+                  namespace)
+        self.options = namespace['OPTIONS']
+        """ (targets, takes_value, value) tuples, by option name """
+        self.parse = namespace['parse']
+        """ the generated parse(argv, input_lines=None) function """
+
+
+def get_parser_key(acd_def):
+    """
+    Compute the cache key of the parser of an ACD
+    :param acd_def: the ACD
+    :type acd_def: pyacd.acd.Acd
+    """
+    digest = hashlib.sha1(pickle.dumps(acd_def, 2))
+    digest.update(str(CODEGEN_FORMAT).encode('ascii'))
+    return digest.hexdigest()
+
+
+def _write_source(source, path):
+    """ atomically write the source of a generated module """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(tmp_fd, 'wb') as tmp_fh:
+            tmp_fh.write(source.encode('utf-8'))
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def compile_parser(acd_def, cache_dir=None):
+    """
+    Compile the ACD of an application into a command line parser
+    :param acd_def: the ACD of the application
+    :type acd_def: pyacd.acd.Acd
+    :param cache_dir: directory where the generated modules are cached, to
+    skip their generation for the ACDs already compiled
+    :type cache_dir: basestring
+    :rtype: CompiledParser
+    """
+    if cache_dir is None:
+        return CompiledParser(acd_def, generate_source(acd_def))
+    path = os.path.join(cache_dir, '{0}-{1}.py'.format(
+        re.sub(r'\W', '_', acd_def.application.name),
+        get_parser_key(acd_def)))
+    try:
+        with open(path, 'rb') as source_fh:
+            return CompiledParser(acd_def, source_fh.read().decode('utf-8'),
+                                  path)
+    except Exception:
+        # missing or unreadable cached module, generate it again
+        pass
+    source = generate_source(acd_def)
+    _write_source(source, path)
+    return CompiledParser(acd_def, source, path)
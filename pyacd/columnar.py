@@ -0,0 +1,268 @@
+"""
+  columnar export of ACD catalogues
+
+  The applications, sections, parameters, attributes and qualifiers of a
+  set of parsed ACDs are flattened into tables of columns, which can be
+  converted to NumPy structured arrays or Arrow tables (if these optional
+  dependencies are installed) to query a whole catalogue with vectorized
+  operations, e.g. to find the applications with a seqall input which
+  accepts a null value::
+
+      tables = build_tables(catalogue.acds)
+      parameters = tables['parameters'].to_numpy()
+      attributes = tables['attributes'].to_numpy()
+
+  Attribute and qualifier values are exported as strings, booleans as 'Y'
+  or 'N' as in ACD files and lists as one value per line.
+"""
+import csv
+import io
+import os
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from .acd import OUTPUT
+
+TABLE_COLUMNS = {
+    'applications': [('application', str), ('documentation', str),
+                     ('groups', str), ('embassy', str),
+                     ('sections', int), ('parameters', int)],
+    'sections': [('application', str), ('section', str), ('parent', str),
+                 ('depth', int), ('position', int), ('information', str),
+                 ('type', str)],
+    'parameters': [('application', str), ('parameter', str),
+                   ('datatype', str), ('section', str), ('position', int),
+                   ('io', str), ('is_parameter', bool), ('standard', bool),
+                   ('additional', bool)],
+    'attributes': [('application', str), ('parameter', str),
+                   ('attribute', str), ('value', str), ('is_set', bool)],
+    'qualifiers': [('application', str), ('parameter', str),
+                   ('qualifier', str), ('value', str), ('is_set', bool)],
+}
+""" columns and column types of each table """
+
+FORMATS = ['parquet', 'npz', 'csv']
+""" export formats, in order of preference """
+
+
+class Table(object):
+    """
+    A table stored as columns
+    """
+    __slots__ = ('name', 'columns', 'types', 'data')
+
+    def __init__(self, name, columns):
+        """
+        :param name: name of the table
+        :type name: basestring
+        :param columns: (name, type) tuples of the columns, type being one
+        of str, int or bool
+        :type columns: list
+        """
+        self.name = name
+        self.columns = [column for column, _ in columns]
+        """ column names """
+        self.types = dict(columns)
+        """ column types, by column name """
+        self.data = {column: [] for column in self.columns}
+        """ column values, by column name """
+
+    def __len__(self):
+        return len(self.data[self.columns[0]])
+
+    def append(self, *row):
+        """ append a row, with a value for each column """
+        for column, value in zip(self.columns, row):
+            self.data[column].append(value)
+
+    def rows(self):
+        """ iterate over the rows, as tuples """
+        return zip(*[self.data[column] for column in self.columns])
+
+    def to_numpy(self):
+        """
+        Convert the table to a NumPy structured array
+        :rtype: numpy.ndarray
+        """
+        import numpy
+        dtype = []
+        for column in self.columns:
+            column_type = self.types[column]
+            if column_type is str:
+                width = max([len(value) for value in self.data[column]] +
+                            [1])
+                dtype.append((column, 'U{0}'.format(width)))
+            elif column_type is int:
+                dtype.append((column, 'i8'))
+            else:
+                dtype.append((column, '?'))
+        array = numpy.empty(len(self), dtype=dtype)
+        for column in self.columns:
+            array[column] = self.data[column]
+        return array
+
+    def to_arrow(self):
+        """
+        Convert the table to an Arrow table
+        :rtype: pyarrow.Table
+        """
+        import pyarrow
+        types = {str: pyarrow.string(), int: pyarrow.int64(),
+                 bool: pyarrow.bool_()}
+        return pyarrow.Table.from_arrays(
+            [pyarrow.array(self.data[column], type=types[self.types[column]])
+             for column in self.columns], names=self.columns)
+
+    def write_csv(self, path):
+        """
+        Write the table to a CSV file, with a header line
+        :param path: path to the CSV file
+        :type path: basestring
+        """
+        with io.open(path, 'w', newline='', encoding='utf-8') as csv_fh:
+            writer = csv.writer(csv_fh)
+            writer.writerow(self.columns)
+            for row in self.rows():
+                writer.writerow([int(value) if isinstance(value, bool)
+                                 else value for value in row])
+
+
+def format_value(value):
+    """ string representation of an attribute or qualifier value """
+    if isinstance(value, bool):
+        return 'Y' if value else 'N'
+    if isinstance(value, list):
+        return '\n'.join(format_value(item) for item in value)
+    if value is None:
+        return ''
+    return str(value)
+
+
+def _append_values(table, application, parameter, values):
+    for name in sorted(values):
+        table.append(application, parameter, name,
+                     format_value(values.get_value(name)),
+                     values.is_set(name))
+
+
+def _get_property(section, name):
+    for attribute in section.properties:
+        if attribute.name == name:
+            return format_value(attribute.value)
+    return ''
+
+
+def _add_section(tables, application, section, parent, depth, positions):
+    tables['sections'].append(application, section.name, parent, depth,
+                              len(tables['sections']) - positions[1],
+                              _get_property(section, 'information'),
+                              _get_property(section, 'type'))
+    for subsection in section.subsections:
+        _add_section(tables, application, subsection, section.name,
+                     depth + 1, positions)
+    for parameter in section.parameters:
+        attributes = parameter.attributes
+        tables['parameters'].append(
+            application, parameter.name, parameter.datatype, section.name,
+            len(tables['parameters']) - positions[0],
+            'output' if parameter.type == OUTPUT else 'input',
+            bool(attributes.get_value('parameter')),
+            bool(attributes.get_value('standard')),
+            bool(attributes.get_value('additional')))
+        _append_values(tables['attributes'], application, parameter.name,
+                       attributes)
+        _append_values(tables['qualifiers'], application, parameter.name,
+                       parameter.qualifiers)
+
+
+def build_tables(acds):
+    """
+    Flatten parsed ACDs into tables
+    :param acds: the parsed ACDs, e.g. the acds of a catalogue, as a list or
+    as a dictionary keyed by application name. The applications of a
+    dictionary are named after their keys in the tables, e.g. after the
+    ACD file names of a catalogue.
+    :type acds: iterable
+    :return: the applications, sections, parameters, attributes and
+    qualifiers tables, by table name. Application attributes are listed in
+    the attributes table with an empty parameter name.
+    :rtype: dict
+    """
+    if isinstance(acds, Mapping):
+        acds = sorted(acds.items())
+    else:
+        acds = [(acd_object.application.name, acd_object)
+                for acd_object in acds]
+    tables = {name: Table(name, columns) for name, columns in
+              TABLE_COLUMNS.items()}
+    for name, acd_object in acds:
+        application = acd_object.application
+        # first row of the application in the parameters and sections
+        # tables, to number its parameters and sections from 0
+        positions = (len(tables['parameters']), len(tables['sections']))
+        _append_values(tables['attributes'], name, '',
+                       application.attributes)
+        for section in acd_object.sections:
+            _add_section(tables, name, section, '', 0, positions)
+        attributes = application.attributes
+        tables['applications'].append(
+            name, format_value(attributes.get_value('documentation')),
+            format_value(attributes.get_value('groups')),
+            format_value(attributes.get_value('embassy')),
+            len(tables['sections']) - positions[1],
+            len(tables['parameters']) - positions[0])
+    return tables
+
+
+def get_default_format():
+    """ preferred export format, depending on the installed libraries """
+    try:
+        import pyarrow.parquet
+        return 'parquet'
+    except ImportError:
+        pass
+    try:
+        import numpy
+        return 'npz'
+    except ImportError:
+        return 'csv'
+
+
+def export_tables(acds, directory, format=None):
+    """
+    Export parsed ACDs as tables
+    :param acds: the parsed ACDs (see build_tables)
+    :type acds: iterable
+    :param directory: output directory, where a file is written for each
+    table (e.g. parameters.parquet), or a single tables.npz file
+    :type directory: basestring
+    :param format: 'parquet' (requires pyarrow), 'npz' (requires numpy) or
+    'csv', defaults to the first one available
+    :type format: basestring
+    :return: the paths of the written files
+    :rtype: list
+    """
+    format = format or get_default_format()
+    if format not in FORMATS:
+        raise ValueError('unknown export format "{0}"'.format(format))
+    tables = build_tables(acds)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    if format == 'npz':
+        import numpy
+        path = os.path.join(directory, 'tables.npz')
+        numpy.savez(path, **{name: table.to_numpy() for name, table in
+                             tables.items()})
+        return [path]
+    paths = []
+    for name in sorted(tables):
+        path = os.path.join(directory, '{0}.{1}'.format(name, format))
+        if format == 'parquet':
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(tables[name].to_arrow(), path)
+        else:
+            tables[name].write_csv(path)
+        paths.append(path)
+    return paths
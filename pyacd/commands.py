@@ -0,0 +1,370 @@
+"""
+  pyacd command line tool
+
+  Batch subcommands, which stream their input and write one record per
+  input item (JSON lines, or a stream of msgpack objects), so that pyacd
+  can be driven from shell pipelines without starting a Python process per
+  item::
+
+      pyacd parse /usr/share/EMBOSS/acd > acds.jsonl
+      pyacd translate /usr/share/EMBOSS/acd/needle.acd < command_lines.txt
+      pyacd validate /usr/share/EMBOSS/test/qatest.dat /usr/share/EMBOSS/acd
+
+  With --profile, the time spent in each stage (reading, parsing,
+  serializing, writing...) is written as JSON to the standard error when
+  the command completes.
+"""
+import argparse
+import collections
+import errno
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+
+FORMATS = ['json', 'msgpack']
+""" output formats """
+
+CHUNK_SIZE = 500
+""" number of command lines translated by a worker process at once """
+
+
+class Profile(object):
+    """
+    Time spent in each stage of a command, and number of items processed
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.seconds = collections.OrderedDict()
+        """ time spent in each stage, in seconds, by stage name """
+        self.counts = collections.OrderedDict()
+        """ number of items processed by each stage, by stage name """
+
+    def add(self, stage, seconds, count=1):
+        """
+        Record the time spent processing items in a stage, e.g. in a
+        worker process
+        :param stage: name of the stage
+        :type stage: basestring
+        :param seconds: time spent, in seconds
+        :type seconds: float
+        :param count: number of items processed
+        :type count: int
+        """
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + count
+
+    def timer(self, stage, count=1):
+        """ context manager recording the time spent in its block """
+        return _Timer(self, stage, count)
+
+    def to_dict(self):
+        """ the stage timings, and the total elapsed time """
+        stages = collections.OrderedDict(
+            (stage, {'seconds': seconds, 'count': self.counts[stage]})
+            for stage, seconds in self.seconds.items())
+        return {'stages': stages, 'total_seconds': time.time() - self.start}
+
+
+class _Timer(object):
+    __slots__ = ('profile', 'stage', 'count', 'start')
+
+    def __init__(self, profile, stage, count):
+        self.profile = profile
+        self.stage = stage
+        self.count = count
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.add(self.stage, time.time() - self.start, self.count)
+
+
+def get_encoder(format):
+    """
+    Get the function serializing records in an output format
+    :param format: 'json' (one record per line, encoded with orjson if it is
+    installed) or 'msgpack' (requires the msgpack package)
+    :type format: basestring
+    :return: a function returning the bytes of a record
+    """
+    from .serialization import get_backend
+    dumps = get_backend(format)[0]
+    if format == 'json':
+        return lambda record: dumps(record) + b'\n'
+    return dumps
+
+
+def imap(function, tasks, workers):
+    """
+    Apply a function to tasks, in worker processes, and iterate over the
+    results in the order of the tasks. Only a few tasks per worker are
+    submitted ahead, so that the tasks and the results are streamed.
+    :param function: the function, which must be picklable
+    :param tasks: the tasks
+    :type tasks: iterable
+    :param workers: number of worker processes. With 1 worker, the tasks
+    are run in the current process.
+    :type workers: int
+    """
+    if workers == 1:
+        for task in tasks:
+            yield function(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(function, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_file(args):
+    """ parse and serialize an ACD file in a worker process """
+    path, engine, format = args
+    from .parser import parse_acd
+    from .corpus import get_acd_name
+    timings = {}
+    start = time.time()
+    try:
+        with open(path, 'r') as acd_fh:
+            acd_object = parse_acd(acd_fh.read(), engine=engine)
+        record = acd_object.to_dict(compact=True)
+    except Exception as exc:
+        record = {'application': get_acd_name(path), 'path': path,
+                  'error': '{0}: {1}'.format(exc.__class__.__name__, exc)}
+    timings['parse'] = (time.time() - start, 1)
+    start = time.time()
+    data = get_encoder(format)(record)
+    timings['serialize'] = (time.time() - start, 1)
+    return 'error' in record, data, timings
+
+
+_PARSERS = {}
+""" command line parsers of the worker processes, by ACD path """
+
+
+def _get_parser(acd_path, engine, compiled):
+    key = (acd_path, engine, compiled)
+    if key not in _PARSERS:
+        from .parser import parse_acd
+        from .cli import CommandLineParser
+        with open(acd_path, 'r') as acd_fh:
+            acd_object = parse_acd(acd_fh.read(), engine=engine)
+        if compiled:
+            from .acd import get_cache_dir
+            from .codegen import compile_parser
+            _PARSERS[key] = compile_parser(acd_object, cache_dir=os.path.join(
+                get_cache_dir(), 'parsers'))
+        else:
+            _PARSERS[key] = CommandLineParser(acd_object)
+    return _PARSERS[key]
+
+
+def _translate_lines(args):
+    """ translate and serialize a chunk of command lines in a worker
+    process """
+    acd_path, engine, compiled, format, first_number, lines = args
+    timings = {}
+    start = time.time()
+    parser = _get_parser(acd_path, engine, compiled)
+    timings['load'] = (time.time() - start, 0)
+    start = time.time()
+    records = []
+    for number, line in enumerate(lines, first_number):
+        try:
+            records.append({'line': number,
+                            'job_order': parser.parse(line.rstrip('\r\n'))})
+        except Exception as exc:
+            records.append({'line': number, 'error': '{0}: {1}'.format(
+                exc.__class__.__name__, exc)})
+    timings['translate'] = (time.time() - start, len(lines))
+    start = time.time()
+    encode = get_encoder(format)
+    data = b''.join(encode(record) for record in records)
+    timings['serialize'] = (time.time() - start, len(lines))
+    errors = sum(1 for record in records if 'error' in record)
+    return errors, data, timings
+
+
+def _open_output(path):
+    if path is None or path == '-':
+        return getattr(sys.stdout, 'buffer', sys.stdout), False
+    return open(path, 'wb'), True
+
+
+def _write_results(results, output, profile):
+    """ write the serialized results of the worker processes, returning
+    the number of errors """
+    output_fh, close = _open_output(output)
+    errors = 0
+    try:
+        for error_count, data, timings in results:
+            # (seconds, count) tuples of the stages run by the workers
+            for stage, (seconds, count) in timings.items():
+                profile.add(stage, seconds, count)
+            errors += error_count
+            with profile.timer('write'):
+                output_fh.write(data)
+        output_fh.flush()
+    finally:
+        if close:
+            output_fh.close()
+    return errors
+
+
+def parse_command(args, profile):
+    """ parse a directory of ACD files """
+    with profile.timer('list'):
+        paths = sorted(glob(os.path.join(args.directory, args.pattern)))
+    tasks = ((path, args.engine, args.format) for path in paths)
+    return _write_results(imap(_parse_file, tasks, args.workers),
+                          args.output, profile)
+
+
+def translate_command(args, profile):
+    """ translate a file of command lines into job orders """
+    if args.input is None or args.input == '-':
+        input_fh = sys.stdin
+    else:
+        input_fh = io.open(args.input, 'r', encoding='utf-8')
+    try:
+        chunks = _chunks(input_fh, CHUNK_SIZE)
+        tasks = ((args.acd, args.engine, args.compiled, args.format,
+                  number * CHUNK_SIZE + 1, lines)
+                 for number, lines in enumerate(chunks))
+        return _write_results(imap(_translate_lines, tasks, args.workers),
+                              args.output, profile)
+    finally:
+        if input_fh is not sys.stdin:
+            input_fh.close()
+
+
+def validate_command(args, profile):
+    """ validate a QA database against a directory of ACD files """
+    from .qa_runner import validate_qa_records, OK
+    from .qaparser import iter_qa_records
+    encode = get_encoder(args.format)
+    with profile.timer('read'):
+        with open(args.qa_file, 'r') as qa_fh:
+            records = list(iter_qa_records(qa_fh))
+    output_fh, close = _open_output(args.output)
+    errors = 0
+    try:
+        results = validate_qa_records(records, args.acd_dir,
+                                      workers=args.workers,
+                                      engine=args.engine)
+        for result in results:
+            profile.add('validate', result.seconds)
+            errors += result.status != OK
+            with profile.timer('write'):
+                output_fh.write(encode({
+                    'test_id': result.test_id,
+                    'application': result.application,
+                    'status': result.status, 'message': result.message,
+                    'seconds': result.seconds}))
+        output_fh.flush()
+    finally:
+        if close:
+            output_fh.close()
+    return errors
+
+
+def get_argument_parser():
+    """ parser of the arguments of the pyacd command """
+    arg_parser = argparse.ArgumentParser(
+        prog='pyacd', description='Batch processing of EMBOSS ACD files and '
+        'QA databases')
+    subparsers = arg_parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    def add_parser(name, function, help):
+        subparser = subparsers.add_parser(name, help=help)
+        subparser.set_defaults(function=function)
+        subparser.add_argument('--engine', choices=['pyparsing', 'fast'],
+                               default='fast', help='parsing engine')
+        subparser.add_argument('--format', choices=FORMATS, default='json',
+                               help='output format: JSON lines or msgpack '
+                               'stream')
+        subparser.add_argument('--output', '-o', help='output file, '
+                               'defaults to the standard output')
+        subparser.add_argument('--workers', '-j', type=int,
+                               default=multiprocessing.cpu_count(),
+                               help='number of worker processes')
+        subparser.add_argument('--profile', action='store_true',
+                               help='write the time spent in each stage to '
+                               'the standard error')
+        return subparser
+
+    subparser = add_parser('parse', parse_command,
+                           'parse a directory of ACD files')
+    subparser.add_argument('directory', help='directory of the ACD files')
+    subparser.add_argument('--pattern', default='*.acd',
+                           help='glob pattern of the ACD file names')
+    subparser = add_parser('translate', translate_command,
+                           'translate command lines into job orders')
+    subparser.add_argument('acd', help='ACD file of the application')
+    subparser.add_argument('input', nargs='?', help='file of command lines, '
+                           'one per line, defaults to the standard input')
+    subparser.add_argument('--compiled', action='store_true',
+                           help='use a parser compiled for the ACD (see '
+                           'pyacd.codegen), cached in the user cache '
+                           'directory')
+    subparser = add_parser('validate', validate_command,
+                           'validate a QA database against ACD files')
+    subparser.add_argument('qa_file', help='QA database, e.g. qatest.dat')
+    subparser.add_argument('acd_dir', help='directory of the ACD files')
+    return arg_parser
+
+
+def main(argv=None):
+    """
+    Run the pyacd command
+    :param argv: the arguments, defaults to sys.argv[1:]
+    :type argv: list
+    :return: the exit status: 0 if all the items were processed, 1 if
+    some of them could not be
+    :rtype: int
+    """
+    args = get_argument_parser().parse_args(argv)
+    if args.workers < 1:
+        args.workers = 1
+    try:
+        get_encoder(args.format)
+    except ImportError:
+        sys.stderr.write('pyacd: the {0} format requires the {0} '
+                         'package\n'.format(args.format))
+        return 2
+    profile = Profile()
+    try:
+        errors = args.function(args, profile)
+    except IOError as exc:
+        if exc.errno != errno.EPIPE:
+            raise
+        # the reader of the output exited, e.g. head, do not report the
+        # error again when the standard output is flushed at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    if args.profile:
+        json.dump(profile.to_dict(), sys.stderr, indent=2)
+        sys.stderr.write('\n')
+    return 1 if errors else 0
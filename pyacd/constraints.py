@@ -0,0 +1,412 @@
+"""
+  validation of job orders against the constraints of ACD parameters
+
+  The numeric constraints of the integer, float and array parameters of an
+  ACD (minimum, maximum, array size and sum) are compiled once into a
+  constraint table, which is then used to check batches of job orders,
+  e.g. parameter sweeps. With NumPy, the values of a batch are gathered in
+  arrays and checked with vectorized comparisons; without it, they are
+  checked one by one.
+
+  Only the limits set in the ACD with a literal value are checked:
+  computed values (e.g. "$(sequence.length)") and datatype defaults are
+  ignored, except for the sum of arrays which is tested by default.
+"""
+import math
+
+import six
+
+SCALAR_DATATYPES = {'integer': True, 'float': False}
+""" scalar numeric datatypes, and whether their values are integers """
+
+ARRAY_DATATYPES = ['array']
+""" numeric array datatypes """
+
+_INFINITY = float('inf')
+
+
+class ConstraintViolation(object):
+    """
+    A value of a job order which does not satisfy a constraint
+    """
+    __slots__ = ('parameter', 'constraint', 'value', 'message')
+
+    def __init__(self, parameter, constraint, value, message):
+        self.parameter = parameter
+        """ name of the parameter """
+        self.constraint = constraint
+        """ violated constraint, e.g. 'minimum' or 'sum' """
+        self.value = value
+        """ value of the parameter in the job order """
+        self.message = message
+        """ description of the violation """
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return 'ConstraintViolation({0!r}, {1!r}, {2!r})'.format(
+            self.parameter, self.constraint, self.value)
+
+
+def _get_number(attributes, name):
+    """ numeric value of an attribute, None if it is computed """
+    value = attributes.get_value(name)
+    if isinstance(value, bool) or \
+            not isinstance(value, six.integer_types + (float,)):
+        return None
+    return value
+
+
+def _get_limit(parameter, name, default):
+    """ value of a numeric constraint explicitly set on a parameter """
+    attributes = parameter.attributes
+    if not attributes.is_set(name):
+        return default
+    value = _get_number(attributes, name)
+    return default if value is None else value
+
+
+class ArrayConstraint(object):
+    """
+    Constraints of an array parameter
+    """
+    __slots__ = ('name', 'minimum', 'maximum', 'size', 'sum', 'tolerance')
+
+    def __init__(self, parameter):
+        self.name = parameter.name
+        self.minimum = _get_limit(parameter, 'minimum', -_INFINITY)
+        self.maximum = _get_limit(parameter, 'maximum', _INFINITY)
+        self.size = _get_limit(parameter, 'size', None)
+        self.sum = None
+        """ expected sum of the values, if the sum is tested """
+        self.tolerance = 0.0
+        # as in EMBOSS, the sum is tested by default
+        attributes = parameter.attributes
+        if attributes.get_value('sumtest') is True:
+            self.sum = _get_number(attributes, 'sum')
+            self.tolerance = _get_number(attributes, 'tolerance') or 0.0
+
+
+class ConstraintTable(object):
+    """
+    Numeric constraints of the parameters of an ACD, as columns
+    """
+    __slots__ = ('names', 'minimum', 'maximum', 'integer', 'arrays')
+
+    def __init__(self, acd_def):
+        """
+        :param acd_def: the ACD
+        :type acd_def: pyacd.acd.Acd
+        """
+        self.names = []
+        """ names of the constrained scalar parameters """
+        self.minimum = []
+        """ minimum value of each scalar parameter """
+        self.maximum = []
+        """ maximum value of each scalar parameter """
+        self.integer = []
+        """ whether the values of each scalar parameter are integers """
+        self.arrays = []
+        """ ArrayConstraint objects of the array parameters """
+        for parameter in acd_def.get_index().parameters:
+            if parameter.datatype in SCALAR_DATATYPES:
+                self.names.append(parameter.name)
+                self.minimum.append(_get_limit(parameter, 'minimum',
+                                               -_INFINITY))
+                self.maximum.append(_get_limit(parameter, 'maximum',
+                                               _INFINITY))
+                self.integer.append(SCALAR_DATATYPES[parameter.datatype])
+            elif parameter.datatype in ARRAY_DATATYPES:
+                self.arrays.append(ArrayConstraint(parameter))
+
+
+def _get_value(job_order, name):
+    entry = job_order.get(name)
+    if entry is None:
+        return None
+    return entry.get('value')
+
+
+def _parse_number(value):
+    """ float value of a job order value, None if it is not a number """
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _split_array(value):
+    """ items of a job order array value """
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return str(value).replace(',', ' ').split()
+
+
+def _is_finite(number):
+    return not (math.isinf(number) or math.isnan(number))
+
+
+def _parse_array(items):
+    """ float values of the items of an array, None if invalid """
+    numbers = [_parse_number(item) for item in items]
+    if None in numbers or not all(_is_finite(number) for number in numbers):
+        return None
+    return numbers
+
+
+def _range_violation(name, constraint, value, limit):
+    template = '{0}: {1} is {2} the {3} {4}'
+    return ConstraintViolation(name, constraint, value, template.format(
+        name, value, 'below' if constraint == 'minimum' else 'above',
+        constraint, limit))
+
+
+def _type_violation(name, value, expected):
+    return ConstraintViolation(name, 'type', value, '{0}: {1!r} is not {2}'
+                               .format(name, value, expected))
+
+
+class JobOrderValidator(object):
+    """
+    Validator of the job orders of one ACD
+
+    The constraints of the ACD are compiled once, when the validator is
+    created, and reused for all the job orders it validates.
+    """
+
+    def __init__(self, acd_def, use_numpy=None):
+        """
+        :param acd_def: the ACD of the application
+        :type acd_def: pyacd.acd.Acd
+        :param use_numpy: whether to validate batches with NumPy, defaults
+        to whether NumPy is installed
+        :type use_numpy: bool
+        """
+        self.acd_def = acd_def
+        self.table = ConstraintTable(acd_def)
+        if use_numpy is None:
+            try:
+                import numpy
+                use_numpy = True
+            except ImportError:
+                use_numpy = False
+        self.use_numpy = use_numpy
+
+    def validate(self, job_order):
+        """
+        Validate a job order
+        :param job_order: the job order (see pyacd.cli)
+        :type job_order: dict
+        :return: the constraint violations
+        :rtype: list
+        """
+        return self.validate_batch([job_order])[0]
+
+    def validate_batch(self, job_orders):
+        """
+        Validate a batch of job orders
+        :param job_orders: the job orders (see pyacd.cli)
+        :type job_orders: list
+        :return: the list of the constraint violations of each job order
+        :rtype: list
+        """
+        job_orders = list(job_orders)
+        violations = [[] for _ in job_orders]
+        if self.use_numpy:
+            self._check_scalars_numpy(job_orders, violations)
+        else:
+            self._check_scalars(job_orders, violations)
+        for array in self.table.arrays:
+            if self.use_numpy:
+                self._check_array_numpy(array, job_orders, violations)
+            else:
+                self._check_array(array, job_orders, violations)
+        return violations
+
+    def _get_scalar(self, job_number, column, value, violations):
+        """ parse a scalar value, recording a violation if invalid """
+        number = _parse_number(value)
+        table = self.table
+        # infinite and NaN values are not numbers of ACD parameters
+        if number is None or not _is_finite(number) or \
+                table.integer[column] and number != int(number):
+            violations[job_number].append(_type_violation(
+                table.names[column], value,
+                'an integer' if table.integer[column] else 'a number'))
+            return None
+        return number
+
+    def _check_scalars(self, job_orders, violations):
+        table = self.table
+        for job_number, job_order in enumerate(job_orders):
+            for column, name in enumerate(table.names):
+                value = _get_value(job_order, name)
+                if value is None:
+                    continue
+                number = self._get_scalar(job_number, column, value,
+                                          violations)
+                if number is None:
+                    continue
+                if number < table.minimum[column]:
+                    violations[job_number].append(_range_violation(
+                        name, 'minimum', value, table.minimum[column]))
+                elif number > table.maximum[column]:
+                    violations[job_number].append(_range_violation(
+                        name, 'maximum', value, table.maximum[column]))
+
+    def _get_column_numpy(self, column, values, violations):
+        """ float array of the values of a scalar parameter, NaN for unset
+        or invalid values """
+        import numpy
+        if not any(value is True or value is False for value in values):
+            try:
+                # NumPy converts the numbers and their string representations
+                numbers = numpy.array(['nan' if value is None else value
+                                       for value in values], dtype=float)
+            except (TypeError, ValueError):
+                pass
+            else:
+                invalid = ~numpy.isfinite(numbers)
+                if self.table.integer[column]:
+                    with numpy.errstate(invalid='ignore'):
+                        invalid |= numbers != numpy.floor(numbers)
+                invalid &= numpy.array([value is not None
+                                        for value in values])
+                if not invalid.any():
+                    return numbers
+        numbers = numpy.full(len(values), numpy.nan)
+        for job_number, value in enumerate(values):
+            if value is not None:
+                number = self._get_scalar(job_number, column, value,
+                                          violations)
+                if number is not None:
+                    numbers[job_number] = number
+        return numbers
+
+    def _check_scalars_numpy(self, job_orders, violations):
+        import numpy
+        table = self.table
+        if not table.names or not job_orders:
+            return
+        columns = [[_get_value(job_order, name) for job_order in job_orders]
+                   for name in table.names]
+        values = numpy.column_stack([
+            self._get_column_numpy(column, column_values, violations)
+            for column, column_values in enumerate(columns)])
+        # comparisons with NaN (unset or invalid values) are false
+        with numpy.errstate(invalid='ignore'):
+            for constraint, failed in [
+                    ('minimum', values < numpy.array(table.minimum)),
+                    ('maximum', values > numpy.array(table.maximum))]:
+                limits = getattr(table, constraint)
+                for job_number, column in zip(*numpy.nonzero(failed)):
+                    violations[job_number].append(_range_violation(
+                        table.names[column], constraint,
+                        columns[column][job_number], limits[column]))
+
+    def _get_arrays(self, array, job_orders, violations):
+        """ split the values of an array parameter, recording size
+        violations, and return the (job number, value, items) tuples of the
+        values of the expected size """
+        arrays = []
+        for job_number, job_order in enumerate(job_orders):
+            value = _get_value(job_order, array.name)
+            if value is None:
+                continue
+            items = _split_array(value)
+            if array.size is not None and len(items) != array.size:
+                violations[job_number].append(ConstraintViolation(
+                    array.name, 'size', value,
+                    '{0}: {1} values instead of {2}'.format(
+                        array.name, len(items), array.size)))
+            else:
+                arrays.append((job_number, value, items))
+        return arrays
+
+    def _check_array(self, array, job_orders, violations):
+        for job_number, value, items in self._get_arrays(array, job_orders,
+                                                         violations):
+            numbers = _parse_array(items)
+            if numbers is None:
+                violations[job_number].append(_type_violation(
+                    array.name, value, 'an array of numbers'))
+                continue
+            if numbers and min(numbers) < array.minimum:
+                violations[job_number].append(_range_violation(
+                    array.name, 'minimum', value, array.minimum))
+            if numbers and max(numbers) > array.maximum:
+                violations[job_number].append(_range_violation(
+                    array.name, 'maximum', value, array.maximum))
+            if array.sum is not None and \
+                    abs(sum(numbers) - array.sum) > array.tolerance:
+                violations[job_number].append(_sum_violation(
+                    array, value, sum(numbers)))
+
+    def _check_array_numpy(self, array, job_orders, violations):
+        import numpy
+        # values of the same size are converted and checked together
+        by_size = {}
+        for entry in self._get_arrays(array, job_orders, violations):
+            by_size.setdefault(len(entry[2]), []).append(entry)
+        for size, entries in by_size.items():
+            if size == 0:
+                continue
+            try:
+                values = numpy.array([items for _, _, items in entries],
+                                     dtype=float)
+            except (TypeError, ValueError):
+                values = None
+            if values is None or not numpy.isfinite(values).all():
+                valid = []
+                for entry in entries:
+                    if _parse_array(entry[2]) is None:
+                        violations[entry[0]].append(_type_violation(
+                            array.name, entry[1], 'an array of numbers'))
+                    else:
+                        valid.append(entry)
+                entries = valid
+                if not entries:
+                    continue
+                values = numpy.array([_parse_array(items)
+                                      for _, _, items in entries])
+            below = (values < array.minimum).any(axis=1)
+            above = (values > array.maximum).any(axis=1)
+            sums = values.sum(axis=1)
+            if array.sum is not None:
+                wrong_sum = numpy.abs(sums - array.sum) > array.tolerance
+            else:
+                wrong_sum = numpy.zeros(len(entries), dtype=bool)
+            for row in numpy.nonzero(below | above | wrong_sum)[0]:
+                job_number, value, _ = entries[row]
+                if below[row]:
+                    violations[job_number].append(_range_violation(
+                        array.name, 'minimum', value, array.minimum))
+                if above[row]:
+                    violations[job_number].append(_range_violation(
+                        array.name, 'maximum', value, array.maximum))
+                if wrong_sum[row]:
+                    violations[job_number].append(_sum_violation(
+                        array, value, float(sums[row])))
+
+
+def _sum_violation(array, value, total):
+    return ConstraintViolation(
+        array.name, 'sum', value,
+        '{0}: sum of the values is {1}, expected {2} +/- {3}'.format(
+            array.name, total, array.sum, array.tolerance))
+
+
+def validate_job_orders(acd_def, job_orders):
+    """
+    Validate a batch of job orders against the constraints of an ACD
+    :param acd_def: the ACD of the application
+    :type acd_def: pyacd.acd.Acd
+    :param job_orders: the job orders (see pyacd.cli)
+    :type job_orders: list
+    :return: the list of the constraint violations of each job order
+    :rtype: list
+    """
+    return JobOrderValidator(acd_def).validate_batch(job_orders)
@@ -0,0 +1,326 @@
+"""
+  bulk loading of ACD files directories
+"""
+import hashlib
+import os
+import multiprocessing
+import pickle
+import tempfile
+import threading
+from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import CACHE_FORMAT
+from .datatypes import get_datatypes_digest
+from .parser import parse_acd
+
+
+def get_acd_name(path):
+    """ name of the application described by an ACD file, from its path """
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _load_file(path, engine):
+    """
+    parse one ACD file, returning its path, the parsed ACD and None, or
+    its path, None and an error message if it cannot be parsed
+    """
+    try:
+        with open(path, 'r') as acd_fh:
+            return path, parse_acd(acd_fh.read(), engine=engine), None
+    except Exception as exc:
+        # error messages are returned rather than raised, so that they do
+        # not abort the whole load (and do not need to be picklable)
+        return path, None, '{0}: {1}'.format(exc.__class__.__name__, exc)
+
+
+def _load_files(args):
+    """ parse a chunk of ACD files in a worker process """
+    paths, engine = args
+    return [_load_file(path, engine) for path in paths]
+
+
+def load_files(paths, workers=None, engine='pyparsing'):
+    """
+    Parse a list of ACD files, in parallel
+    :param paths: paths of the ACD files
+    :type paths: list
+    :param workers: number of worker processes, defaults to the number of
+    CPUs. With 1 worker, the files are parsed in the current process.
+    :type workers: int
+    :param engine: parsing engine (see pyacd.parser.parse_acd)
+    :type engine: basestring
+    :return: a dictionary of the parsed ACDs and a dictionary of the
+    error messages for the files that could not be parsed, both keyed by
+    path
+    :rtype: tuple
+    """
+    workers = workers or multiprocessing.cpu_count()
+    paths = list(paths)
+    acds = {}
+    errors = {}
+    if workers == 1 or len(paths) <= 1:
+        results = _load_files((paths, engine))
+    else:
+        # a few chunks per worker, to balance the load while limiting the
+        # inter-process communication overhead
+        chunk_size = max(1, len(paths) // (workers * 4))
+        chunks = [(paths[i:i + chunk_size], engine)
+                  for i in range(0, len(paths), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [result for chunk_results in
+                       executor.map(_load_files, chunks)
+                       for result in chunk_results]
+    for path, acd_object, error in results:
+        if error is None:
+            acds[path] = acd_object
+        else:
+            errors[path] = error
+    return acds, errors
+
+
+def load_directory(path, workers=None, engine='pyparsing', pattern='*.acd'):
+    """
+    Parse all the ACD files of a directory, in parallel
+    :param path: path to the directory, e.g. /usr/share/EMBOSS/acd
+    :type path: basestring
+    :param workers: number of worker processes, defaults to the number of
+    CPUs
+    :type workers: int
+    :param engine: parsing engine (see pyacd.parser.parse_acd)
+    :type engine: basestring
+    :param pattern: glob pattern of the ACD file names
+    :type pattern: basestring
+    :return: a dictionary of the parsed ACDs, keyed by application name,
+    and a dictionary of the error messages for the files that could not be
+    parsed, keyed by path
+    :rtype: tuple
+    """
+    paths = sorted(glob(os.path.join(path, pattern)))
+    acds, errors = load_files(paths, workers=workers, engine=engine)
+    return {get_acd_name(acd_path): acd_object
+            for acd_path, acd_object in acds.items()}, errors
+
+
+def get_acds(catalogue):
+    """
+    Get the parsed ACDs of a catalogue
+    :param catalogue: a Catalogue, or parsed ACDs as a list or as a
+    dictionary keyed by application name
+    :return: the parsed ACDs, by application name
+    :rtype: dict
+    """
+    acds = getattr(catalogue, 'acds', catalogue)
+    if isinstance(acds, dict):
+        return acds
+    return {acd_object.application.name: acd_object for acd_object in acds}
+
+
+def get_file_digest(path):
+    """ hash of the contents of a file """
+    with open(path, 'rb') as file_obj:
+        return hashlib.sha1(file_obj.read()).hexdigest()
+
+
+class ManifestEntry(object):
+    """
+    State of an ACD file when it was last parsed
+    """
+    __slots__ = ('mtime', 'size', 'digest', 'error')
+
+    def __init__(self, mtime, size, digest, error=None):
+        self.mtime = mtime
+        """ modification time of the file """
+        self.size = size
+        """ size of the file """
+        self.digest = digest
+        """ hash of the contents of the file """
+        self.error = error
+        """ error message if the file could not be parsed """
+
+    def __getstate__(self):
+        return (self.mtime, self.size, self.digest, self.error)
+
+    def __setstate__(self, state):
+        self.mtime, self.size, self.digest, self.error = state
+
+
+class CatalogueChanges(object):
+    """
+    Changes of a catalogue on refresh
+    """
+    __slots__ = ('added', 'changed', 'removed', 'errors')
+
+    def __init__(self, added=None, changed=None, removed=None, errors=None):
+        self.added = list(added or [])
+        """ names of the applications added to the catalogue """
+        self.changed = list(changed or [])
+        """ names of the applications whose ACD file changed """
+        self.removed = list(removed or [])
+        """ names of the applications removed from the catalogue """
+        self.errors = dict(errors or {})
+        """ error messages of the new or changed files that could not be
+        parsed, by path """
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed or
+                    self.errors)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return 'CatalogueChanges(added={0!r}, changed={1!r}, ' \
+               'removed={2!r}, errors={3!r})'.format(
+                   self.added, self.changed, self.removed,
+                   sorted(self.errors))
+
+
+class Catalogue(object):
+    """
+    Parsed ACD files of a directory, kept up to date incrementally
+
+    A manifest records the modification time, size and hash of each file
+    when it was parsed. On refresh, only the new files and the files whose
+    contents changed are parsed again, so that the time spent is
+    proportional to the number of changes. Files whose modification time
+    or size changed are hashed to detect actual changes. The catalogue can
+    be persisted in a state file, to be refreshed by another process.
+    """
+
+    def __init__(self, path, engine='pyparsing', pattern='*.acd',
+                 workers=None, state_path=None):
+        """
+        :param path: path to the directory, e.g. /usr/share/EMBOSS/acd
+        :type path: basestring
+        :param engine: parsing engine (see pyacd.parser.parse_acd)
+        :type engine: basestring
+        :param pattern: glob pattern of the ACD file names
+        :type pattern: basestring
+        :param workers: number of worker processes used to parse the
+        files, defaults to the number of CPUs
+        :type workers: int
+        :param state_path: path to a file where the catalogue is saved
+        after each refresh and loaded from on creation
+        :type state_path: basestring
+        """
+        self.path = path
+        self.engine = engine
+        self.pattern = pattern
+        self.workers = workers
+        self.state_path = state_path
+        self.acds = {}
+        """ parsed ACDs, by application name """
+        self.manifest = {}
+        """ ManifestEntry objects of the parsed files, by path """
+        self._lock = threading.Lock()
+        if state_path is not None:
+            self._load_state()
+
+    @property
+    def errors(self):
+        """ error messages of the files that could not be parsed, by path
+        """
+        return {path: entry.error for path, entry in self.manifest.items()
+                if entry.error is not None}
+
+    def _get_state_header(self):
+        return (CACHE_FORMAT, get_datatypes_digest(),
+                os.path.abspath(self.path), self.pattern)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'rb') as state_fh:
+                header, acds, manifest = pickle.load(state_fh)
+        except Exception:
+            # missing, unreadable or outdated state: start from scratch
+            return
+        if header == self._get_state_header():
+            self.acds, self.manifest = acds, manifest
+
+    def save(self):
+        """ Atomically write the catalogue to its state file """
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(tmp_fd, 'wb') as tmp_fh:
+                pickle.dump((self._get_state_header(), self.acds,
+                             self.manifest), tmp_fh, 2)
+            os.rename(tmp_path, self.state_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def refresh(self, paths=None):
+        """
+        Parse the new and changed ACD files and drop the deleted ones
+        :param paths: paths of the files to check, defaults to all the
+        files of the directory matching the pattern and all the files of
+        the catalogue
+        :type paths: iterable
+        :return: the changes
+        :rtype: CatalogueChanges
+        """
+        # refreshes are serialized, e.g. with a watcher thread
+        with self._lock:
+            return self._refresh(paths)
+
+    def _refresh(self, paths):
+        manifest = dict(self.manifest)
+        if paths is None:
+            paths = set(glob(os.path.join(self.path, self.pattern)))
+            paths.update(manifest.keys())
+        to_parse = {}
+        removed = []
+        touched = False
+        for path in paths:
+            entry = manifest.get(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                if entry is not None:
+                    del manifest[path]
+                    removed.append(path)
+                continue
+            if entry is not None and entry.mtime == stat.st_mtime and \
+                    entry.size == stat.st_size:
+                continue
+            digest = get_file_digest(path)
+            if entry is not None and entry.digest == digest:
+                # touched but not modified
+                manifest[path] = ManifestEntry(stat.st_mtime, stat.st_size,
+                                               digest, entry.error)
+                touched = True
+                continue
+            to_parse[path] = ManifestEntry(stat.st_mtime, stat.st_size,
+                                           digest)
+        acds = dict(self.acds)
+        changes = CatalogueChanges()
+        parsed, errors = load_files(sorted(to_parse), workers=self.workers,
+                                    engine=self.engine)
+        for path, entry in to_parse.items():
+            name = get_acd_name(path)
+            was_parsed = path in manifest and \
+                manifest[path].error is None
+            entry.error = errors.get(path)
+            manifest[path] = entry
+            if entry.error is None:
+                acds[name] = parsed[path]
+                (changes.changed if was_parsed else changes.added).append(
+                    name)
+            else:
+                changes.errors[path] = entry.error
+                if acds.pop(name, None) is not None:
+                    changes.removed.append(name)
+        for path in removed:
+            name = get_acd_name(path)
+            if acds.pop(name, None) is not None:
+                changes.removed.append(name)
+        changes.added.sort()
+        changes.changed.sort()
+        changes.removed.sort()
+        # the new state replaces the previous one at once, so that readers
+        # never see a partially refreshed catalogue
+        self.acds, self.manifest = acds, manifest
+        if self.state_path is not None and (to_parse or removed or touched):
+            self.save()
+        return changes
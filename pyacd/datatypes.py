@@ -0,0 +1,136 @@
+"""
+  loading of the ACD datatypes definitions
+
+  The definitions are maintained in ``pyacd/data/datatypes.yml``. Since
+  loading YAML is slow, they are compiled into a pickle file, either
+  shipped next to the YAML file (see :func:`main`) or written to the user
+  cache directory on first use. A compiled file is only used if it was
+  compiled from the current contents of the YAML file.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+from .acd import get_data_path, get_cache_dir
+
+DATATYPES_PATH = get_data_path('datatypes.yml')
+""" path to the datatypes definitions """
+
+COMPILED_DATATYPES_PATH = get_data_path('datatypes.pickle')
+""" path to the datatypes definitions compiled when building pyacd """
+
+_DIGEST = []
+
+
+def get_datatypes_digest():
+    """ hash of the contents of the datatypes definitions file """
+    if not _DIGEST:
+        with open(DATATYPES_PATH, 'rb') as datatypes_fh:
+            _DIGEST.append(hashlib.sha1(datatypes_fh.read()).hexdigest())
+    return _DIGEST[0]
+
+
+def get_cached_datatypes_path():
+    """ path to the datatypes definitions compiled on first use """
+    return os.path.join(get_cache_dir(),
+                        'datatypes-{0}.pickle'.format(get_datatypes_digest()))
+
+
+def load_yaml_datatypes():
+    """
+    Load the datatypes definitions from the YAML file
+    :return: the definition of each datatype, by datatype name
+    :rtype: dict
+    """
+    import ruamel.yaml as yaml
+    with open(DATATYPES_PATH, 'r') as datatypes_fh:
+        return yaml.safe_load(datatypes_fh)
+
+
+def load_compiled_datatypes(path):
+    """
+    Load compiled datatypes definitions, if they are up to date
+    :param path: path to the compiled definitions
+    :type path: basestring
+    :return: the definition of each datatype, by datatype name, or None if
+    the file does not exist, cannot be read or was compiled from another
+    version of the YAML file
+    :rtype: dict
+    """
+    try:
+        with open(path, 'rb') as compiled_fh:
+            compiled = pickle.load(compiled_fh)
+    except Exception:
+        return None
+    if not isinstance(compiled, dict) or \
+            compiled.get('digest') != get_datatypes_digest():
+        return None
+    return compiled.get('datatypes')
+
+
+def compile_datatypes(path, datatypes=None):
+    """
+    Atomically write the compiled datatypes definitions
+    :param path: path to the compiled definitions
+    :type path: basestring
+    :param datatypes: the definitions, loaded from the YAML file if not
+    provided
+    :type datatypes: dict
+    """
+    if datatypes is None:
+        datatypes = load_yaml_datatypes()
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(tmp_fd, 'wb') as tmp_fh:
+            pickle.dump({'digest': get_datatypes_digest(),
+                         'datatypes': datatypes}, tmp_fh, 2)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def load_datatypes(use_compiled=True):
+    """
+    Load the datatypes definitions, from the compiled definitions if they
+    are up to date, compiling them in the cache directory if needed
+    :param use_compiled: whether to use (and write) compiled definitions
+    :type use_compiled: bool
+    :return: the definition of each datatype, by datatype name
+    :rtype: dict
+    """
+    if not use_compiled:
+        return load_yaml_datatypes()
+    for path in [COMPILED_DATATYPES_PATH, get_cached_datatypes_path()]:
+        datatypes = load_compiled_datatypes(path)
+        if datatypes is not None:
+            return datatypes
+    datatypes = load_yaml_datatypes()
+    try:
+        compile_datatypes(get_cached_datatypes_path(), datatypes)
+    except (IOError, OSError):
+        # read-only or unavailable cache directory
+        pass
+    return datatypes
+
+
+def main(args=None):
+    """
+    Compile the datatypes definitions next to the YAML file, e.g. when
+    packaging pyacd:
+
+        python -m pyacd.datatypes [output path]
+    """
+    args = sys.argv[1:] if args is None else args
+    path = args[0] if args else COMPILED_DATATYPES_PATH
+    compile_datatypes(path)
+    return path
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,711 @@
+"""
+  evaluation of the computed values of ACD files
+
+  Attribute and qualifier values starting with $ or @ are computed from
+  other values when a job is run: "$(gapopen)" or "$(sequence.length)"
+  refer to the value of a parameter, variable or attribute, and
+  "@($(display) == none)", "@($(acdprotein) ? stopprotein : nucleotide)"
+  or "@($(type) = p: protein, else: nucleotide)" are expressions. Each
+  value is compiled once into a closure (see compile_expression).
+
+  The computed values of an ACD, its variables and the parameter values
+  they refer to form a dependency graph, which is built and sorted once per
+  ACD (see Acd.get_expression_graph), so that all of them are resolved for
+  a job order in a single pass. Job order values take precedence over the
+  computed defaults, e.g.::
+
+      acd_def.get_expression_graph().resolve(
+          {'asequence': {'value': 'a.fa', 'protein': True}},
+          environment={'acdprotein': True})
+"""
+import re
+
+import six
+
+_NAME = re.compile(r'\$\(([A-Za-z_][\w.]*)\)')
+
+_COMPUTED = re.compile(r'[$@]\(')
+
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<ref>\$\((?P<name>[A-Za-z_][\w.]*)\))|
+    (?P<operator>==|!=|<=|>=|@\(|[()?:,=<>!&|+\-*/])|
+    (?P<string>"[^"]*")|
+    (?P<word>[\w.]+))''', re.VERBOSE)
+
+_TRUE = frozenset(['y', 'yes', 'true', '1'])
+
+_FALSE = frozenset(['n', 'no', 'false', '0', ''])
+
+
+class ExpressionSyntaxException(Exception):
+    """
+    Exception thrown when a computed value cannot be parsed
+    """
+    def __init__(self, source, position, message):
+        super(ExpressionSyntaxException, self).__init__()
+        self.source = source
+        self.position = position
+        self.message = message
+
+    def __str__(self):
+        template = 'invalid expression "{0}" at position {1}: {2}'
+        return template.format(self.source, self.position, self.message)
+
+
+class ExpressionEvaluationException(Exception):
+    """
+    Exception thrown when an operator is applied to values of the wrong
+    type
+    """
+    def __init__(self, message):
+        super(ExpressionEvaluationException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class UndefinedReferenceException(Exception):
+    """
+    Exception thrown when a value refers to a name which is neither a
+    parameter, a variable, an attribute nor set in the environment
+    """
+    def __init__(self, name):
+        super(UndefinedReferenceException, self).__init__()
+        self.name = name
+
+    def __str__(self):
+        return 'undefined reference $({0})'.format(self.name)
+
+
+class CyclicExpressionException(Exception):
+    """
+    Exception thrown when computed values depend on themselves
+    """
+    def __init__(self, cycle):
+        super(CyclicExpressionException, self).__init__()
+        self.cycle = cycle
+
+    def __str__(self):
+        return 'cyclic dependency between computed values: {0}'.format(
+            ' -> '.join(self.cycle))
+
+
+def is_computed(value):
+    """ check whether an attribute value is computed (see get_att_value) """
+    return isinstance(value, six.string_types) and \
+        (value.startswith('$') or value.startswith('@'))
+
+
+def to_bool(value):
+    """ boolean value of an ACD value, e.g. 'Y' or 'false' """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    lowered = str(value).strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ExpressionEvaluationException(
+        'not a boolean value: "{0}"'.format(value))
+
+
+def to_number(value):
+    """ numeric value of an ACD value, or None if it is not a number """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_string(value):
+    """ string value of an ACD value, booleans being written Y or N """
+    if isinstance(value, bool):
+        return 'Y' if value else 'N'
+    return str(value)
+
+
+def coerce(value, value_type):
+    """
+    Convert a computed value to the value type of its attribute
+    :param value_type: value type of the attribute (bool, float, int, str,
+    or list and relations which are not converted)
+    :type value_type: basestring
+    """
+    if value_type == 'bool':
+        return to_bool(value)
+    if value_type in ('int', 'float'):
+        number = to_number(value)
+        if number is None:
+            raise ExpressionEvaluationException(
+                'not a number: "{0}"'.format(value))
+        return int(number) if value_type == 'int' else float(number)
+    if value_type == 'str':
+        return to_string(value)
+    return value
+
+
+def _number(value):
+    number = to_number(value)
+    if number is None:
+        raise ExpressionEvaluationException(
+            'not a number: "{0}"'.format(value))
+    return number
+
+
+def _equals(left, right):
+    if isinstance(left, bool) or isinstance(right, bool):
+        try:
+            return to_bool(left) == to_bool(right)
+        except ExpressionEvaluationException:
+            return False
+    left_number, right_number = to_number(left), to_number(right)
+    if left_number is not None and right_number is not None:
+        return left_number == right_number
+    return to_string(left).lower() == to_string(right).lower()
+
+
+def _compare(left, right):
+    left_number, right_number = to_number(left), to_number(right)
+    if left_number is not None and right_number is not None:
+        return (left_number > right_number) - (left_number < right_number)
+    left, right = to_string(left), to_string(right)
+    return (left > right) - (left < right)
+
+
+def _divide(left, right):
+    if right == 0:
+        raise ExpressionEvaluationException('division by zero')
+    if isinstance(left, int) and isinstance(right, int) and \
+            left % right == 0:
+        return left // right
+    return left / float(right)
+
+
+_ARITHMETIC = {'+': lambda left, right: left + right,
+               '-': lambda left, right: left - right,
+               '*': lambda left, right: left * right,
+               '/': _divide}
+
+_COMPARISONS = {'==': _equals,
+                '!=': lambda left, right: not _equals(left, right),
+                '<': lambda left, right: _compare(left, right) < 0,
+                '>': lambda left, right: _compare(left, right) > 0,
+                '<=': lambda left, right: _compare(left, right) <= 0,
+                '>=': lambda left, right: _compare(left, right) >= 0}
+
+
+def _constant(value):
+    return lambda lookup: value
+
+
+def _reference(name):
+    return lambda lookup: lookup(name)
+
+
+def _arithmetic(operator, left, right):
+    function = _ARITHMETIC[operator]
+    return lambda lookup: function(_number(left(lookup)),
+                                   _number(right(lookup)))
+
+
+def _comparison(operator, left, right):
+    function = _COMPARISONS[operator]
+    return lambda lookup: function(left(lookup), right(lookup))
+
+
+def _or(left, right):
+    return lambda lookup: to_bool(left(lookup)) or to_bool(right(lookup))
+
+
+def _and(left, right):
+    return lambda lookup: to_bool(left(lookup)) and to_bool(right(lookup))
+
+
+def _not(operand):
+    return lambda lookup: not to_bool(operand(lookup))
+
+
+def _negative(operand):
+    return lambda lookup: -_number(operand(lookup))
+
+
+def _conditional(condition, if_true, if_false):
+    return lambda lookup: if_true(lookup) if to_bool(condition(lookup)) \
+        else if_false(lookup)
+
+
+def _case(subject, cases, default):
+    def evaluate(lookup):
+        value = subject(lookup)
+        for key, result in cases:
+            if _equals(value, key):
+                return result(lookup)
+        if default is None:
+            raise ExpressionEvaluationException(
+                'no case for value "{0}"'.format(value))
+        return default(lookup)
+    return evaluate
+
+
+def _concatenation(parts):
+    return lambda lookup: ''.join(to_string(part(lookup)) for part in parts)
+
+
+class _Parser(object):
+    """
+    Recursive descent parser of an @(...) expression, which builds its
+    closure::
+
+        expression := or ('?' expression ':' expression
+                          | '=' case (','? case)*)?
+        case := word ':' or
+        or := and ('|' and)*
+        and := comparison ('&' comparison)*
+        comparison := sum (('==' | '!=' | '<' | '>' | '<=' | '>=') sum)?
+        sum := product (('+' | '-') product)*
+        product := unary (('*' | '/') unary)*
+        unary := ('!' | '-') unary | atom
+        atom := '@(' expression ')' | '(' expression ')' | $(name) | word
+                | "string"
+    """
+    __slots__ = ('source', 'tokens', 'position', 'references')
+
+    def __init__(self, source, start, end, references):
+        self.source = source
+        self.tokens = []
+        self.position = 0
+        self.references = references
+        position = start
+        while position < end:
+            match = _TOKEN.match(source, position, end)
+            if match is None:
+                if source[position:end].strip():
+                    raise ExpressionSyntaxException(source, position,
+                                                    'unexpected character')
+                break
+            kind = match.lastgroup
+            value = match.group('name' if kind == 'ref' else kind)
+            self.tokens.append((kind, value, match.start(kind)))
+            position = match.end()
+        self.tokens.append(('end', None, end))
+
+    def peek(self):
+        return self.tokens[self.position]
+
+    def next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def accept(self, *operators):
+        kind, value, _ = self.tokens[self.position]
+        if kind == 'operator' and value in operators:
+            self.position += 1
+            return value
+        return None
+
+    def expect(self, operator):
+        if self.accept(operator) is None:
+            raise ExpressionSyntaxException(self.source, self.peek()[2],
+                                            'expected "{0}"'.format(operator))
+
+    def parse(self):
+        """ parse a whole @(...) expression """
+        self.expect('@(')
+        function = self.expression()
+        self.expect(')')
+        if self.peek()[0] != 'end':
+            raise ExpressionSyntaxException(self.source, self.peek()[2],
+                                            'unexpected text')
+        return function
+
+    def expression(self):
+        function = self.disjunction()
+        if self.accept('?'):
+            if_true = self.expression()
+            self.expect(':')
+            return _conditional(function, if_true, self.expression())
+        if self.accept('='):
+            cases = []
+            default = None
+            while True:
+                kind, key, position = self.next()
+                if kind not in ('word', 'string'):
+                    raise ExpressionSyntaxException(self.source, position,
+                                                    'expected a case value')
+                self.expect(':')
+                result = self.disjunction()
+                if kind == 'word' and key.lower() == 'else':
+                    default = result
+                else:
+                    cases.append((key.strip('"'), result))
+                self.accept(',')
+                if self.peek()[0] not in ('word', 'string'):
+                    break
+            return _case(function, cases, default)
+        return function
+
+    def disjunction(self):
+        function = self.conjunction()
+        while self.accept('|'):
+            function = _or(function, self.conjunction())
+        return function
+
+    def conjunction(self):
+        function = self.comparison()
+        while self.accept('&'):
+            function = _and(function, self.comparison())
+        return function
+
+    def comparison(self):
+        function = self.sum()
+        operator = self.accept('==', '!=', '<=', '>=', '<', '>')
+        if operator:
+            function = _comparison(operator, function, self.sum())
+        return function
+
+    def sum(self):
+        function = self.product()
+        operator = self.accept('+', '-')
+        while operator:
+            function = _arithmetic(operator, function, self.product())
+            operator = self.accept('+', '-')
+        return function
+
+    def product(self):
+        function = self.unary()
+        operator = self.accept('*', '/')
+        while operator:
+            function = _arithmetic(operator, function, self.unary())
+            operator = self.accept('*', '/')
+        return function
+
+    def unary(self):
+        if self.accept('!'):
+            return _not(self.unary())
+        if self.accept('-'):
+            return _negative(self.unary())
+        return self.atom()
+
+    def atom(self):
+        kind, value, position = self.next()
+        if kind == 'operator' and value in ('@(', '('):
+            function = self.expression()
+            self.expect(')')
+            return function
+        if kind == 'ref':
+            self.references.add(value)
+            return _reference(value)
+        if kind == 'string':
+            return _constant(value[1:-1])
+        if kind == 'word':
+            number = to_number(value)
+            return _constant(value if number is None else number)
+        raise ExpressionSyntaxException(self.source, position,
+                                        'expected a value')
+
+
+def _closing_parenthesis(source, start):
+    """ position of the parenthesis closing the one at start """
+    depth = 0
+    quoted = False
+    for position in range(start, len(source)):
+        character = source[position]
+        if character == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif character == '(':
+            depth += 1
+        elif character == ')':
+            depth -= 1
+            if depth == 0:
+                return position
+    raise ExpressionSyntaxException(source, start, 'unbalanced parentheses')
+
+
+class Expression(object):
+    """
+    A compiled computed value: a reference, an expression or a text in
+    which references and expressions are substituted
+    """
+    __slots__ = ('source', 'references', 'function')
+
+    def __init__(self, source, references, function):
+        self.source = source
+        """ the value, as written in the ACD """
+        self.references = references
+        """ names the value refers to, e.g. 'gapopen' or
+        'sequence.length' """
+        self.function = function
+        """ closure computing the value, which takes a function returning
+        the value of a name """
+
+    def evaluate(self, values):
+        """
+        Compute the value
+        :param values: values of the names the expression refers to, or a
+        function returning the value of a name
+        :type values: dict
+        """
+        if callable(values):
+            return self.function(values)
+
+        def lookup(name):
+            try:
+                return values[name]
+            except KeyError:
+                raise UndefinedReferenceException(name)
+        return self.function(lookup)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self.source)
+
+
+def compile_expression(source):
+    """
+    Compile a computed value
+    :param source: the value, e.g. "@($(display) == none)"
+    :type source: basestring
+    :rtype: Expression
+    """
+    references = set()
+    parts = []
+    position = 0
+    for match in _COMPUTED.finditer(source):
+        start = match.start()
+        if start < position:
+            # within an expression already compiled
+            continue
+        if start > position:
+            parts.append(_constant(source[position:start]))
+        if source[start] == '$':
+            name = _NAME.match(source, start)
+            if name is None:
+                raise ExpressionSyntaxException(source, start,
+                                                'invalid reference')
+            references.add(name.group(1))
+            parts.append(_reference(name.group(1)))
+            position = name.end()
+        else:
+            end = _closing_parenthesis(source, start + 1) + 1
+            parts.append(_Parser(source, start, end, references).parse())
+            position = end
+    if position < len(source):
+        parts.append(_constant(source[position:]))
+    if len(parts) == 1:
+        function = parts[0]
+    else:
+        function = _concatenation(parts)
+    return Expression(source, frozenset(references), function)
+
+
+def _iter_variables(sections):
+    for section in sections:
+        for variable in _iter_variables(section.subsections):
+            yield variable
+        for variable in section.variables:
+            yield variable
+
+
+class ExpressionGraph(object):
+    """
+    The computed values of an ACD, sorted by dependencies
+    """
+
+    def __init__(self, acd_def):
+        """
+        :param acd_def: the ACD
+        :type acd_def: pyacd.acd.Acd
+        """
+        self.parameters = acd_def.get_index().parameters_by_name
+        """ parameters by name """
+        self.expressions = {}
+        """ compiled expressions, by name of the computed value, i.e.
+        'parameter.attribute' or 'variable' """
+        self.dependencies = {}
+        """ names of the computed values each computed value depends on """
+        compiled = {}
+        value_types = {}
+        for parameter in acd_def.get_index().parameters:
+            for values in (parameter.attributes, parameter.qualifiers):
+                for name, value in values.values.items():
+                    if is_computed(value):
+                        node = '{0}.{1}'.format(parameter.name, name)
+                        if value not in compiled:
+                            compiled[value] = compile_expression(value)
+                        self.expressions[node] = compiled[value]
+                        value_types[node] = values.schema[name]['value_type']
+        for variable in _iter_variables(acd_def.sections):
+            self.expressions[variable.name] = compile_expression(
+                variable.expression)
+        referenced = set(name for expression in self.expressions.values()
+                         for name in expression.references)
+        # parameter values are computed from their defaults when they are
+        # referenced or their default is computed
+        nodes = set(self.expressions)
+        nodes.update(name for name in self.parameters
+                     if name not in self.expressions and
+                     (name in referenced or
+                      name + '.default' in self.expressions))
+        for node in nodes:
+            if node in self.expressions:
+                self.dependencies[node] = sorted(
+                    name for name in self.expressions[node].references
+                    if name in nodes)
+            elif node + '.default' in self.expressions:
+                self.dependencies[node] = [node + '.default']
+            else:
+                self.dependencies[node] = []
+        self.order = self._sort()
+        """ names of the computed values, each one after its
+        dependencies """
+        self.steps = [self._step(node, value_types.get(node))
+                      for node in self.order]
+        """ (name, parameter name, job order key, function, value type)
+        tuples of the resolution pass """
+
+    def _sort(self):
+        order = []
+        states = {}
+        for node in sorted(self.dependencies):
+            if node in states:
+                continue
+            # iterative depth-first search, the path being the nodes being
+            # visited
+            path = [node]
+            pending = [iter(self.dependencies[node])]
+            states[node] = False
+            while pending:
+                for dependency in pending[-1]:
+                    state = states.get(dependency)
+                    if state is None:
+                        states[dependency] = False
+                        path.append(dependency)
+                        pending.append(iter(self.dependencies[dependency]))
+                        break
+                    if state is False:
+                        raise CyclicExpressionException(
+                            path[path.index(dependency):] + [dependency])
+                else:
+                    pending.pop()
+                    states[path[-1]] = True
+                    order.append(path.pop())
+        return order
+
+    def _step(self, node, value_type):
+        name, _, key = node.partition('.')
+        if node in self.expressions:
+            function = self.expressions[node].function
+            if name not in self.parameters:
+                # variable
+                return node, None, None, function, value_type
+            return node, name, key, function, value_type
+        if node + '.default' in self.expressions:
+            return node, name, 'value', _reference(node + '.default'), None
+        return (node, name, 'value', _constant(
+            self.parameters[name].attributes.get_value('default')), None)
+
+    def lookup(self, name, job_order, environment):
+        """
+        Get the value of a name which is not computed, from the job order,
+        then from the environment, then from the attributes and qualifiers
+        of the parameters
+        :param name: the name, e.g. 'sequence.length' or 'acdprotein'
+        :type name: basestring
+        :param job_order: the job order (see pyacd.cli)
+        :type job_order: dict
+        :param environment: values of the names which are not defined in
+        the ACD, e.g. 'acdprotein'
+        :type environment: dict
+        """
+        parameter_name, _, key = name.partition('.')
+        parameter = self.parameters.get(parameter_name) if key else None
+        if parameter is not None:
+            entry = job_order.get(parameter_name)
+            if entry is not None and entry.get(key) is not None:
+                return entry[key]
+        if name in environment:
+            return environment[name]
+        if parameter is not None:
+            for values in (parameter.attributes, parameter.qualifiers):
+                if key in values.schema:
+                    return values.get_value(key)
+        raise UndefinedReferenceException(name)
+
+    def resolve(self, job_order=None, environment=None):
+        """
+        Compute the values of a job
+        :param job_order: the job order, whose values take precedence over
+        the computed ones
+        :type job_order: dict
+        :param environment: values of the names which are not defined in
+        the ACD, e.g. 'acdprotein'
+        :type environment: dict
+        :return: the computed values, and the parameter values they refer
+        to, by name ('parameter.attribute', 'variable' or 'parameter').
+        The defaults of the parameters set in the job order are only
+        computed if another value refers to them.
+        :rtype: dict
+        """
+        job_order = job_order or {}
+        environment = environment or {}
+        values = {}
+        deferred = {}
+
+        def evaluate(node, function, value_type):
+            value = function(lookup)
+            if value_type is not None:
+                value = coerce(value, value_type)
+            values[node] = value
+            return value
+
+        def lookup(name):
+            try:
+                return values[name]
+            except KeyError:
+                pass
+            step = deferred.pop(name, None)
+            if step is not None:
+                return evaluate(*step)
+            return self.lookup(name, job_order, environment)
+
+        for node, name, key, function, value_type in self.steps:
+            if name is not None:
+                entry = job_order.get(name) or {}
+                if entry.get(key) is not None:
+                    values[node] = entry[key]
+                    continue
+                if key == 'default' and entry.get('value') is not None:
+                    # the default is overridden by the job order
+                    deferred[node] = (node, function, value_type)
+                    continue
+            evaluate(node, function, value_type)
+        return values
+
+
+def resolve_computed_values(acd_def, job_order=None, environment=None):
+    """
+    Compute the values of a job (see ExpressionGraph.resolve), with the
+    expression graph of the ACD
+    :param acd_def: the ACD
+    :type acd_def: pyacd.acd.Acd
+    :param job_order: the job order
+    :type job_order: dict
+    :param environment: values of the names which are not defined in the
+    ACD, e.g. 'acdprotein'
+    :type environment: dict
+    :rtype: dict
+    """
+    return acd_def.get_expression_graph().resolve(job_order, environment)
@@ -0,0 +1,115 @@
+"""
+  hand-written parser module for EMBOSS ACD files
+
+  This is a single-pass, regex-driven recursive descent parser for the same
+  grammar as the pyparsing-based :mod:`pyacd.parser` module. It builds the
+  same :class:`pyacd.acd.Acd` object trees, and is selected through
+  ``pyacd.parser.parse_acd(string, engine='fast')``.
+"""
+import re
+
+from pyparsing import ParseException
+
+from .acd import get_parameter, Attribute, Section, Application, Acd, \
+    PARAMETER_CLASSES, Variable
+
+# whitespace and '#' comments, skipped between any two tokens
+_SKIP = r'\s*(?:#[^\n]*(?:\n|\Z)\s*)*'
+
+_HEADER = re.compile(_SKIP + r'([A-Za-z0-9]+)' + _SKIP + r':' + _SKIP +
+                     r'([A-Za-z0-9]+)' + _SKIP + r'\[')
+_KEYWORD = re.compile(_SKIP + r'([A-Za-z0-9]+)' + _SKIP + r':')
+_NAME = re.compile(_SKIP + r'([A-Za-z0-9]+)')
+_ATTRIBUTE = re.compile(_SKIP + r'([A-Za-z0-9]+)' + _SKIP + r':' + _SKIP +
+                        r'"([^"]*)"')
+_CLOSE = re.compile(_SKIP + r'\]')
+_VARIABLE_VALUE = re.compile(_SKIP + r'''(?:"((?:[^"\n\r\\]|""|\\.)*)"|'''
+                             r"""'((?:[^'\n\r\\]|''|\\.)*)')""")
+
+
+def _fail(string, pos, msg):
+    raise ParseException(string, pos, msg)
+
+
+def _parse_header(string, pos, keyword=None):
+    """ parse a '<keyword>: <name> [' block header """
+    match = _HEADER.match(string, pos)
+    if match is None or (keyword is not None and match.group(1) != keyword):
+        _fail(string, pos, 'Expected "{0}: <name> ["'.format(keyword))
+    return match.group(1), match.group(2), match.end()
+
+
+def _parse_attributes(string, pos):
+    """ parse the attributes list of a block up to its closing bracket """
+    attributes = []
+    match_attribute = _ATTRIBUTE.match
+    while True:
+        match = match_attribute(string, pos)
+        if match is None:
+            break
+        attributes.append(Attribute(name=match.group(1),
+                                    value=match.group(2)))
+        pos = match.end()
+    match = _CLOSE.match(string, pos)
+    if match is None:
+        _fail(string, pos, 'Expected "]"')
+    return attributes, match.end()
+
+
+def _parse_section(string, pos):
+    """ parse a section, from its 'section:' keyword to its 'endsection:' """
+    _, name, pos = _parse_header(string, pos, 'section')
+    properties, pos = _parse_attributes(string, pos)
+    children = []
+    while True:
+        match = _KEYWORD.match(string, pos)
+        if match is None:
+            _fail(string, pos, 'Expected "endsection:"')
+        keyword = match.group(1)
+        if keyword == 'endsection':
+            match = _NAME.match(string, match.end())
+            if match is None:
+                _fail(string, pos, 'Expected section name')
+            pos = match.end()
+            break
+        elif keyword == 'section':
+            child, pos = _parse_section(string, pos)
+        elif keyword == 'variable':
+            var_name = _NAME.match(string, match.end())
+            if var_name is None:
+                _fail(string, match.end(), 'Expected variable name')
+            value = _VARIABLE_VALUE.match(string, var_name.end())
+            if value is None:
+                _fail(string, var_name.end(), 'Expected quoted string')
+            child = Variable(var_name.group(1),
+                             value.group(1) if value.group(1) is not None
+                             else value.group(2))
+            pos = value.end()
+        elif keyword in PARAMETER_CLASSES:
+            datatype, param_name, pos = _parse_header(string, pos)
+            attributes, pos = _parse_attributes(string, pos)
+            child = get_parameter(param_name, datatype, attributes)
+        else:
+            _fail(string, pos, 'Unknown datatype "{0}"'.format(keyword))
+        children.append(child)
+    return Section(name, properties=properties, children=children), pos
+
+
+def parse_acd(string):
+    """
+    parse Acd
+
+    Unlike the pyparsing grammar, which silently stops at the first section
+    it cannot match, a malformed section raises a ParseException.
+    """
+    _, name, pos = _parse_header(string, 0, 'application')
+    attributes, pos = _parse_attributes(string, pos)
+    application = Application(name, attributes=attributes)
+    sections = []
+    while True:
+        match = _KEYWORD.match(string, pos)
+        if match is None or match.group(1) != 'section':
+            break
+        section, pos = _parse_section(string, pos)
+        sections.append(section)
+    return Acd(application, sections)
@@ -0,0 +1,159 @@
+"""
+  hand-written parser module for EMBOSS QA files
+
+  QA test items are line oriented, each line starting with a two-letter
+  code. This parser reads them in a single pass, dispatching each line on
+  its code, and builds the same :class:`pyacd.qa.Qa` objects as the
+  pyparsing-based :mod:`pyacd.qaparser` module. It is selected through
+  ``pyacd.qaparser.parse_qa(string, engine='fast')``.
+"""
+from pyparsing import ParseException
+
+from .qa import ApplicationRef, FilePattern, FileGroup, Qa, CommandLine, \
+    InputLine
+
+
+class _QaBuilder(object):
+    """
+    State of the QA test item being parsed
+    """
+    def __init__(self):
+        self.id = None
+        self.uc_lines = []
+        self.application_ref = None
+        self.command_lines = []
+        self.input_lines = []
+        self.file_groups = []
+        self.time_limit = None
+        self.error_code = None
+
+    def build(self):
+        return Qa(self.id, '\n'.join(self.uc_lines) or None,
+                  self.application_ref, command_lines=self.command_lines,
+                  input_lines=self.input_lines, file_groups=self.file_groups,
+                  time_limit=self.time_limit, error_code=self.error_code)
+
+
+def _get_test(string, value):
+    """ parse a '<operator> <value>' file test, e.g. '= 2' """
+    parts = value.split()
+    if len(parts) != 2 or parts[0] not in ('<', '=', '>') or \
+            not parts[1].isdigit():
+        raise ParseException(string, 0, 'invalid file test "{0}"'.format(
+            value))
+    return {'operator': parts[0], 'value': int(parts[1])}
+
+
+def _get_int(string, code, value):
+    """ parse the integer value of a line """
+    try:
+        return int(value)
+    except ValueError:
+        raise ParseException(string, 0, 'invalid {0} value "{1}"'.format(
+            code, value))
+
+
+def _current_file_group(string, builder, code):
+    if not builder.file_groups:
+        raise ParseException(string, 0, '{0} line before any FI line'.format(
+            code))
+    return builder.file_groups[-1]
+
+
+def _parse_id(string, builder, value):
+    builder.id = value.strip()
+
+
+def _parse_uc(string, builder, value):
+    builder.uc_lines.append(value)
+
+
+def _parse_ti(string, builder, value):
+    builder.time_limit = _get_int(string, 'TI', value)
+
+
+def _parse_er(string, builder, value):
+    builder.error_code = _get_int(string, 'ER', value)
+
+
+def _parse_ap(string, builder, value):
+    builder.application_ref = ApplicationRef(value.strip())
+
+
+def _parse_ab(string, builder, value):
+    if builder.application_ref is None:
+        raise ParseException(string, 0, 'AB line before any AP line')
+    builder.application_ref.embassy_package = value.strip()
+
+
+def _parse_cl(string, builder, value):
+    builder.command_lines.append(CommandLine(value))
+
+
+def _parse_in(string, builder, value):
+    builder.input_lines.append(InputLine(value))
+
+
+def _parse_fi(string, builder, value):
+    builder.file_groups.append(FileGroup(value.strip()))
+
+
+def _parse_fc(string, builder, value):
+    _current_file_group(string, builder, 'FC').line_count_test = \
+        _get_test(string, value)
+
+
+def _parse_fz(string, builder, value):
+    _current_file_group(string, builder, 'FZ').size_test = \
+        _get_test(string, value)
+
+
+def _parse_fp(string, builder, value):
+    count, _, pattern = value.partition(' ')
+    if count.isdigit() and pattern:
+        file_pattern = FilePattern(pattern.strip(), int(count))
+    else:
+        file_pattern = FilePattern(value.strip())
+    _current_file_group(string, builder, 'FP').patterns.append(file_pattern)
+
+
+def _ignore(string, builder, value):
+    pass
+
+
+LINE_PARSERS = {
+    'ID': _parse_id,
+    'UC': _parse_uc,
+    'TI': _parse_ti,
+    'ER': _parse_er,
+    'AP': _parse_ap,
+    'AA': _parse_ap,
+    'AQ': _parse_ap,
+    'AB': _parse_ab,
+    'CL': _parse_cl,
+    'IN': _parse_in,
+    'FI': _parse_fi,
+    'FC': _parse_fc,
+    'FZ': _parse_fz,
+    'FP': _parse_fp,
+}
+""" line parsers, by line code; lines with other codes (e.g. CC, RQ, PP,
+DL) are ignored """
+
+
+def parse_qa(string):
+    """ parse a QA test item (one test case for one application)"""
+    builder = _QaBuilder()
+    get_line_parser = LINE_PARSERS.get
+    for line in string.splitlines():
+        line = line.lstrip()
+        if not line or line[0] == '#':
+            continue
+        if line.startswith('//'):
+            break
+        get_line_parser(line[:2], _ignore)(string, builder, line[3:])
+    if builder.id is None:
+        raise ParseException(string, 0, 'missing ID line')
+    if builder.application_ref is None:
+        raise ParseException(string, 0, 'missing AP line')
+    return builder.build()
@@ -0,0 +1,383 @@
+"""
+  SQLite index of ACD catalogues
+
+  :func:`build_sqlite` writes the applications, sections, parameters,
+  attributes and qualifiers of a catalogue (see :mod:`pyacd.columnar`) to
+  indexed tables of a SQLite database, along with a full-text index of the
+  documentation, information, prompt and help texts and the pickled ACDs.
+  :class:`CatalogueIndex` queries the database and returns handles, which
+  load the ACD objects only when they are accessed.
+"""
+import os
+import pickle
+import sqlite3
+import tempfile
+
+from .acd import Relation
+from .columnar import build_tables, format_value
+from .corpus import get_acds
+
+SCHEMA = '''
+CREATE TABLE applications (
+    application TEXT PRIMARY KEY, documentation TEXT, groups TEXT,
+    keywords TEXT, embassy TEXT, sections INTEGER, parameters INTEGER);
+CREATE TABLE application_groups (application TEXT, name TEXT);
+CREATE INDEX application_groups_name ON application_groups (name);
+CREATE TABLE application_keywords (application TEXT, name TEXT);
+CREATE INDEX application_keywords_name ON application_keywords (name);
+CREATE TABLE relations (
+    application TEXT, parameter TEXT, relation TEXT, namespace TEXT,
+    term TEXT, label TEXT);
+CREATE INDEX relations_relation ON relations (relation);
+CREATE INDEX relations_term ON relations (term);
+CREATE TABLE sections (
+    application TEXT, section TEXT, parent TEXT, depth INTEGER,
+    position INTEGER, information TEXT, type TEXT);
+CREATE INDEX sections_application ON sections (application);
+CREATE TABLE parameters (
+    application TEXT, parameter TEXT, datatype TEXT, section TEXT,
+    position INTEGER, io TEXT, is_parameter INTEGER, standard INTEGER,
+    additional INTEGER);
+CREATE INDEX parameters_application ON parameters (application, parameter);
+CREATE INDEX parameters_datatype ON parameters (datatype);
+CREATE TABLE attributes (
+    application TEXT, parameter TEXT, attribute TEXT, value TEXT,
+    is_set INTEGER);
+CREATE INDEX attributes_value ON attributes (attribute, value);
+CREATE INDEX attributes_application ON attributes (application, parameter);
+CREATE TABLE qualifiers (
+    application TEXT, parameter TEXT, qualifier TEXT, value TEXT,
+    is_set INTEGER);
+CREATE INDEX qualifiers_value ON qualifiers (qualifier, value);
+CREATE INDEX qualifiers_application ON qualifiers (application, parameter);
+CREATE TABLE acds (application TEXT PRIMARY KEY, acd BLOB);
+'''
+""" schema of the index, except for the full-text table """
+
+TEXT_FIELDS = ['documentation', 'information', 'prompt', 'help']
+""" attributes of the full-text index """
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _create_text_table(connection):
+    """ create the full-text table, with the best available module """
+    for columns in ['fts5 (application UNINDEXED, parameter UNINDEXED, '
+                    'field UNINDEXED, text)',
+                    'fts4 (application, parameter, field, text, '
+                    'notindexed=application, notindexed=parameter, '
+                    'notindexed=field)']:
+        try:
+            connection.execute('CREATE VIRTUAL TABLE texts USING ' + columns)
+            return
+        except sqlite3.OperationalError:
+            pass
+    # no full-text search module, texts are searched with LIKE
+    connection.execute('CREATE TABLE texts (application TEXT, '
+                       'parameter TEXT, field TEXT, text TEXT)')
+
+
+def _write_index(connection, acds):
+    tables = build_tables(acds)
+    connection.executescript(SCHEMA)
+    _create_text_table(connection)
+    for name in ['sections', 'parameters', 'attributes', 'qualifiers']:
+        table = tables[name]
+        connection.executemany(
+            'INSERT INTO {0} VALUES ({1})'.format(
+                name, ', '.join('?' * len(table.columns))), table.rows())
+    for application, acd_object in sorted(acds.items()):
+        attributes = acd_object.application.attributes
+        values = {name: format_value(attributes.get_value(name)) for name
+                  in ['documentation', 'groups', 'keywords', 'embassy']}
+        connection.executemany(
+            'INSERT INTO application_groups VALUES (?, ?)',
+            [(application, group) for group in _split(values['groups'])])
+        connection.executemany(
+            'INSERT INTO application_keywords VALUES (?, ?)',
+            [(application, keyword) for keyword in
+             _split(values['keywords'])])
+        connection.execute(
+            'INSERT INTO applications VALUES (?, ?, ?, ?, ?, 0, 0)',
+            (application, values['documentation'], values['groups'],
+             values['keywords'], values['embassy']))
+        connection.execute('INSERT INTO acds VALUES (?, ?)',
+                           (application, sqlite3.Binary(pickle.dumps(
+                               acd_object, 2))))
+    connection.execute(
+        'UPDATE applications SET '
+        'sections = (SELECT COUNT(*) FROM sections WHERE '
+        'sections.application = applications.application), '
+        'parameters = (SELECT COUNT(*) FROM parameters WHERE '
+        'parameters.application = applications.application)')
+    relations = []
+    texts = []
+    for application, parameter, attribute, value, _ in \
+            tables['attributes'].rows():
+        if attribute == 'relations':
+            for relation in value.split('\n'):
+                if relation:
+                    parsed = Relation.parse(relation)
+                    relations.append((application, parameter, relation,
+                                      parsed.namespace, parsed.term,
+                                      parsed.label))
+        elif attribute in TEXT_FIELDS and value:
+            texts.append((application, parameter, attribute, value))
+    for application, section, _, _, _, information, _ in \
+            tables['sections'].rows():
+        if information:
+            texts.append((application, '', 'information', information))
+    connection.executemany('INSERT INTO relations VALUES (?, ?, ?, ?, ?, ?)',
+                           relations)
+    connection.executemany('INSERT INTO texts VALUES (?, ?, ?, ?)', texts)
+
+
+def build_sqlite(catalogue, db_path):
+    """
+    Atomically write the SQLite index of a catalogue
+    :param catalogue: the catalogue, or its parsed ACDs as a list or as a
+    dictionary keyed by application name
+    :type catalogue: pyacd.corpus.Catalogue
+    :param db_path: path to the database
+    :type db_path: basestring
+    :return: the index
+    :rtype: CatalogueIndex
+    """
+    acds = get_acds(catalogue)
+    directory = os.path.dirname(os.path.abspath(db_path))
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(tmp_fd)
+    try:
+        connection = sqlite3.connect(tmp_path)
+        try:
+            with connection:
+                _write_index(connection, acds)
+        finally:
+            connection.close()
+        os.rename(tmp_path, db_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return CatalogueIndex(db_path, catalogue=acds)
+
+
+class AcdHandle(object):
+    """
+    Handle on an application of the index, whose ACD is loaded on first
+    access
+    """
+    __slots__ = ('index', 'name', '_acd')
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+        """ name of the application """
+        self._acd = None
+
+    @property
+    def acd(self):
+        """ the parsed ACD """
+        if self._acd is None:
+            self._acd = self.index.get_acd(self.name)
+        return self._acd
+
+    def __eq__(self, other):
+        return isinstance(other, AcdHandle) and other.name == self.name
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return 'AcdHandle({0!r})'.format(self.name)
+
+
+class ParameterHandle(object):
+    """
+    Handle on a parameter of the index, whose ACD is loaded on first access
+    """
+    __slots__ = ('index', 'application', 'name', 'position')
+
+    def __init__(self, index, application, name, position):
+        self.index = index
+        self.application = application
+        """ handle on the application of the parameter """
+        self.name = name
+        """ name of the parameter """
+        self.position = position
+        """ position of the parameter in the ACD """
+
+    @property
+    def parameter(self):
+        """ the parameter """
+        return self.application.acd.get_index().parameters[self.position]
+
+    def __eq__(self, other):
+        return isinstance(other, ParameterHandle) and \
+            (other.application, other.position) == \
+            (self.application, self.position)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.application.name, self.position))
+
+    def __repr__(self):
+        return 'ParameterHandle({0!r}, {1!r})'.format(self.application.name,
+                                                      self.name)
+
+
+class CatalogueIndex(object):
+    """
+    Queries on the SQLite index of a catalogue
+    """
+
+    def __init__(self, db_path, catalogue=None, **connect_args):
+        """
+        :param db_path: path to the database
+        :type db_path: basestring
+        :param catalogue: the catalogue the index was built from, whose
+        ACDs are used instead of the ones stored in the database
+        :type catalogue: pyacd.corpus.Catalogue
+        :param connect_args: arguments of sqlite3.connect, e.g.
+        check_same_thread
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, **connect_args)
+        self.acds = get_acds(catalogue) if catalogue is not None else None
+        self._handles = {}
+
+    def close(self):
+        self.connection.close()
+
+    def execute(self, sql, parameters=()):
+        """
+        Run a query on the index
+        :param sql: the query
+        :type sql: basestring
+        :param parameters: the query parameters
+        :type parameters: tuple
+        :return: the rows
+        :rtype: list
+        """
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def get_acd(self, name):
+        """
+        Load the ACD of an application
+        :param name: the application name
+        :type name: basestring
+        :rtype: pyacd.acd.Acd
+        """
+        if self.acds is not None and name in self.acds:
+            return self.acds[name]
+        rows = self.execute('SELECT acd FROM acds WHERE application = ?',
+                            (name,))
+        if not rows:
+            raise KeyError(name)
+        return pickle.loads(bytes(rows[0][0]))
+
+    def application(self, name):
+        """
+        Get the handle on an application
+        :param name: the application name
+        :type name: basestring
+        :rtype: AcdHandle
+        """
+        try:
+            return self._handles[name]
+        except KeyError:
+            handle = AcdHandle(self, name)
+            self._handles[name] = handle
+            return handle
+
+    def _applications(self, sql, parameters=()):
+        return [self.application(row[0]) for row in
+                self.execute(sql, parameters)]
+
+    def _parameters(self, sql, parameters=()):
+        return [ParameterHandle(self, self.application(application), name,
+                                position)
+                for application, name, position in
+                self.execute(sql, parameters)]
+
+    def applications(self):
+        """ handles on all the applications """
+        return self._applications('SELECT application FROM applications '
+                                  'ORDER BY application')
+
+    def applications_in_group(self, group):
+        """ applications of a group, e.g. 'Alignment:Global' """
+        return self._applications(
+            'SELECT application FROM application_groups WHERE name = ? '
+            'ORDER BY application', (group,))
+
+    def applications_with_keyword(self, keyword):
+        """ applications with a keyword """
+        return self._applications(
+            'SELECT application FROM application_keywords WHERE name = ? '
+            'ORDER BY application', (keyword,))
+
+    def applications_with_relation(self, relation):
+        """ applications whose block has a relation, given as a term, e.g.
+        'EDAM_topic:0091', or as written in ACD files, e.g.
+        'EDAM_topic:0091 Data handling' """
+        return self._applications(
+            "SELECT application FROM relations WHERE (relation = ? OR "
+            "term = ?) AND parameter = '' ORDER BY application",
+            (relation, relation))
+
+    def parameters_with_datatype(self, datatype):
+        """ parameters of a datatype, e.g. 'seqall' """
+        return self._parameters(
+            'SELECT application, parameter, position FROM parameters '
+            'WHERE datatype = ? ORDER BY application, position',
+            (datatype,))
+
+    def parameters_with_attribute(self, attribute, value):
+        """ parameters with an attribute value, e.g. ('knowntype',
+        'sequence'); booleans are written 'Y' or 'N' """
+        return self._parameters(
+            'SELECT parameters.application, parameters.parameter, '
+            'parameters.position FROM attributes JOIN parameters ON '
+            'attributes.application = parameters.application AND '
+            'attributes.parameter = parameters.parameter WHERE '
+            'attributes.attribute = ? AND attributes.value = ? '
+            'ORDER BY parameters.application, parameters.position',
+            (attribute, value))
+
+    def parameters_with_relation(self, relation):
+        """ parameters with a relation, given as a term, e.g.
+        'EDAM_data:2887', or as written in ACD files, e.g.
+        'EDAM_data:2887 Sequence record (nucleic acid)' """
+        return self._parameters(
+            'SELECT parameters.application, parameters.parameter, '
+            'parameters.position FROM relations JOIN parameters ON '
+            'relations.application = parameters.application AND '
+            'relations.parameter = parameters.parameter WHERE '
+            '(relation = ? OR term = ?) ORDER BY parameters.application, '
+            'parameters.position', (relation, relation))
+
+    def search(self, text):
+        """
+        Full-text search of the documentation of the applications and of
+        the information, prompt and help of their sections and parameters
+        :param text: the searched text (a full-text query if SQLite has a
+        full-text search module)
+        :type text: basestring
+        :return: handles on the matching applications
+        :rtype: list
+        """
+        try:
+            return self._applications(
+                'SELECT DISTINCT application FROM texts WHERE texts MATCH ? '
+                'ORDER BY application', (text,))
+        except sqlite3.OperationalError:
+            return self._applications(
+                'SELECT DISTINCT application FROM texts WHERE text LIKE ? '
+                'ORDER BY application', ('%' + text + '%',))
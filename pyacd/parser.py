@@ -3,9 +3,10 @@
 """
 from .acd import get_parameter, Attribute, Section, Application, Acd, \
     PARAMETER_CLASSES, Variable
+from . import fastparser
 from pyparsing import Word, QuotedString, quotedString, Group, ZeroOrMore, \
     oneOf, Suppress,\
-    restOfLine, alphanums, Forward, removeQuotes
+    restOfLine, alphanums, Forward, removeQuotes, ParseException
 
 NAME = Word(alphanums)
 VALUE = QuotedString('"', multiline=True)
@@ -17,7 +18,14 @@ def _get_attribute(tokens):
 ATTRIBUTE.setParseAction(_get_attribute)
 ATTRIBUTES_LIST = Group(ZeroOrMore(ATTRIBUTE)).setResultsName('attributes')
 
-DATATYPE = oneOf(PARAMETER_CLASSES.keys())
+# datatype names are checked when parsing, so that the datatypes
+# definitions are not loaded when importing this module
+DATATYPE = Word(alphanums)
+def _check_datatype(string, location, tokens):
+    """ check that a name is a datatype name """
+    if tokens[0] not in PARAMETER_CLASSES:
+        raise ParseException(string, location, 'unknown datatype')
+DATATYPE.setParseAction(_check_datatype)
 PARAMETER = DATATYPE('datatype') + Suppress(':') + NAME('name') + \
             Suppress('[') + ATTRIBUTES_LIST('properties') + Suppress(']')
 def _get_parameter(token):
@@ -96,6 +104,18 @@ def parse_sections(string):
     results = SECTIONS_LIST.parseString(string)[0]
     return [item for item in results]
 
-def parse_acd(string):
-    """ parse Acd """
+def parse_acd(string, engine='pyparsing'):
+    """
+    parse Acd
+    :param string: contents of the ACD file
+    :type string: basestring
+    :param engine: parsing engine to use, either 'pyparsing' (the grammar
+    defined in this module) or 'fast' (the hand-written parser of the
+    fastparser module)
+    :type engine: basestring
+    """
+    if engine == 'fast':
+        return fastparser.parse_acd(string)
+    elif engine != 'pyparsing':
+        raise ValueError('unknown ACD parsing engine "{0}"'.format(engine))
     return ACD.parseString(string)[0]
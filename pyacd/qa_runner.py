@@ -0,0 +1,442 @@
+"""
+  validation and execution of EMBOSS QA tests
+
+  Validation: each QA test is parsed and its command lines are translated
+  into a job order using the ACD of the tested application. The tests are
+  grouped by application, so that each ACD file is parsed only once, and
+  the groups are validated in parallel in worker processes. Results are
+  yielded as soon as the group of tests they belong to has been validated.
+
+  Execution: each QA test is run in its own temporary directory, with its
+  input lines fed to the standard input of the application and its time
+  limit enforced, and the checks of its output files are evaluated. The
+  tests are run in parallel in worker processes, the longest ones first
+  according to the durations recorded in previous runs.
+"""
+import json
+import os
+import multiprocessing
+import shlex
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import six
+
+from .cli import AmbiguousOptionParseException, \
+    UnknownOptionParseException, MissingValueParseException, \
+    CommandLineParser
+from .parser import parse_acd
+from .qaparser import parse_qa, iter_qa_records
+from .qacheck import check_file_groups
+
+OK = 'ok'
+""" the command lines of the test were translated into a job order """
+UNKNOWN_OPTION = 'unknown option'
+""" an option of the command lines does not belong to any parameter """
+AMBIGUOUS_OPTION = 'ambiguous option'
+""" an option of the command lines belongs to multiple parameters """
+MISSING_VALUE = 'missing value'
+""" the value of the last option of the command lines is missing """
+QA_ERROR = 'qa error'
+""" the QA test cannot be parsed or translated """
+NO_ACD = 'no acd'
+""" the ACD file of the tested application does not exist """
+ACD_ERROR = 'acd error'
+""" the ACD file of the tested application cannot be parsed """
+
+PASSED = 'passed'
+""" the test exited with the expected status and its output files checks
+pass """
+FAILED = 'failed'
+""" the test exited with an unexpected status or its output files checks
+fail """
+TIMED_OUT = 'timed out'
+""" the test was killed after exceeding its time limit """
+NO_EXECUTABLE = 'no executable'
+""" the executable of the tested application does not exist """
+RUN_ERROR = 'run error'
+""" the test could not be run """
+
+DEFAULT_TIME_LIMIT = 60
+""" time limit of the tests without a TI line, in seconds """
+
+_STATUSES = [(UnknownOptionParseException, UNKNOWN_OPTION),
+             (AmbiguousOptionParseException, AMBIGUOUS_OPTION),
+             (MissingValueParseException, MISSING_VALUE)]
+
+
+class ValidationResult(object):
+    """
+    Result of the validation of one QA test
+    """
+    __slots__ = ('test_id', 'application', 'status', 'message', 'seconds')
+
+    def __init__(self, test_id, application, status, message=None,
+                 seconds=0.0):
+        self.test_id = test_id
+        """ QA test id """
+        self.application = application
+        """ name of the tested application """
+        self.status = status
+        """ validation status, e.g. OK or UNKNOWN_OPTION """
+        self.message = message
+        """ error message, if the status is not OK """
+        self.seconds = seconds
+        """ time spent parsing and translating the test """
+
+    def __repr__(self):
+        return 'ValidationResult({0!r}, {1!r}, {2!r})'.format(
+            self.test_id, self.application, self.status)
+
+
+def _get_status(exc):
+    for exception_class, status in _STATUSES:
+        if isinstance(exc, exception_class):
+            return status
+    return QA_ERROR
+
+
+def _validate_group(args):
+    """
+    validate the QA tests of one application in a worker process, parsing
+    its ACD file once
+    """
+    application, acd_path, records, engine = args
+    start = time.time()
+    try:
+        with open(acd_path, 'r') as acd_fh:
+            acd_string = acd_fh.read()
+    except (IOError, OSError):
+        return [ValidationResult(test_id, application, NO_ACD, acd_path)
+                for test_id, _ in records]
+    try:
+        parser = CommandLineParser(parse_acd(acd_string, engine=engine))
+    except Exception as exc:
+        # the time spent parsing the ACD is shared between its tests
+        seconds = (time.time() - start) / len(records)
+        message = '{0}: {1}'.format(exc.__class__.__name__, exc)
+        return [ValidationResult(test_id, application, ACD_ERROR, message,
+                                 seconds)
+                for test_id, _ in records]
+    results = []
+    for test_id, record in records:
+        start = time.time()
+        try:
+            parse_qa(record, engine=engine).parse_command_lines(
+                parser.acd_def, parser=parser)
+            status, message = OK, None
+        except Exception as exc:
+            status, message = _get_status(exc), str(exc)
+        results.append(ValidationResult(test_id, application, status,
+                                        message, time.time() - start))
+    return results
+
+
+def validate_qa_records(records, acd_dir, workers=None, engine='fast'):
+    """
+    Validate QA tests against the ACD files of the tested applications, in
+    parallel
+    :param records: (test id, application name, record text) tuples, as
+    generated by pyacd.qaparser.iter_qa_records
+    :type records: iterable
+    :param acd_dir: directory of the ACD files, e.g. /usr/share/EMBOSS/acd
+    :type acd_dir: basestring
+    :param workers: number of worker processes, defaults to the number of
+    CPUs. With 1 worker, the tests are validated in the current process.
+    :type workers: int
+    :param engine: parsing engine used for both the ACD files and the QA
+    tests (see pyacd.parser.parse_acd and pyacd.qaparser.parse_qa)
+    :type engine: basestring
+    :return: a generator of ValidationResult objects, in no particular
+    order
+    """
+    workers = workers or multiprocessing.cpu_count()
+    groups = {}
+    for test_id, application, record in records:
+        groups.setdefault(application, []).append((test_id, record))
+    # the largest groups are submitted first to balance the load
+    tasks = [(application, os.path.join(acd_dir, (application or '') +
+                                        '.acd'), group_records, engine)
+             for application, group_records in
+             sorted(groups.items(), key=lambda item: -len(item[1]))]
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            for result in _validate_group(task):
+                yield result
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_validate_group, task) for task in tasks]
+        for future in as_completed(futures):
+            for result in future.result():
+                yield result
+
+
+def validate_qa_file(path, acd_dir, workers=None, engine='fast'):
+    """
+    Validate all the tests of a QA database against the ACD files of the
+    tested applications, in parallel
+    :param path: path to the QA database, e.g.
+    /usr/share/EMBOSS/test/qatest.dat
+    :type path: basestring
+    :param acd_dir: directory of the ACD files, e.g. /usr/share/EMBOSS/acd
+    :type acd_dir: basestring
+    :param workers: number of worker processes, defaults to the number of
+    CPUs
+    :type workers: int
+    :param engine: parsing engine (see validate_qa_records)
+    :type engine: basestring
+    :return: a generator of ValidationResult objects, in no particular
+    order
+    """
+    with open(path, 'r') as qa_fh:
+        records = list(iter_qa_records(qa_fh))
+    return validate_qa_records(records, acd_dir, workers=workers,
+                               engine=engine)
+
+
+class RunResult(object):
+    """
+    Result of the execution of one QA test
+    """
+    __slots__ = ('test_id', 'application', 'status', 'errors',
+                 'returncode', 'seconds')
+
+    def __init__(self, test_id, application, status, errors=None,
+                 returncode=None, seconds=0.0):
+        self.test_id = test_id
+        """ QA test id """
+        self.application = application
+        """ name of the tested application """
+        self.status = status
+        """ execution status, e.g. PASSED or TIMED_OUT """
+        self.errors = list(errors or [])
+        """ error messages, e.g. of the failed output files checks """
+        self.returncode = returncode
+        """ exit status of the application """
+        self.seconds = seconds
+        """ duration of the execution of the application """
+
+    def __repr__(self):
+        return 'RunResult({0!r}, {1!r}, {2!r})'.format(
+            self.test_id, self.application, self.status)
+
+
+def get_command(qa_test, bin_dir):
+    """
+    Command running a QA test
+    :param qa_test: the QA test
+    :type qa_test: pyacd.qa.Qa
+    :param bin_dir: directory of the executables of the applications
+    :type bin_dir: basestring
+    :return: the program and its arguments
+    :rtype: list
+    """
+    command_line = ' '.join([cl.command_line for cl in
+                             qa_test.command_lines])
+    return [os.path.join(bin_dir, qa_test.application_ref.name)] + \
+        shlex.split(command_line)
+
+
+if os.name == 'posix':
+    # tests are run in their own session, so that the processes they start
+    # (e.g. from wrapper scripts) are killed with them
+    _SESSION_OPTIONS = {'start_new_session': True} if six.PY3 else \
+        {'preexec_fn': os.setsid}
+else:
+    _SESSION_OPTIONS = {}
+
+
+def _kill(process, killed):
+    """ kill a test which exceeds its time limit, and its children """
+    killed.set()
+    try:
+        if _SESSION_OPTIONS:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        # the processes already exited
+        pass
+
+
+def run_qa_test(qa_test, bin_dir, time_limit=DEFAULT_TIME_LIMIT,
+                keep_dir=False):
+    """
+    Run a QA test in a temporary directory and check its output files
+    :param qa_test: the QA test
+    :type qa_test: pyacd.qa.Qa
+    :param bin_dir: directory of the executables of the applications
+    :type bin_dir: basestring
+    :param time_limit: time limit of the test if it has no TI line, in
+    seconds
+    :type time_limit: int
+    :param keep_dir: keep the temporary directory of the test, instead of
+    removing it once the test has run
+    :type keep_dir: bool
+    :rtype: RunResult
+    """
+    application = qa_test.application_ref.name
+    try:
+        command = get_command(qa_test, bin_dir)
+    except ValueError as exc:
+        return RunResult(qa_test.id, application, RUN_ERROR, [str(exc)])
+    if not os.path.isfile(command[0]):
+        return RunResult(qa_test.id, application, NO_EXECUTABLE,
+                         [command[0]])
+    time_limit = qa_test.time_limit or time_limit
+    stdin = ''.join(line.input_line + '\n' for line in qa_test.input_lines)
+    work_dir = tempfile.mkdtemp(prefix='pyacd-qa-{0}-'.format(qa_test.id))
+    try:
+        with open(os.path.join(work_dir, 'stdout'), 'wb') as stdout, \
+                open(os.path.join(work_dir, 'stderr'), 'wb') as stderr:
+            start = time.time()
+            try:
+                process = subprocess.Popen(command, cwd=work_dir,
+                                           stdin=subprocess.PIPE,
+                                           stdout=stdout, stderr=stderr,
+                                           **_SESSION_OPTIONS)
+            except OSError as exc:
+                return RunResult(qa_test.id, application, RUN_ERROR,
+                                 [str(exc)])
+            killed = threading.Event()
+            timer = threading.Timer(time_limit, _kill, [process, killed])
+            timer.start()
+            try:
+                try:
+                    process.communicate(stdin.encode('utf-8'))
+                except (IOError, OSError):
+                    # the application exited without reading its input
+                    process.wait()
+            finally:
+                timer.cancel()
+            seconds = time.time() - start
+        if killed.is_set():
+            return RunResult(qa_test.id, application, TIMED_OUT,
+                             ['killed after {0} s'.format(time_limit)],
+                             process.returncode, seconds)
+        errors = []
+        expected_returncode = qa_test.error_code or 0
+        if process.returncode != expected_returncode:
+            errors.append('exit status is {0}, expected {1}'.format(
+                process.returncode, expected_returncode))
+        errors.extend(check_file_groups(qa_test.file_groups, work_dir))
+        return RunResult(qa_test.id, application,
+                         FAILED if errors else PASSED, errors,
+                         process.returncode, seconds)
+    finally:
+        if not keep_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _run_qa_test(args):
+    """ run a QA test in a worker process """
+    qa_test, bin_dir, time_limit, keep_dir = args
+    try:
+        return run_qa_test(qa_test, bin_dir, time_limit, keep_dir)
+    except Exception as exc:
+        return RunResult(qa_test.id, qa_test.application_ref.name,
+                         RUN_ERROR, ['{0}: {1}'.format(
+                             exc.__class__.__name__, exc)])
+
+
+def schedule(qa_tests, durations=None):
+    """
+    Order QA tests longest first, so that the longest tests do not end a
+    parallel run
+    :param qa_tests: the QA tests
+    :type qa_tests: list
+    :param durations: durations of the tests in previous runs, in seconds,
+    by test id. Tests without a recorded duration are assumed to last the
+    average recorded duration.
+    :type durations: dict
+    :rtype: list
+    """
+    durations = durations or {}
+    default = sum(durations.values()) / len(durations) if durations else 0
+    return sorted(qa_tests, key=lambda qa_test: -durations.get(qa_test.id,
+                                                              default))
+
+
+def run(qa_tests, workers=None, bin_dir='/usr/bin', durations=None,
+        time_limit=DEFAULT_TIME_LIMIT, keep_dirs=False):
+    """
+    Run QA tests in parallel
+    :param qa_tests: the QA tests
+    :type qa_tests: iterable
+    :param workers: number of worker processes, defaults to the number of
+    CPUs. With 1 worker, the tests are run from the current process.
+    :type workers: int
+    :param bin_dir: directory of the executables of the applications
+    :type bin_dir: basestring
+    :param durations: durations of the tests in previous runs, by test id,
+    used to run the longest tests first (see load_durations)
+    :type durations: dict
+    :param time_limit: time limit of the tests without a TI line, in
+    seconds
+    :type time_limit: int
+    :param keep_dirs: keep the temporary directories of the tests
+    :type keep_dirs: bool
+    :return: a generator of RunResult objects, in order of completion
+    """
+    workers = workers or multiprocessing.cpu_count()
+    tasks = [(qa_test, bin_dir, time_limit, keep_dirs) for qa_test in
+             schedule(list(qa_tests), durations)]
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_qa_test(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # tasks are started in submission order, i.e. longest first
+        futures = [executor.submit(_run_qa_test, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def load_durations(path):
+    """
+    Load the durations of the tests recorded in previous runs
+    :param path: path to the durations file
+    :type path: basestring
+    :return: the durations, in seconds, by test id, empty if the file does
+    not exist
+    :rtype: dict
+    """
+    try:
+        with open(path, 'r') as durations_fh:
+            return json.load(durations_fh)
+    except (IOError, OSError):
+        return {}
+
+
+def save_durations(path, results, durations=None):
+    """
+    Atomically record the durations of the tests of a run
+    :param path: path to the durations file
+    :type path: basestring
+    :param results: the results of the run
+    :type results: iterable
+    :param durations: durations recorded in previous runs, updated with
+    the durations of the run
+    :type durations: dict
+    :return: the updated durations
+    :rtype: dict
+    """
+    durations = dict(durations or {})
+    for result in results:
+        if result.status in (PASSED, FAILED, TIMED_OUT):
+            durations[result.test_id] = result.seconds
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(tmp_fd, 'w') as tmp_fh:
+            json.dump(durations, tmp_fh, indent=1, sort_keys=True)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return durations
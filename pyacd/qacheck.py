@@ -0,0 +1,372 @@
+"""
+  evaluation of the QA tests output files checks
+
+  The checks of a file group (line count, size and patterns) are evaluated
+  in a single pass over the output file, so that large files are read only
+  once whatever the number of patterns: the size is read with os.stat, and
+  the file is read by blocks of complete lines, on which the lines are
+  counted and the patterns, compiled once, are matched. As in the EMBOSS
+  QA tests, the count of a pattern is the number of lines it matches, each
+  line being matched on its own: the patterns which cannot match a newline
+  are searched over whole blocks, the others (e.g. with \\s or [^...]) line
+  by line. Patterns which span multiple lines, i.e. with a newline before
+  their end or the s flag, are matched over a memory map of the file.
+"""
+import mmap
+import os
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+_FLAGS = {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL,
+          'x': re.VERBOSE}
+
+_COMPILED_PATTERNS = {}
+
+_BLOCK_SIZE = 1 << 20
+
+_MAX_LINE_SIZE = 16 << 20
+""" size above which a line is matched by parts rather than read whole """
+
+_NEWLINE = ord('\n')
+
+_NEWLINE_CATEGORIES = frozenset([sre_parse.CATEGORY_SPACE,
+                                 sre_parse.CATEGORY_NOT_WORD,
+                                 sre_parse.CATEGORY_NOT_DIGIT,
+                                 sre_parse.CATEGORY_LINEBREAK])
+""" character classes which contain the newline """
+
+
+class CompiledPattern(object):
+    """
+    A file pattern compiled for matching, and the number of lines it
+    matched
+    """
+    __slots__ = ('file_pattern', 'regex', 'multiline', 'per_line',
+                 'matches')
+
+    def __init__(self, file_pattern):
+        self.file_pattern = file_pattern
+        self.regex, self.multiline, self.per_line = _compile(
+            file_pattern.pattern)
+        self.matches = 0
+
+    @property
+    def count(self):
+        """ expected number of matches, or None if at least one """
+        return getattr(self.file_pattern, 'count', None)
+
+    def check(self):
+        """ error message if the number of matches is not the expected one,
+        None otherwise """
+        count = self.count
+        if count is None and self.matches == 0:
+            return 'pattern {0} not found'.format(self.file_pattern.pattern)
+        if count is not None and self.matches != count:
+            return 'pattern {0} found {1} times instead of {2}'.format(
+                self.file_pattern.pattern, self.matches, count)
+        return None
+
+
+def compile_pattern(pattern):
+    """
+    Compile a QA file pattern, e.g. '/^>OPSD_HUMAN/', into a bytes regular
+    expression
+    :param pattern: the pattern, between slashes and optionally followed by
+    regular expression flags
+    :type pattern: basestring
+    :return: the compiled regular expression and whether it can match
+    across lines
+    :rtype: tuple
+    """
+    return _compile(pattern)[:2]
+
+
+def _walk(items, collected):
+    """ collect the (operator, argument) items of a parsed pattern, those of
+    its subpatterns included """
+    for operator, argument in items:
+        collected.append((operator, argument))
+        if operator != sre_parse.IN:
+            _walk_argument(argument, collected)
+    return collected
+
+
+def _walk_argument(value, collected):
+    if isinstance(value, sre_parse.SubPattern):
+        _walk(value, collected)
+    elif isinstance(value, (list, tuple)):
+        for element in value:
+            _walk_argument(element, collected)
+
+
+def _set_matches_newline(items):
+    """ whether a character set, parsed as IN items, contains the newline """
+    negated = False
+    found = False
+    for operator, argument in items:
+        if operator == sre_parse.NEGATE:
+            negated = True
+        elif operator == sre_parse.LITERAL and argument == _NEWLINE or \
+                operator == sre_parse.RANGE and \
+                argument[0] <= _NEWLINE <= argument[1] or \
+                operator == sre_parse.CATEGORY and \
+                argument in _NEWLINE_CATEGORIES:
+            found = True
+    return found != negated
+
+
+def _is_newline(operator, argument):
+    """ whether an item explicitly matches a newline, e.g. \\n or [\\r\\n] """
+    if operator == sre_parse.LITERAL:
+        return argument == _NEWLINE
+    if operator == sre_parse.IN:
+        return not any(item[0] == sre_parse.NEGATE for item in argument) \
+            and any(item[0] == sre_parse.LITERAL and item[1] == _NEWLINE or
+                    item[0] == sre_parse.RANGE and
+                    item[1][0] <= _NEWLINE <= item[1][1]
+                    for item in argument)
+    return False
+
+
+def _can_match_newline(operator, argument):
+    """ whether an item can match, or depends on, a newline """
+    if operator == sre_parse.LITERAL:
+        return argument == _NEWLINE
+    if operator == sre_parse.NOT_LITERAL:
+        return argument != _NEWLINE
+    if operator == sre_parse.IN:
+        return _set_matches_newline(argument)
+    if operator == sre_parse.AT:
+        # \A and \Z match at the start and the end of each line
+        return argument in (sre_parse.AT_BEGINNING_STRING,
+                            sre_parse.AT_END_STRING)
+    return False
+
+
+def _compile(pattern):
+    """
+    Compile a QA file pattern (see compile_pattern)
+    :return: the compiled regular expression, whether it can match across
+    lines, and whether it must be matched line by line because it can
+    match a newline, e.g. at the end of a line
+    :rtype: tuple
+    """
+    try:
+        return _COMPILED_PATTERNS[pattern]
+    except KeyError:
+        pass
+    body, flags = pattern, 0
+    if pattern.startswith('/') and pattern.count('/') >= 2:
+        body, _, flag_chars = pattern[1:].rpartition('/')
+        for flag_char in flag_chars:
+            flags |= _FLAGS.get(flag_char, 0)
+    regex = re.compile(body.encode('utf-8'), flags | re.MULTILINE)
+    parsed = list(sre_parse.parse(body, flags))
+    # a newline which ends the pattern, before end anchors, only ends the
+    # matched line
+    end = len(parsed)
+    while end and parsed[end - 1][0] == sre_parse.AT and \
+            parsed[end - 1][1] in (sre_parse.AT_END,
+                                   sre_parse.AT_END_STRING):
+        end -= 1
+    if end and _is_newline(*parsed[end - 1]):
+        end -= 1
+    multiline = bool(regex.flags & re.DOTALL) or any(
+        _is_newline(*item) for item in _walk(parsed[:end], []))
+    per_line = not multiline and any(
+        _can_match_newline(*item) for item in _walk(parsed, []))
+    compiled = (regex, multiline, per_line)
+    _COMPILED_PATTERNS[pattern] = compiled
+    return compiled
+
+
+def check_value(test, value, name):
+    """
+    Evaluate a line count or size test
+    :param test: the test, e.g. {'operator': '=', 'value': 2}
+    :type test: dict
+    :param value: the actual value
+    :type value: int
+    :param name: name of the value, for the error message
+    :type name: basestring
+    :return: an error message if the test fails, None otherwise
+    """
+    operator, expected = test['operator'], test['value']
+    if operator == '=' and value == expected or \
+            operator == '<' and value < expected or \
+            operator == '>' and value > expected:
+        return None
+    return '{0} is {1}, expected {2} {3}'.format(name, value, operator,
+                                                 expected)
+
+
+def _count_lines(file_obj):
+    """ count the lines of a file, reading it by blocks """
+    count = 0
+    last_block = b''
+    for block in iter(lambda: file_obj.read(_BLOCK_SIZE), b''):
+        count += block.count(b'\n')
+        last_block = block
+    if last_block and not last_block.endswith(b'\n'):
+        count += 1
+    return count
+
+
+def _iter_blocks(file_obj):
+    """ read a file by blocks of complete lines, lines longer than
+    _MAX_LINE_SIZE being split """
+    remainder = b''
+    for block in iter(lambda: file_obj.read(_BLOCK_SIZE), b''):
+        block = remainder + block
+        end = block.rfind(b'\n') + 1
+        if end:
+            remainder = block[end:]
+            yield block[:end]
+        elif len(block) >= _MAX_LINE_SIZE:
+            remainder = b''
+            yield block
+        else:
+            remainder = block
+    if remainder:
+        yield remainder
+
+
+def _count_matching_lines(regex, block):
+    """ number of lines of a block of complete lines matching a regex which
+    cannot match a newline, searched over the whole block """
+    count = 0
+    position = regex.search(block)
+    while position is not None:
+        count += 1
+        # skip to the next line
+        line_end = block.find(b'\n', position.start()) + 1
+        if not line_end:
+            break
+        position = regex.search(block, line_end)
+    return count
+
+
+def _count_lines_matching(regex, block, first_only=False):
+    """ number of lines of a block of complete lines matching a regex,
+    matched one by one """
+    count = 0
+    start = 0
+    length = len(block)
+    while start < length:
+        end = block.find(b'\n', start) + 1 or length
+        if regex.search(block[start:end]):
+            count += 1
+            if first_only:
+                break
+        start = end
+    return count
+
+
+def _scan_lines(file_obj, patterns):
+    """ count the lines of a file, matching the patterns on each line """
+    count = 0
+    last_block = b''
+    # patterns without an expected count are no longer matched once found
+    pending = [pattern for pattern in patterns if pattern.count is None]
+    counted = [pattern for pattern in patterns if pattern.count is not None]
+    for block in _iter_blocks(file_obj):
+        count += block.count(b'\n')
+        last_block = block
+        if pending:
+            for pattern in pending:
+                if pattern.per_line:
+                    pattern.matches = _count_lines_matching(
+                        pattern.regex, block, first_only=True)
+                elif pattern.regex.search(block):
+                    pattern.matches = 1
+            pending = [pattern for pattern in pending
+                       if pattern.matches == 0]
+        for pattern in counted:
+            if pattern.per_line:
+                pattern.matches += _count_lines_matching(pattern.regex,
+                                                         block)
+            else:
+                pattern.matches += _count_matching_lines(pattern.regex,
+                                                         block)
+    if last_block and not last_block.endswith(b'\n'):
+        count += 1
+    return count
+
+
+def _scan_map(file_obj, patterns):
+    """ match patterns over a memory map of the file """
+    if os.fstat(file_obj.fileno()).st_size == 0:
+        buffer = b''
+    else:
+        buffer = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        for pattern in patterns:
+            if pattern.count is None:
+                pattern.matches = 1 if pattern.regex.search(buffer) else 0
+            else:
+                pattern.matches = sum(1 for _ in
+                                      pattern.regex.finditer(buffer))
+    finally:
+        if buffer:
+            buffer.close()
+
+
+def check_file(file_group, path):
+    """
+    Evaluate the checks of a file group on an output file
+    :param file_group: the file group
+    :type file_group: pyacd.qa.FileGroup
+    :param path: path to the output file
+    :type path: basestring
+    :return: the error messages of the failed checks, empty if all the
+    checks pass
+    :rtype: list
+    """
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return ['file {0} not found'.format(file_group.file)]
+    errors = []
+    if file_group.size_test:
+        errors.append(check_value(file_group.size_test, size, 'size'))
+    patterns = [CompiledPattern(file_pattern) for file_pattern in
+                file_group.patterns]
+    line_patterns = [pattern for pattern in patterns
+                     if not pattern.multiline]
+    map_patterns = [pattern for pattern in patterns if pattern.multiline]
+    if file_group.line_count_test or patterns:
+        with open(path, 'rb') as file_obj:
+            if line_patterns:
+                line_count = _scan_lines(file_obj, line_patterns)
+            elif file_group.line_count_test:
+                line_count = _count_lines(file_obj)
+            if map_patterns:
+                _scan_map(file_obj, map_patterns)
+        if file_group.line_count_test:
+            errors.append(check_value(file_group.line_count_test, line_count,
+                                      'line count'))
+        errors.extend(pattern.check() for pattern in patterns)
+    return ['{0}: {1}'.format(file_group.file, error) for error in errors
+            if error is not None]
+
+
+def check_file_groups(file_groups, directory):
+    """
+    Evaluate the checks of the file groups of a QA test
+    :param file_groups: the file groups
+    :type file_groups: list
+    :param directory: directory of the output files
+    :type directory: basestring
+    :return: the error messages of the failed checks, empty if all the
+    checks pass
+    :rtype: list
+    """
+    errors = []
+    for file_group in file_groups:
+        errors.extend(check_file(file_group,
+                                 os.path.join(directory, file_group.file)))
+    return errors
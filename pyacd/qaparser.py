@@ -1,23 +1,33 @@
 """
   parser module for EMBOSS QA files
 """
-from pyparsing import Optional, Suppress, Word, OneOrMore, ZeroOrMore, \
-    printables, Group, alphanums, alphas, restOfLine, oneOf, nums
+import re
+
+from pyparsing import Optional, Suppress, Word, ZeroOrMore, printables, \
+    Group, restOfLine, oneOf, nums, Regex, ParseException
 from .qa import ApplicationRef, FilePattern, FileGroup, Qa, CommandLine, \
     InputLine
+from . import fastqaparser
+
 
-TEST_ID = Suppress("ID") + Word(alphanums + '-' + '_')('id')
+def _line(code, name):
+    """ a line starting with a code, the rest of the line after the code
+    and its separator being named """
+    return Regex(r'{0}(?:[ \t](?P<{1}>[^\n]*))?$'.format(code, name),
+                 flags=re.MULTILINE)
 
-APPLICATION_REF = oneOf(['AP', 'AA', 'AQ']) + Word(alphas)('appname') + \
+TEST_ID = Suppress("ID") + Word(printables)('id')
+
+APPLICATION_REF = oneOf(['AP', 'AA', 'AQ']) + Word(printables)('appname') + \
                   Optional(
-    Suppress('AB') + Word(alphas)('embassypack'))
+    Suppress('AB') + Word(printables)('embassypack'))
 def _get_application_ref(token):
     return ApplicationRef(token['appname'], token.get('embassypack',None))
 APPLICATION_REF.setParseAction(_get_application_ref)
 
-CL_LINE = Suppress("CL ") + restOfLine('line')
+CL_LINE = _line('CL', 'line')
 def _get_cl_line(token):
-    return CommandLine(token['line'])
+    return CommandLine(token.get('line') or '')
 CL_LINE.setParseAction(_get_cl_line)
 
 CL_LINES = Group(ZeroOrMore(CL_LINE))('cl_lines')
@@ -25,9 +35,10 @@ def _get_cl_lines(token):
     return token['cl_lines']
 CL_LINES.setParseAction(_get_cl_lines)
 
-IN_LINE = Suppress("IN ") + restOfLine('line')
+# input lines may be empty, to accept a default value at a prompt
+IN_LINE = _line('IN', 'line')
 def _get_in_line(token):
-    return InputLine(token['line'])
+    return InputLine(token.get('line') or '')
 IN_LINE.setParseAction(_get_in_line)
 
 IN_LINES = Group(ZeroOrMore(IN_LINE))('in_lines')
@@ -35,20 +46,27 @@ def _get_in_lines(token):
     return token['in_lines']
 IN_LINES.setParseAction(_get_in_lines)
 
-FILE_PATTERN = Suppress("FP") \
-             + Optional(Word(nums))('count') \
-             + Word(printables)('pattern')
+# the patterns may contain spaces, e.g. "FP 0 /Warning: /"
+FILE_PATTERN = Regex(r'FP(?:[ \t]+(?P<count>\d+)(?=[ \t]))?[ \t]+'
+                     r'(?P<pattern>[^\n]*?)[ \t]*$', flags=re.MULTILINE)
 def _get_file_pattern(token):
     return FilePattern(token['pattern'], int(token.get('count')) if
     token.get('count') else None)
 FILE_PATTERN.setParseAction(_get_file_pattern)
 
+# lines with other codes (e.g. CC, RQ, PP, DL) are ignored, as in the
+# fastqaparser module
+OTHER_LINE = Regex(r'(?!(?:ID|UC|TI|ER|AP|AA|AQ|AB|CL|IN|FI|FC|FZ|FP)\b'
+                   r'|//|#)[^\n]+')
+
 FILE_GROUP = Suppress("FI") + Word(printables)('file') \
-             + Optional(Suppress("FC") +  oneOf(['<','=','>'])(
-    'lc_test_operator') + Word(nums)('lc_test_value')) \
-             + Group(ZeroOrMore(FILE_PATTERN))('patterns') \
-             + Optional(Suppress("FZ") + oneOf(['<','=','>'])(
-    'size_test_operator') + Word(nums)('size_test_value'))
+             + ZeroOrMore(
+    Suppress("FC") + oneOf(['<','=','>'])('lc_test_operator')
+    + Word(nums)('lc_test_value')
+    | Suppress("FZ") + oneOf(['<','=','>'])('size_test_operator')
+    + Word(nums)('size_test_value')
+    | FILE_PATTERN('patterns*')
+    | Suppress(OTHER_LINE))
 def _get_file_group(token):
     size_test = None
     if token.get('size_test_operator'):
@@ -68,14 +86,19 @@ def _get_file_groups(token):
     return token['files']
 FILE_GROUPS.setParseAction(_get_file_groups)
 
-TI_LINE = Suppress('TI ') & Word(nums)('time_limit')
+TI_LINE = Suppress('TI') + Word(nums)('time_limit')
 def _get_time_limit(token):
-    return int(token['time_limit'])
+    return int(token[0])
 TI_LINE.setParseAction(_get_time_limit)
 
-UC_LINE = Suppress('UC ') & restOfLine('annotation_line')
+ER_LINE = Suppress('ER') + Word(nums)('error_code')
+def _get_error_code(token):
+    return int(token[0])
+ER_LINE.setParseAction(_get_error_code)
+
+UC_LINE = _line('UC', 'annotation_line')
 def _get_annotation(token):
-    return token.get('annotation_line')
+    return token.get('annotation_line') or ''
 UC_LINE.setParseAction(_get_annotation)
 
 UC_LINES = Group(ZeroOrMore(UC_LINE))('annotation_lines')
@@ -83,14 +106,14 @@ def _get_annotations(token):
     return token['annotation_lines']
 UC_LINES.setParseAction(_get_annotations)
 
-RQ_LINE = Suppress('RQ ') & restOfLine('requirements')
+RQ_LINE = _line('RQ', 'requirements')
 def _get_requirements(token):
-    return token.get('requirements')
+    return token.get('requirements') or ''
 RQ_LINE.setParseAction(_get_requirements)
 
-CC_LINE = Suppress('CC ') & restOfLine('comment_line')
+CC_LINE = _line('CC', 'comment_line')
 def _get_comment(token):
-    return token.get('comment_line')[0]
+    return token.get('comment_line') or ''
 CC_LINE.setParseAction(_get_comment)
 
 CC_LINES = Group(ZeroOrMore(CC_LINE))('comment_lines')
@@ -98,9 +121,9 @@ def _get_comments(token):
     return token['comment_lines']
 CC_LINES.setParseAction(_get_comments)
 
-PP_LINE = Suppress('PP ') & restOfLine('preprocess_line')
+PP_LINE = _line('PP', 'preprocess_line')
 def _get_preprocess(token):
-    return token.get('preprocess_line')[0]
+    return token.get('preprocess_line') or ''
 PP_LINE.setParseAction(_get_preprocess)
 
 PP_LINES = Group(ZeroOrMore(PP_LINE))('preprocess_lines')
@@ -108,23 +131,32 @@ def _get_preprocesss(token):
     return token['preprocess_lines']
 PP_LINES.setParseAction(_get_preprocesss)
 
-
-QA = TEST_ID & \
-     Group(Optional(TI_LINE) & \
-     Optional(Suppress('DL keep')) & \
-     Optional(Suppress('ER ') + Word(nums)('error_code')) & \
-     Optional(RQ_LINE) & \
-     CC_LINES & \
-     PP_LINES & \
-     UC_LINES) & \
-     APPLICATION_REF('appref') & CL_LINES & IN_LINES & FILE_GROUPS
+# the lines of a test item may come in any order, a '//' line ending it
+QA = ZeroOrMore(TEST_ID
+                | TI_LINE('time_limit')
+                | ER_LINE('error_code')
+                | UC_LINE('uc_lines*')
+                | APPLICATION_REF('appref')
+                | CL_LINE('cl_lines*')
+                | IN_LINE('in_lines*')
+                | FILE_GROUP('files*')
+                | Suppress(OTHER_LINE)) \
+     + Optional(Suppress(Regex(r'//[\s\S]*')))
 
 #ignore comment lines
 QA.ignore('#' + restOfLine)
 
-def _get_qa(token):
-    return Qa(token['id'],token.get('uc',None),token['appref'], command_lines=token[
-        'cl_lines'], input_lines=token['in_lines'])
+def _get_qa(string, location, token):
+    if 'id' not in token:
+        raise ParseException(string, 0, 'missing ID line')
+    if 'appref' not in token:
+        raise ParseException(string, 0, 'missing AP line')
+    return Qa(token['id'], '\n'.join(token.get('uc_lines', [])) or None,
+              token['appref'], command_lines=token.get('cl_lines'),
+              input_lines=token.get('in_lines'),
+              file_groups=token.get('files'),
+              time_limit=token.get('time_limit'),
+              error_code=token.get('error_code'))
 QA.setParseAction(_get_qa)
 
 def parse_cl_line(string):
@@ -163,7 +195,72 @@ def parse_cc_line(string):
 def parse_cc_lines(string):
     return CC_LINES.parseString(string)
 
-def parse_qa(string):
-    """ parse a QA test item (one test case for one application)"""
-    return QA.parseString(string)[0]
-
+def parse_qa(string, engine='pyparsing'):
+    """
+    parse a QA test item (one test case for one application)
+    :param string: the QA test item
+    :type string: basestring
+    :param engine: parsing engine to use, either 'pyparsing' (the grammar
+    defined in this module) or 'fast' (the line-oriented parser of the
+    fastqaparser module)
+    :type engine: basestring
+    """
+    if engine == 'fast':
+        return fastqaparser.parse_qa(string)
+    elif engine != 'pyparsing':
+        raise ValueError('unknown QA parsing engine "{0}"'.format(engine))
+    return QA.parseString(string, parseAll=True)[0]
+
+
+def iter_qa_records(file_obj):
+    """
+    split a QA database (e.g. qatest.dat) into its test items, reading it
+    line by line
+    :param file_obj: the QA database file
+    :type file_obj: file
+    :return: a generator of (test id, application name, record text)
+    tuples, the record text excluding its '//' terminator line
+    """
+    lines = []
+    test_id = None
+    app_name = None
+    for line in file_obj:
+        if line.startswith('//'):
+            # blank chunks, e.g. between two '//' lines, are not records
+            if any(text.strip() for text in lines):
+                yield test_id, app_name, ''.join(lines)
+            lines = []
+            test_id = None
+            app_name = None
+            continue
+        if line.startswith('ID '):
+            test_id = line[3:].strip()
+        elif line[:3] in ('AP ', 'AA ', 'AQ '):
+            app_name = line[3:].strip()
+        lines.append(line)
+    if any(text.strip() for text in lines):
+        yield test_id, app_name, ''.join(lines)
+
+def iter_qa(file_obj, applications=None, test_ids=None, engine='pyparsing'):
+    """
+    parse the test items of a QA database (e.g. qatest.dat) one at a time
+    :param file_obj: the QA database file
+    :type file_obj: file
+    :param applications: if provided, only the test items of these
+    applications are parsed
+    :type applications: list
+    :param test_ids: if provided, only the test items with these ids are
+    parsed
+    :type test_ids: list
+    :param engine: parsing engine (see parse_qa)
+    :type engine: basestring
+    :return: a generator of Qa objects
+    """
+    applications = set(applications) if applications is not None else None
+    test_ids = set(test_ids) if test_ids is not None else None
+    for test_id, app_name, record in iter_qa_records(file_obj):
+        if applications is not None and app_name not in applications:
+            continue
+        if test_ids is not None and test_id not in test_ids:
+            continue
+        yield parse_qa(record, engine=engine)
@@ -0,0 +1,190 @@
+"""
+  inverted index of the ontology relations of ACD catalogues
+
+  The relations of the applications and parameters of a catalogue (e.g.
+  EDAM operations, data and formats) are indexed by term, so that the
+  tools which consume or produce a given EDAM data or format are found
+  with a dictionary lookup, e.g.::
+
+      relations = RelationIndex(catalogue)
+      for entry in relations.consumers('EDAM_data:0849'):
+          print(entry.application, entry.parameter)
+"""
+from .acd import Relation, OUTPUT
+from .corpus import get_acds
+
+
+class RelationEntry(object):
+    """
+    An ACD element related to an ontology term
+    """
+    __slots__ = ('application', 'parameter', 'is_output', 'relation')
+
+    def __init__(self, application, parameter, is_output, relation):
+        self.application = application
+        """ name of the application """
+        self.parameter = parameter
+        """ name of the parameter, or None for the application block """
+        self.is_output = is_output
+        """ whether the parameter is an output parameter """
+        self.relation = relation
+        """ the relation """
+
+    def __eq__(self, other):
+        return isinstance(other, RelationEntry) and \
+            (self.application, self.parameter, self.relation) == \
+            (other.application, other.parameter, other.relation)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.application, self.parameter, self.relation))
+
+    def __repr__(self):
+        return 'RelationEntry({0!r}, {1!r}, {2!r})'.format(
+            self.application, self.parameter, str(self.relation))
+
+
+def iter_relations(acd_object):
+    """
+    Iterate over the relations of an ACD
+    :param acd_object: the ACD
+    :type acd_object: pyacd.acd.Acd
+    :return: a generator of RelationEntry objects, for the application
+    block and then for each parameter
+    """
+    name = acd_object.application.name
+    relations = acd_object.application.attributes.get_value('relations')
+    # computed values are not parsed into relations
+    for relation in relations if isinstance(relations, list) else []:
+        yield RelationEntry(name, None, False, relation)
+    for parameter in acd_object.desc_parameters():
+        relations = parameter.attributes.get_value('relations')
+        for relation in relations if isinstance(relations, list) else []:
+            yield RelationEntry(name, parameter.name,
+                                parameter.type == OUTPUT, relation)
+
+
+def _get_term(term):
+    if isinstance(term, Relation):
+        return term.term
+    return term
+
+
+class RelationIndex(object):
+    """
+    Index of the relations of a catalogue, by term
+    """
+
+    def __init__(self, catalogue=None):
+        """
+        :param catalogue: the catalogue to index, or its parsed ACDs as a
+        list or as a dictionary keyed by application name
+        :type catalogue: pyacd.corpus.Catalogue
+        """
+        self.entries = {}
+        """ RelationEntry lists, by term, e.g. 'EDAM_data:0849' """
+        self.labels = {}
+        """ term labels, by term """
+        self._entries_by_name = {}
+        if catalogue is not None:
+            for name, acd_object in get_acds(catalogue).items():
+                self.add(acd_object, name)
+
+    def add(self, acd_object, name=None):
+        """
+        Index the relations of an ACD, replacing the previously indexed
+        ones under the same name
+        :param acd_object: the ACD
+        :type acd_object: pyacd.acd.Acd
+        :param name: the name of the ACD in its catalogue, which is the
+        name of its file and may differ from the application name (by
+        default, the application name)
+        :type name: basestring
+        """
+        if name is None:
+            name = acd_object.application.name
+        self.remove(name)
+        entries = []
+        for entry in iter_relations(acd_object):
+            term = entry.relation.term
+            if term is None:
+                continue
+            self.entries.setdefault(term, []).append(entry)
+            self.labels.setdefault(term, entry.relation.label)
+            entries.append(entry)
+        self._entries_by_name[name] = entries
+
+    def remove(self, name):
+        """
+        Remove the relations of an ACD from the index
+        :param name: the name the ACD was added with
+        :type name: basestring
+        """
+        removed = {}
+        for entry in self._entries_by_name.pop(name, ()):
+            removed.setdefault(entry.relation.term, set()).add(id(entry))
+        for term, entry_ids in removed.items():
+            entries = [entry for entry in self.entries[term]
+                       if id(entry) not in entry_ids]
+            if entries:
+                self.entries[term] = entries
+            else:
+                del self.entries[term]
+                del self.labels[term]
+
+    def update(self, catalogue, changes):
+        """
+        Update the index after a catalogue refresh
+        :param catalogue: the refreshed catalogue
+        :type catalogue: pyacd.corpus.Catalogue
+        :param changes: the changes returned by the refresh
+        :type changes: pyacd.corpus.CatalogueChanges
+        """
+        for name in changes.removed:
+            self.remove(name)
+        for name in changes.added + changes.changed:
+            self.add(catalogue.acds[name], name)
+
+    def lookup(self, term):
+        """
+        Get the elements related to a term
+        :param term: the term, e.g. 'EDAM_data:0849', or a Relation
+        :type term: basestring
+        :return: the RelationEntry objects of the term
+        :rtype: list
+        """
+        return list(self.entries.get(_get_term(term), ()))
+
+    def applications(self, term):
+        """ names of the applications related to a term, through their
+        application block or their parameters """
+        return sorted(set(entry.application for entry in
+                          self.entries.get(_get_term(term), ())))
+
+    def consumers(self, term):
+        """ input parameters related to a term, e.g. an EDAM data or
+        format """
+        return [entry for entry in self.entries.get(_get_term(term), ())
+                if entry.parameter is not None and not entry.is_output]
+
+    def producers(self, term):
+        """ output parameters related to a term, e.g. an EDAM data or
+        format """
+        return [entry for entry in self.entries.get(_get_term(term), ())
+                if entry.is_output]
+
+    def terms(self, namespace=None):
+        """
+        Get the indexed terms
+        :param namespace: only get the terms of a namespace, e.g.
+        'EDAM_operation'
+        :type namespace: basestring
+        :rtype: list
+        """
+        if namespace is None:
+            return sorted(self.entries)
+        prefix = namespace + ':'
+        return sorted(term for term in self.entries
+                      if term.startswith(prefix))
@@ -0,0 +1,368 @@
+"""
+EMBOSS sequence formats and their properties
+"""
+
+SEQUENCE_FORMATS = {
+    'abi': {'try': True,
+            'Nuc': True,
+            'Pro': True,
+            'Feat': False,
+            'Gap': True,
+            'Mset': False,
+            'description': 'ABI trace file',
+            'input': True},
+    'acedb': {'try': True,
+              'Nuc': True,
+              'Pro': True,
+              'Feat': False,
+              'Gap': True,
+              'Mset': False,
+              'description': 'ACEDB sequence format',
+              'input': True,
+              'output': True,
+              'Sngl': False,
+              'Save': False},
+    'asn1': {'Nuc': True,
+             'Pro': True,
+             'Feat': False,
+             'Gap': True,
+             'Mset': False,
+             'description': 'NCBI ASN.1 format',
+             'input': True,
+             'output': True,
+             'Sngl': False,
+             'Save': False},
+    'clustal': {'try': True,
+                'Nuc': True,
+                'Pro': True,
+                'Feat': False,
+                'Gap': True,
+                'Mset': False,
+                'description': 'Clustalw output format',
+                'input': True,
+                'output': True,
+                'Sngl': False,
+                'Save': True},
+    'codata': {'try': True,
+               'Nuc': True,
+               'Pro': True,
+               'Feat': True,
+               'Gap': True,
+               'Mset': False,
+               'description': 'CODATA entry format',
+               'input': True,
+               'output': True,
+               'Sngl': False,
+               'Save': False},
+    'das': {'Nuc': True,
+            'Pro': True,
+            'Feat': False,
+            'Gap': True,
+            'Mset': False,
+            'description': 'DASSEQUENCE DAS any sequence',
+            'input': False,
+            'output': True,
+            'Sngl': False,
+            'Save': False},
+    'dasdna': {'Nuc': True,
+               'Pro': False,
+               'Feat': False,
+               'Gap': True,
+               'Mset': False,
+               'description': 'DASDNA DAS nucleotide-only sequence',
+               'input': False,
+               'output': True,
+               'Sngl': False,
+               'Save': False},
+    'dbid': {'try': False,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': False,
+             'Gap': True,
+             'Mset': False,
+             'description':
+             'FASTA format variant with database name before ID'},
+    'embl': {'try': True,
+             'Nuc': True,
+             'Pro': False,
+             'Feat': True,
+             'Gap': True,
+             'Mset': False,
+             'description': 'EMBL entry format'},
+    'experiment': {'try': True,
+                   'Nuc': True,
+                   'Pro': True,
+                   'Feat': False,
+                   'Gap': True,
+                   'Mset': False,
+                   'description': 'Staden experiment file'},
+    'fasta': {'try': True,
+              'Nuc': True,
+              'Pro': True,
+              'Feat': False,
+              'Gap': True,
+              'Mset': False,
+              'description': 'FASTA format including NCBI-style IDs'},
+    'fastq': {'try': True,
+              'Nuc': True,
+              'Pro': False,
+              'Feat': False,
+              'Gap': False,
+              'Mset': False,
+              'description':
+              'Fastq short read format ignoring quality scores'},
+    'fastq-illumina': {'try': False,
+                       'Nuc': True,
+                       'Pro': False,
+                       'Feat': False,
+                       'Gap': False,
+                       'Mset': False,
+                       'description': 'Fastq Illumina 1.3 short read format'},
+    'fastq-sanger': {'try': False,
+                     'Nuc': True,
+                     'Pro': False,
+                     'Feat': False,
+                     'Gap': False,
+                     'Mset': False,
+                     'description':
+                     'Fastq short read format with Phred quality'},
+    'fastq-solexa': {'try': False,
+                     'Nuc': True,
+                     'Pro': False,
+                     'Feat': False,
+                     'Gap': False,
+                     'Mset': False,
+                     'description':
+                     'Fastq Solexa/Illumina 1.0 short read format'},
+    'fitch': {'try': True,
+              'Nuc': True,
+              'Pro': True,
+              'Feat': False,
+              'Gap': True,
+              'Mset': False,
+              'description': 'Fitch program format'},
+    'gcg': {'try': True,
+            'Nuc': True,
+            'Pro': True,
+            'Feat': False,
+            'Gap': True,
+            'Mset': False,
+            'description': 'GCG sequence format'},
+    'genbank': {'try': True,
+                'Nuc': True,
+                'Pro': False,
+                'Feat': True,
+                'Gap': True,
+                'Mset': False,
+                'description': 'Genbank entry format'},
+    'genpept': {'try': False,
+                'Nuc': False,
+                'Pro': True,
+                'Feat': True,
+                'Gap': True,
+                'Mset': False,
+                'description': 'Refseq protein entry format (alias)'},
+    'gff2': {'try': True,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': True,
+             'Gap': True,
+             'Mset': False,
+             'description': 'GFF feature file with sequence in the header'},
+    'gff3': {'try': True,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': True,
+             'Gap': True,
+             'Mset': False,
+             'description': 'GFF3 feature file with sequence'},
+    'gifasta': {'try': False,
+                'Nuc': True,
+                'Pro': True,
+                'Feat': False,
+                'Gap': True,
+                'Mset': False,
+                'description':
+                'FASTA format including NCBI-style GIs (alias)'},
+    'hennig86': {'try': True,
+                 'Nuc': True,
+                 'Pro': True,
+                 'Feat': False,
+                 'Gap': True,
+                 'Mset': False,
+                 'description': 'Hennig86 output format'},
+    'ig': {'try': False,
+           'Nuc': True,
+           'Pro': True,
+           'Feat': False,
+           'Gap': True,
+           'Mset': False,
+           'description': 'Intelligenetics sequence format'},
+    'igstrict': {'try': True,
+                 'Nuc': True,
+                 'Pro': True,
+                 'Feat': False,
+                 'Gap': True,
+                 'Mset': False,
+                 'description':
+                 'Intelligenetics sequence format strict parser'},
+    'jackkniffer': {'try': True,
+                    'Nuc': True,
+                    'Pro': True,
+                    'Feat': False,
+                    'Gap': True,
+                    'Mset': False,
+                    'description':
+                    'Jackknifer interleaved and non-interleaved formats'},
+    'mase': {'try': False,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': False,
+             'Gap': True,
+             'Mset': False,
+             'description': 'MASE program format'},
+    'mega': {'try': True,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': False,
+             'Gap': True,
+             'Mset': False,
+             'description': 'MEGA interleaved and non-interleaved formats'},
+    'msf': {'try': True,
+            'Nuc': True,
+            'Pro': True,
+            'Feat': False,
+            'Gap': True,
+            'Mset': False,
+            'description': 'GCG MSF (multiple sequence file) file format'},
+    'nbrf': {'try': True,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': True,
+             'Gap': True,
+             'Mset': False,
+             'description': 'NBRF/PIR entry format'},
+    'nexus': {'try': True,
+              'Nuc': True,
+              'Pro': True,
+              'Feat': False,
+              'Gap': True,
+              'Mset': False,
+              'description': 'NEXUS/PAUP interleaved format'},
+    'pdb': {'try': True,
+            'Nuc': False,
+            'Pro': True,
+            'Feat': False,
+            'Gap': False,
+            'Mset': False,
+            'description': 'PDB protein databank format ATOM lines'},
+    'pdbnuc': {'try': False,
+               'Nuc': True,
+               'Pro': False,
+               'Feat': False,
+               'Gap': False,
+               'Mset': False,
+               'description':
+               'PDB protein databank format nucleotide ATOM lines'},
+    'pdbnucseq': {'try': False,
+                  'Nuc': True,
+                  'Pro': False,
+                  'Feat': False,
+                  'Gap': False,
+                  'Mset': False,
+                  'description':
+                  'PDB protein databank format nucleotide SEQRES lines'},
+    'pdbseq': {'try': True,
+               'Nuc': False,
+               'Pro': True,
+               'Feat': False,
+               'Gap': False,
+               'Mset': False,
+               'description': 'PDB protein databank format SEQRES lines'},
+    'pearson': {'try': True,
+                'Nuc': True,
+                'Pro': True,
+                'Feat': False,
+                'Gap': True,
+                'Mset': False,
+                'description':
+                'Plain old FASTA format with IDs not parsed further'},
+    'phylip': {'try': True,
+               'Nuc': True,
+               'Pro': True,
+               'Feat': False,
+               'Gap': True,
+               'Mset': True,
+               'description':
+               'PHYLIP interleaved and non-interleaved formats'},
+    'phylipnon': {'try': False,
+                  'Nuc': True,
+                  'Pro': True,
+                  'Feat': False,
+                  'Gap': True,
+                  'Mset': True,
+                  'description': 'PHYLIP non-interleaved format'},
+    'raw': {'try': True,
+            'Nuc': True,
+            'Pro': True,
+            'Feat': False,
+            'Gap': False,
+            'Mset': False,
+            'description': 'Raw sequence with no non-sequence characters'},
+    'refseqp': {'try': False,
+                'Nuc': False,
+                'Pro': True,
+                'Feat': True,
+                'Gap': True,
+                'Mset': False,
+                'description': 'RefseqP entry format'},
+    'selex': {'try': False,
+              'Nuc': True,
+              'Pro': True,
+              'Feat': False,
+              'Gap': True,
+              'Mset': False,
+              'description': 'SELEX format'},
+    'staden': {'try': False,
+               'Nuc': True,
+               'Pro': True,
+               'Feat': False,
+               'Gap': True,
+               'Mset': True,
+               'description': 'Old Staden package sequence format'},
+    'stockholm': {'try': True,
+                  'Nuc': True,
+                  'Pro': True,
+                  'Feat': False,
+                  'Gap': True,
+                  'Mset': False,
+                  'description': 'Stockholm (pfam) format'},
+    'strider': {'try': True,
+                'Nuc': True,
+                'Pro': True,
+                'Feat': False,
+                'Gap': True,
+                'Mset': False,
+                'description': 'DNA Strider output format'},
+    'swiss': {'try': True,
+              'Nuc': False,
+              'Pro': True,
+              'Feat': True,
+              'Gap': True,
+              'Mset': False,
+              'description': 'SwissProt entry format'},
+    'text': {'try': False,
+             'Nuc': True,
+             'Pro': True,
+             'Feat': False,
+             'Gap': True,
+             'Mset': False,
+             'description': 'Plain text'},
+    'treecon': {'try': True,
+                'Nuc': True,
+                'Pro': True,
+                'Feat': False,
+                'Gap': True,
+                'Mset': False,
+                'description': 'Treecon output format'},
+}
@@ -0,0 +1,193 @@
+"""
+The serialization module converts Acd objects to and from dictionaries of
+JSON-compatible values, and to and from JSON or msgpack documents.
+
+In full mode, the value of every attribute and qualifier of the schema of
+each element is written, defaults included. In compact mode, only the
+values set in the ACD file are written, so that the schema defaults have
+to be known by the reader (e.g. from pyacd/data/datatypes.yml). Loading a
+dictionary rebuilds the objects directly from the typed values, without
+parsing the ACD again.
+"""
+from six.moves import intern
+
+from .acd import Acd, Application, Attribute, Relation, Section, \
+    UnknownAcdPropertyException, Variable, get_parameter
+
+FORMATS = ['json', 'msgpack']
+""" document formats """
+
+
+def _format_value(value):
+    """ JSON-compatible value of an attribute or qualifier """
+    if isinstance(value, list):
+        return [_format_value(item) for item in value]
+    if isinstance(value, tuple):
+        # relations
+        return str(value)
+    return value
+
+
+def _get_values_dict(values, compact):
+    if compact:
+        return {name: _format_value(value) for name, value in
+                values.values.items()}
+    return {name: _format_value(values.get_value(name))
+            for name in values.schema}
+
+
+def _get_section_dict(section, compact):
+    return {'name': section.name,
+            'properties': {prop.name: prop.value for prop in
+                           section.properties},
+            'sections': [_get_section_dict(subsection, compact)
+                         for subsection in section.subsections],
+            'variables': {variable.name: variable.expression
+                          for variable in section.variables},
+            'parameters': [{'name': parameter.name,
+                            'datatype': parameter.datatype,
+                            'attributes': _get_values_dict(
+                                parameter.attributes, compact),
+                            'qualifiers': _get_values_dict(
+                                parameter.qualifiers, compact)}
+                           for parameter in section.parameters]}
+
+
+def acd_to_dict(acd_object, compact=False):
+    """
+    Convert an ACD into a dictionary of JSON-compatible values
+    :param acd_object: the ACD
+    :type acd_object: pyacd.acd.Acd
+    :param compact: write only the attributes and qualifiers set in the ACD
+    file, rather than the values of the whole schemas
+    :type compact: bool
+    :rtype: dict
+    """
+    return {'application': acd_object.application.name,
+            'compact': compact,
+            'attributes': _get_values_dict(
+                acd_object.application.attributes, compact),
+            'sections': [_get_section_dict(section, compact) for section in
+                         acd_object.sections]}
+
+
+def _set_values(values, data, compact, el_name):
+    """
+    Set attribute or qualifier values from their dictionary
+    :param values: the values of the element
+    :type values: pyacd.acd.AttributeValues
+    :param data: JSON-compatible values, by name
+    :type data: dict
+    :param compact: whether the dictionary only holds the values set in the
+    ACD file. Otherwise the values equal to the schema defaults are left
+    unset.
+    :type compact: bool
+    :param el_name: name of the element the values belong to
+    :type el_name: basestring
+    """
+    schema = values.schema
+    for name, value in data.items():
+        try:
+            attribute = schema[name]
+        except KeyError:
+            raise UnknownAcdPropertyException(name, value, el_name)
+        if not compact and value == attribute['default_value']:
+            continue
+        if attribute['value_type'] == 'relations' and \
+                isinstance(value, list):
+            value = [Relation.parse(item) for item in value]
+        values.values[intern(name)] = value
+
+
+def _get_section(data, compact):
+    children = [_get_section(subsection, compact) for subsection in
+                data['sections']]
+    for parameter_data in data['parameters']:
+        parameter = get_parameter(parameter_data['name'],
+                                  parameter_data['datatype'], [])
+        _set_values(parameter.attributes, parameter_data['attributes'],
+                    compact, parameter.name)
+        _set_values(parameter.qualifiers, parameter_data['qualifiers'],
+                    compact, parameter.name)
+        children.append(parameter)
+    children.extend(Variable(name, expression) for name, expression in
+                    data['variables'].items())
+    return Section(data['name'],
+                   [Attribute(name, value) for name, value in
+                    data['properties'].items()], children)
+
+
+def acd_from_dict(data, acd_class=Acd):
+    """
+    Build an ACD from its dictionary (see acd_to_dict)
+    :param data: the dictionary, compact or not
+    :type data: dict
+    :param acd_class: the class of the ACD object to build
+    :type acd_class: type
+    :rtype: pyacd.acd.Acd
+    """
+    compact = data.get('compact', False)
+    application = Application(data['application'])
+    _set_values(application.attributes, data['attributes'], compact,
+                application.name)
+    return acd_class(application, [_get_section(section, compact)
+                                   for section in data['sections']])
+
+
+def get_backend(format):
+    """
+    Get the functions serializing and deserializing JSON-compatible values
+    in a document format
+    :param format: 'json' (with orjson if it is installed) or 'msgpack'
+    (requires the msgpack package)
+    :type format: basestring
+    :return: the (dumps, loads) functions, dumps returning bytes
+    :rtype: tuple
+    """
+    if format == 'json':
+        try:
+            import orjson
+            return orjson.dumps, orjson.loads
+        except ImportError:
+            import json
+
+            def dumps(value):
+                return json.dumps(value, separators=(',', ':')).encode(
+                    'utf-8')
+
+            def loads(data):
+                if isinstance(data, bytes):
+                    data = data.decode('utf-8')
+                return json.loads(data)
+            return dumps, loads
+    if format == 'msgpack':
+        import msgpack
+        return (lambda value: msgpack.packb(value, use_bin_type=True),
+                lambda data: msgpack.unpackb(data, raw=False))
+    raise ValueError('unknown serialization format "{0}"'.format(format))
+
+
+def dumps(acd_object, format='json', compact=False):
+    """
+    Serialize an ACD
+    :param acd_object: the ACD
+    :type acd_object: pyacd.acd.Acd
+    :param format: document format, see get_backend
+    :type format: basestring
+    :param compact: see acd_to_dict
+    :type compact: bool
+    :rtype: bytes
+    """
+    return get_backend(format)[0](acd_to_dict(acd_object, compact))
+
+
+def loads(data, format='json'):
+    """
+    Deserialize an ACD
+    :param data: the serialized ACD, see dumps
+    :type data: bytes
+    :param format: document format, see get_backend
+    :type format: basestring
+    :rtype: pyacd.acd.Acd
+    """
+    return acd_from_dict(get_backend(format)[1](data))
@@ -0,0 +1,340 @@
+"""
+  live reload of ACD catalogues
+
+  A :class:`CatalogueWatcher` refreshes a :class:`pyacd.corpus.Catalogue`
+  from a background thread whenever files of its directory change. On
+  Linux, changes are notified by inotify, through ctypes, so that only the
+  modified files are checked; elsewhere the directory is polled. If the
+  directory is deleted or moved, it is polled until it is back, and then
+  watched again. Since the catalogue replaces its parsed ACDs at once on
+  refresh, readers always see either the previous or the new version of
+  each ACD.
+"""
+import ctypes
+import ctypes.util
+import errno
+import fnmatch
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import warnings
+
+import six
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | \
+    IN_DELETE_SELF | IN_MOVE_SELF
+""" inotify events which trigger a refresh """
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+_LIBC = []
+
+
+def _get_libc():
+    if not _LIBC:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                               use_errno=True)
+            libc.inotify_init1
+            libc.inotify_add_watch
+            libc.inotify_rm_watch
+        except (OSError, AttributeError):
+            libc = None
+        _LIBC.append(libc)
+    return _LIBC[0]
+
+
+def inotify_available():
+    """ whether inotify can be used on this system """
+    return _get_libc() is not None
+
+
+class InotifyEvent(object):
+    """
+    An inotify event
+    """
+    __slots__ = ('wd', 'mask', 'cookie', 'name')
+
+    def __init__(self, wd, mask, cookie, name):
+        self.wd = wd
+        self.mask = mask
+        self.cookie = cookie
+        self.name = name
+
+
+class Inotify(object):
+    """
+    Minimal inotify interface, using the C library through ctypes
+    """
+
+    def __init__(self):
+        libc = _get_libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        """
+        Watch a file or directory
+        :param path: the path
+        :type path: basestring
+        :param mask: the events to watch
+        :type mask: int
+        :return: the watch descriptor
+        :rtype: int
+        """
+        if isinstance(path, six.text_type):
+            path = path.encode(sys.getfilesystemencoding())
+        wd = self._libc.inotify_add_watch(self.fd, path, mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd):
+        """
+        Stop watching a file or directory
+        :param wd: the watch descriptor
+        :type wd: int
+        """
+        if self._libc.inotify_rm_watch(self.fd, wd) < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def read(self, timeout=None):
+        """
+        Read the pending events, waiting for them up to a timeout
+        :param timeout: maximum time to wait for events, in seconds
+        :type timeout: float
+        :return: the events, empty if none was received before the timeout
+        :rtype: list
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError as exc:
+            if exc.errno == errno.EAGAIN:
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append(InotifyEvent(wd, mask, cookie, name.decode(
+                sys.getfilesystemencoding())))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class CatalogueWatcher(object):
+    """
+    Background thread refreshing a catalogue when its files change
+    """
+
+    def __init__(self, catalogue, callback=None, use_inotify=None,
+                 interval=1.0, delay=0.1, error_callback=None):
+        """
+        :param catalogue: the catalogue
+        :type catalogue: pyacd.corpus.Catalogue
+        :param callback: function called with the CatalogueChanges of each
+        refresh which changed the catalogue
+        :type callback: callable
+        :param use_inotify: whether to use inotify, rather than polling the
+        directory, defaults to whether inotify is available
+        :type use_inotify: bool
+        :param interval: polling interval, in seconds, which is also the
+        maximum time to wait for stop() with inotify
+        :type interval: float
+        :param delay: time to wait after a change is notified, to refresh
+        the catalogue once for a batch of changes, in seconds
+        :type delay: float
+        :param error_callback: function called with the exception raised
+        by a refresh from the background thread, which is otherwise issued
+        as a RuntimeWarning
+        :type error_callback: callable
+        """
+        self.catalogue = catalogue
+        self.callback = callback
+        self.error_callback = error_callback
+        if use_inotify is None:
+            use_inotify = inotify_available()
+        self.use_inotify = use_inotify
+        self.interval = interval
+        self.delay = delay
+        self.exception = None
+        """ last exception raised while refreshing the catalogue """
+        self._stopped = threading.Event()
+        self._thread = None
+        self._inotify = None
+        self._wd = None
+
+    def start(self):
+        """
+        Refresh the catalogue and start watching its directory. The
+        exceptions raised by this initial refresh are not caught.
+        """
+        if self.use_inotify:
+            self._inotify = Inotify()
+            # watch before the initial refresh, not to miss changes
+            self._wd = self._inotify.add_watch(self.catalogue.path)
+        changes = self.catalogue.refresh()
+        if changes and self.callback is not None:
+            self.callback(changes)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='pyacd-catalogue-watcher')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop watching the directory
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            self._wd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _refresh(self, paths):
+        try:
+            changes = self.catalogue.refresh(paths)
+        except Exception as exc:
+            self.exception = exc
+            if self.error_callback is not None:
+                self.error_callback(exc)
+            else:
+                warnings.warn('refresh of the catalogue {0} failed: {1}: '
+                              '{2}'.format(self.catalogue.path,
+                                           exc.__class__.__name__, exc),
+                              RuntimeWarning)
+            return
+        if changes and self.callback is not None:
+            self.callback(changes)
+
+    def _get_changed_paths(self, events):
+        """ paths of the catalogue files changed by inotify events, or None
+        if the whole directory must be checked """
+        paths = set()
+        for event in events:
+            if event.mask & IN_Q_OVERFLOW:
+                return None
+            if event.wd != self._wd:
+                # events of a previous watch of the directory
+                continue
+            if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                return None
+            if event.name and fnmatch.fnmatch(event.name,
+                                              self.catalogue.pattern):
+                paths.add(os.path.join(self.catalogue.path, event.name))
+        return paths
+
+    def _watch_lost(self, events):
+        """ whether the directory is no longer watched at its path, once
+        deleted or moved """
+        return any(event.wd == self._wd and event.mask &
+                   (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED)
+                   for event in events)
+
+    def _rewatch(self):
+        """ watch the directory again if it is back, returning whether it
+        is watched """
+        try:
+            self._wd = self._inotify.add_watch(self.catalogue.path)
+        except OSError:
+            return False
+        return True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self._inotify is None:
+                self._stopped.wait(self.interval)
+                if not self._stopped.is_set():
+                    self._refresh(None)
+                continue
+            if self._wd is None:
+                # the directory was deleted or moved: poll until it is back
+                self._stopped.wait(self.interval)
+                if not self._stopped.is_set() and self._rewatch():
+                    self._refresh(None)
+                continue
+            events = self._inotify.read(self.interval)
+            if not events:
+                continue
+            # let the writers finish, and gather their events
+            time.sleep(self.delay)
+            events.extend(self._inotify.read(0))
+            paths = self._get_changed_paths(events)
+            if self._watch_lost(events):
+                # a moved directory is still watched at its new path
+                try:
+                    self._inotify.rm_watch(self._wd)
+                except OSError:
+                    pass
+                self._wd = None
+            if paths is None or paths:
+                self._refresh(paths)
+
+
+def watch(catalogue, callback=None, use_inotify=None, interval=1.0,
+          error_callback=None):
+    """
+    Refresh a catalogue and keep it up to date from a background thread
+    :param catalogue: the catalogue
+    :type catalogue: pyacd.corpus.Catalogue
+    :param callback: function called with the changes of each refresh
+    :type callback: callable
+    :param use_inotify: whether to use inotify, rather than polling
+    :type use_inotify: bool
+    :param interval: polling interval, in seconds
+    :type interval: float
+    :param error_callback: function called with the exceptions raised by
+    the background refreshes
+    :type error_callback: callable
+    :return: the started watcher, to be stopped with its stop() method
+    :rtype: CatalogueWatcher
+    """
+    return CatalogueWatcher(catalogue, callback=callback,
+                            use_inotify=use_inotify,
+                            interval=interval,
+                            error_callback=error_callback).start()
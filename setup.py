@@ -19,7 +19,8 @@ setup(
     install_requires=[
           'pyparsing==2.1.7',
           'ruamel.yaml',
-          'six'
+          'six',
+          'futures; python_version < "3"'
     ],
     license="BSD",
     entry_points={
@@ -0,0 +1,13 @@
+"""
+The tests use a temporary cache directory rather than the user cache
+directory (see pyacd.acd.get_cache_dir), e.g. for the datatypes
+definitions compiled on first use.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+_CACHE_HOME = tempfile.mkdtemp()
+os.environ['XDG_CACHE_HOME'] = _CACHE_HOME
+atexit.register(shutil.rmtree, _CACHE_HOME, True)
@@ -0,0 +1,179 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+import pyacd
+from pyacd import acd
+from pyacd.parser import parse_acd
+
+ACD_STRING = '''
+application: needle [
+  documentation: "Needleman-Wunsch global alignment of two sequences"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+  ]
+
+  seqall: bsequence [
+    parameter: "Y"
+  ]
+
+endsection: input
+
+section: additional [
+  information: "Additional section"
+]
+
+  float: gapopen [
+    standard: "Y"
+  ]
+
+  float: gap [
+    standard: "Y"
+  ]
+
+  float: gapextend [
+    standard: "Y"
+  ]
+
+endsection: additional
+
+section: output [
+  information: "Output section"
+]
+
+  align: outfile [
+    parameter: "Y"
+  ]
+
+endsection: output
+'''
+
+class TestAcdLookups(unittest.TestCase):
+
+    def setUp(self):
+        self.acd = parse_acd(ACD_STRING, engine='fast')
+
+    def test_parameter_by_name(self):
+        self.assertEqual(self.acd.parameter_by_name('gap').name, 'gap')
+        # abbreviations resolve to the longest matching name
+        self.assertEqual(self.acd.parameter_by_name('gape').name,
+                         'gapextend')
+        self.assertEqual(self.acd.parameter_by_name('ga').name, 'gapextend')
+        self.assertEqual(self.acd.parameter_by_name('out').name, 'outfile')
+        self.assertIsNone(self.acd.parameter_by_name('foo'))
+
+    def test_parameter_by_index(self):
+        self.assertEqual([self.acd.parameter_by_index(i).name for i in
+                          range(3)], ['asequence', 'bsequence', 'outfile'])
+        self.assertRaises(IndexError, self.acd.parameter_by_index, 3)
+
+    def test_parameter_by_qualifier_name(self):
+        matches = self.acd.parameter_by_qualifier_name('sbeg')
+        self.assertEqual([(parameter.name, qualifier_name) for
+                          parameter, qualifier_name, _ in matches],
+                         [('asequence', 'sbegin'), ('bsequence', 'sbegin')])
+        self.assertEqual(matches[0][2]['value_type'], 'int')
+        matches = self.acd.parameter_by_qualifier_name('aformat')
+        self.assertEqual([(parameter.name, qualifier_name) for
+                          parameter, qualifier_name, _ in matches],
+                         [('outfile', 'aformat')])
+        self.assertEqual(self.acd.parameter_by_qualifier_name('zzz'), [])
+
+    def test_reindex(self):
+        self.acd.parameter_by_name('gap')
+        self.acd.sections.pop()
+        self.acd.reindex()
+        self.assertIsNone(self.acd.parameter_by_name('outfile'))
+
+class TestAttributeValues(unittest.TestCase):
+
+    def setUp(self):
+        self.acd = parse_acd(ACD_STRING, engine='fast')
+
+    def test_definitions_are_copies(self):
+        asequence = self.acd.parameter_by_name('asequence')
+        bsequence = self.acd.parameter_by_name('bsequence')
+        asequence.attributes['relations']['default_value'].append('x')
+        asequence.attributes['information']['default_value'] = 'x'
+        for parameter in [asequence, bsequence]:
+            self.assertEqual(
+                parameter.attributes['relations']['default_value'], [])
+            self.assertEqual(
+                parameter.attributes['information']['default_value'], '')
+        asequence.attributes.set_value('information', 'set', 'asequence')
+        definition = asequence.attributes['prompt']
+        definition['default_value'] = 'assigned'
+        asequence.attributes['prompt'] = definition
+        self.assertEqual(asequence.attributes.get_value('information'),
+                         'set')
+        self.assertEqual(asequence.attributes['prompt']['default_value'],
+                         'assigned')
+        self.assertFalse(bsequence.attributes.is_set('prompt'))
+
+    def test_delete(self):
+        gapopen = self.acd.parameter_by_name('gapopen')
+        del gapopen.attributes['standard']
+        self.assertNotIn('standard', gapopen.attributes)
+        self.assertNotIn('standard', list(gapopen.attributes))
+        self.assertRaises(KeyError, gapopen.attributes.__delitem__,
+                          'standard')
+        self.assertIn('standard',
+                      self.acd.parameter_by_name('gap').attributes)
+
+class TestLazyLoading(unittest.TestCase):
+
+    def test_import_does_not_load_datatypes(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [os.path.dirname(os.path.dirname(pyacd.__file__))] +
+            [path for path in [env.get('PYTHONPATH')] if path])
+        script = 'import sys, pyacd.parser, pyacd.qaparser; ' \
+                 'sys.exit(int("ruamel.yaml" in sys.modules))'
+        self.assertEqual(subprocess.call([sys.executable, '-c', script],
+                                         env=env), 0)
+
+    def test_parameter_classes(self):
+        self.assertIs(acd.PARAMETER_CLASSES['boolean'],
+                      acd.BooleanParameter)
+        self.assertTrue(issubclass(acd.SeqallParameter, acd.Parameter))
+        self.assertIn('fasta', acd.SEQUENCE_FORMATS)
+        self.assertRaises(AttributeError, getattr, acd, 'FooParameter')
+
+    def test_concurrent_first_access(self):
+        builds = []
+
+        class ParameterClasses(acd.ParameterClasses):
+            def _build_classes(self):
+                builds.append(None)
+                time.sleep(0.05)
+                self._classes = {}
+
+        classes = ParameterClasses()
+        threads = [threading.Thread(target=len, args=(classes,))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(builds), 1)
+
+    def test_schema_aliases(self):
+        # former names of the class-level schemas
+        self.assertIs(acd.SeqallParameter.attributes,
+                      acd.SeqallParameter.attributes_schema)
+        self.assertIs(acd.SeqallParameter.qualifiers,
+                      acd.SeqallParameter.qualifiers_schema)
+        self.assertIn('documentation', acd.Application.attributes)
+        self.assertRaises(AttributeError, setattr, acd.SeqallParameter,
+                          'attributes', {})
+        parameter = acd.get_parameter('asequence', 'seqall', [])
+        self.assertIsInstance(parameter.attributes, acd.AttributeValues)
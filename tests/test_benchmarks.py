@@ -0,0 +1,67 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.suite import Corpus, run_benchmarks, compare_results
+from pyacd.parser import parse_acd
+from pyacd.qaparser import parse_qa, iter_qa_records
+
+
+class TestCorpusGenerator(unittest.TestCase):
+
+    def test_generate(self):
+        generator = CorpusGenerator(sections=2, depth=3, parameters=3,
+                                    attributes=4, qualifiers=3, seed=1)
+        acd_strings, qa_string = generator.generate(4, 3)
+        self.assertEqual(len(acd_strings), 4)
+        acds = {}
+        for name, acd_string in acd_strings.items():
+            acd_object = parse_acd(acd_string)
+            fast_acd_object = parse_acd(acd_string, engine='fast')
+            self.assertEqual(acd_object.application.name, name)
+            self.assertEqual(len(acd_object.desc_sections()), 6)
+            self.assertEqual(len(fast_acd_object.desc_parameters()), 18)
+            acds[name] = fast_acd_object
+        records = list(iter_qa_records(io.StringIO(qa_string)))
+        self.assertEqual(len(records), 12)
+        for _, application, record in records:
+            for engine in ['pyparsing', 'fast']:
+                qa_test = parse_qa(record, engine=engine)
+                # command lines are valid for the generated ACDs
+                qa_test.parse_command_lines(acds[application])
+
+    def test_seed(self):
+        self.assertEqual(CorpusGenerator(seed=2).generate(2, 2),
+                         CorpusGenerator(seed=2).generate(2, 2))
+        self.assertNotEqual(CorpusGenerator(seed=2).generate(2, 2),
+                            CorpusGenerator(seed=3).generate(2, 2))
+
+    def test_write(self):
+        directory = tempfile.mkdtemp()
+        try:
+            qa_path = CorpusGenerator().write(directory, 3, 2)
+            self.assertEqual(qa_path, os.path.join(directory, 'test',
+                                                   'qatest.dat'))
+            self.assertEqual(len(os.listdir(os.path.join(directory, 'acd'))),
+                             3)
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_run(self):
+        corpus = Corpus(CorpusGenerator(), 2, 3)
+        results = run_benchmarks(corpus, 1, only='parse_command_lines.*')
+        self.assertEqual(sorted(results), ['parse_command_lines.compiled',
+                                           'parse_command_lines.generic'])
+        self.assertEqual(results['parse_command_lines.generic']['count'], 6)
+        baseline = {name: dict(result, per_second=result['per_second'] * 2)
+                    for name, result in results.items()}
+        self.assertTrue(all(regression for _, _, _, _, regression in
+                            compare_results(results, baseline, 0.1)))
+        self.assertFalse(any(regression for _, _, _, _, regression in
+                             compare_results(results, results, 0.1)))
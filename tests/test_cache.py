@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyacd import cache
+
+ACD_STRING = '''
+application: seqret [
+  documentation: "Read and write (return) sequences"
+  relations: "EDAM_operation:1813 Sequence retrieval"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  seqall: sequence [
+    parameter: "Y"
+    type: "gapany"
+  ]
+
+endsection: input
+'''
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.acd_path = os.path.join(self.tmp_dir, 'seqret.acd')
+        with open(self.acd_path, 'w') as acd_fh:
+            acd_fh.write(ACD_STRING)
+        self.parse_acd = cache.parse_acd
+
+    def tearDown(self):
+        cache.parse_acd = self.parse_acd
+        shutil.rmtree(self.tmp_dir)
+
+    def _disable_parsing(self):
+        def fail(string, engine=None):
+            raise AssertionError('ACD should have been loaded from cache')
+        cache.parse_acd = fail
+
+    def test_warm_load(self):
+        cold = cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        self._disable_parsing()
+        warm = cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        self.assertEqual(warm.application.name, 'seqret')
+        self.assertEqual([p.name for p in warm.desc_parameters()],
+                         [p.name for p in cold.desc_parameters()])
+        self.assertEqual(warm.parameter_by_name('sequence').__class__,
+                         cold.parameter_by_name('sequence').__class__)
+
+    def test_invalidation(self):
+        cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        with open(self.acd_path, 'w') as acd_fh:
+            acd_fh.write(ACD_STRING.replace('seqret', 'seqretsplit'))
+        reloaded = cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        self.assertEqual(reloaded.application.name, 'seqretsplit')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_corrupted_entry(self):
+        cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as cache_fh:
+                cache_fh.write(b'garbage')
+        reloaded = cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        self.assertEqual(reloaded.application.name, 'seqret')
+        self._disable_parsing()
+        cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+
+    def test_engines(self):
+        engines = []
+
+        def parse_acd(string, engine=None):
+            engines.append(engine)
+            return self.parse_acd(string, engine=engine)
+        cache.parse_acd = parse_acd
+        for engine in ['pyparsing', 'fast', 'pyparsing', 'fast']:
+            cache.load_acd(self.acd_path, cache_dir=self.cache_dir,
+                           engine=engine)
+        # each engine has its own cache entry
+        self.assertEqual(engines, ['pyparsing', 'fast'])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_unwritable_cache(self):
+        # the cache directory cannot be created under a file
+        cache_dir = os.path.join(self.acd_path, 'cache')
+        acd_object = cache.load_acd(self.acd_path, cache_dir=cache_dir)
+        self.assertEqual(acd_object.application.name, 'seqret')
+
+    def test_clear_cache(self):
+        cache.load_acd(self.acd_path, cache_dir=self.cache_dir)
+        cache.clear_cache(self.cache_dir)
+        self.assertEqual(os.listdir(self.cache_dir), [])
@@ -0,0 +1,115 @@
+import unittest
+
+from pyacd.parser import parse_acd
+from pyacd.cli import parse_command_line, parse_command_lines, tokenize, \
+    AmbiguousOptionParseException, UnknownOptionParseException, \
+    MissingValueParseException
+
+ACD_STRING = '''
+application: needle [
+  documentation: "Needleman-Wunsch global alignment of two sequences"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+  ]
+
+  seqall: bsequence [
+    parameter: "Y"
+  ]
+
+endsection: input
+
+section: additional [
+  information: "Additional section"
+]
+
+  float: gapopen [
+    standard: "Y"
+  ]
+
+  boolean: endweight [
+    additional: "Y"
+  ]
+
+endsection: additional
+
+section: output [
+  information: "Output section"
+]
+
+  align: outfile [
+    parameter: "Y"
+  ]
+
+endsection: output
+'''
+
+class TestParseCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.acd = parse_acd(ACD_STRING, engine='fast')
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('a.fa  -gapopen=10 -auto'),
+                         ['a.fa', '-gapopen', '10', '-auto'])
+
+    def test_positional_parameters(self):
+        job_order = parse_command_line(self.acd, ['a.fa', 'b.fa', 'out.txt',
+                                                  '-auto'])
+        self.assertEqual(job_order, {'asequence': {'value': 'a.fa'},
+                                     'bsequence': {'value': 'b.fa'},
+                                     'outfile': {'value': 'out.txt'}})
+        job_order = parse_command_line(self.acd, ['-bsequence', 'b.fa',
+                                                  'a.fa'])
+        self.assertEqual(job_order, {'asequence': {'value': 'a.fa'},
+                                     'bsequence': {'value': 'b.fa'}})
+
+    def test_named_parameters(self):
+        job_order = parse_command_line(self.acd, '-gapo=10 -endweight')
+        self.assertEqual(job_order, {'gapopen': {'value': '10'},
+                                     'endweight': {'value': True}})
+        job_order = parse_command_line(self.acd, ['-noendweight'])
+        self.assertEqual(job_order, {'endweight': {'value': False}})
+
+    def test_qualifiers(self):
+        job_order = parse_command_line(self.acd, ['a.fa', '-sbegin2', '5',
+                                                  '-aformat', 'pair'])
+        self.assertEqual(job_order, {'asequence': {'value': 'a.fa'},
+                                     'bsequence': {'value': None,
+                                                   'sbegin': '5'},
+                                     'outfile': {'value': None,
+                                                 'aformat': 'pair'}})
+        job_order = parse_command_line(self.acd, ['-sreverse', '-noaglobal'])
+        self.assertEqual(job_order['asequence']['sreverse'], True)
+        self.assertEqual(job_order['bsequence']['sreverse'], True)
+        self.assertEqual(job_order['outfile']['aglobal'], False)
+
+    def test_input_lines(self):
+        job_order = parse_command_line(self.acd, ['a.fa'],
+                                       input_lines=['b.fa', '10'])
+        self.assertEqual(job_order['bsequence'], {'value': 'b.fa'})
+        self.assertEqual(job_order['gapopen'], {'value': '10'})
+
+    def test_errors(self):
+        self.assertRaises(UnknownOptionParseException, parse_command_line,
+                          self.acd, ['-foo', 'bar'])
+        self.assertRaises(AmbiguousOptionParseException, parse_command_line,
+                          self.acd, ['-s', '5'])
+        self.assertRaises(MissingValueParseException, parse_command_line,
+                          self.acd, ['-gapopen'])
+        self.assertRaises(UnknownOptionParseException, parse_command_line,
+                          self.acd, ['a.fa', 'b.fa', 'out.txt', 'extra'])
+        # qualifiers are numbered from 1
+        self.assertRaises(UnknownOptionParseException, parse_command_line,
+                          self.acd, ['-sbegin0', '5'])
+
+    def test_batch(self):
+        job_orders = parse_command_lines(self.acd, (['a{0}.fa'.format(i)]
+                                                    for i in range(3)))
+        self.assertEqual([job_order['asequence']['value'] for job_order in
+                          job_orders], ['a0.fa', 'a1.fa', 'a2.fa'])
@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyacd.parser import parse_acd
+from pyacd.cli import CommandLineParser, AmbiguousOptionParseException, \
+    UnknownOptionParseException, MissingValueParseException
+from pyacd.codegen import compile_parser, generate_source
+from pyacd.qa import Qa, CommandLine, ApplicationRef
+
+ACD_STRING = '''
+application: needle [
+  documentation: "Needleman-Wunsch global alignment of two sequences"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+  ]
+
+  seqall: bsequence [
+    parameter: "Y"
+  ]
+
+endsection: input
+
+section: additional [
+  information: "Additional section"
+]
+
+  float: gapopen [
+    standard: "Y"
+  ]
+
+  boolean: endweight [
+    additional: "Y"
+  ]
+
+endsection: additional
+
+section: output [
+  information: "Output section"
+]
+
+  align: outfile [
+    parameter: "Y"
+  ]
+
+endsection: output
+'''
+
+COMMAND_LINES = [
+    'a.fa b.fa out.txt -auto',
+    '-bsequence b.fa a.fa',
+    '-gapo=10 -endweight',
+    '-noendweight',
+    'a.fa -sbegin2 5 -aformat pair',
+    '-sreverse -noaglobal',
+    '-sbegin0 5 -stdout',
+    '-s 5',
+    '-foo bar',
+    '-gapopen',
+    'a.fa b.fa out.txt extra',
+]
+
+
+class TestCodegen(unittest.TestCase):
+
+    def setUp(self):
+        self.acd = parse_acd(ACD_STRING, engine='fast')
+        self.parser = compile_parser(self.acd)
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def parse(self, parser, command_line):
+        try:
+            return parser.parse(command_line)
+        except Exception as exc:
+            return type(exc), str(exc)
+
+    def test_same_job_orders(self):
+        parser = CommandLineParser(self.acd)
+        for command_line in COMMAND_LINES:
+            self.assertEqual(self.parse(self.parser, command_line),
+                             self.parse(parser, command_line))
+        # every accepted option spelling resolves the same way
+        for name in self.parser.options:
+            command_line = ['-' + name, 'value']
+            self.assertEqual(self.parse(self.parser, command_line),
+                             self.parse(parser, command_line))
+
+    def test_options(self):
+        options = self.parser.options
+        self.assertEqual(options['gapo'], ((('gapopen', 'value'),), True,
+                                           None))
+        self.assertEqual(options['noendweight'],
+                         ((('endweight', 'value'),), False, False))
+        self.assertEqual(options['sbegin2'], ((('bsequence', 'sbegin'),),
+                                              True, None))
+        self.assertEqual(options['aut'], ((), False, None))
+        self.assertNotIn('s', options)
+
+    def test_errors(self):
+        self.assertRaises(UnknownOptionParseException, self.parser.parse,
+                          ['-foo', 'bar'])
+        self.assertRaises(AmbiguousOptionParseException, self.parser.parse,
+                          ['-s', '5'])
+        self.assertRaises(MissingValueParseException, self.parser.parse,
+                          ['-gapopen'])
+        self.assertRaises(UnknownOptionParseException, self.parser.parse,
+                          ['-sbegin0', '5'])
+        self.assertNotIn('sbegin0', self.parser.options)
+
+    def test_input_lines(self):
+        job_order = self.parser.parse(['a.fa'], input_lines=['b.fa', '', '1'])
+        self.assertEqual(job_order, {'asequence': {'value': 'a.fa'},
+                                     'bsequence': {'value': 'b.fa'},
+                                     'endweight': {'value': '1'}})
+
+    def test_qa(self):
+        qa_test = Qa('needle-ex', 'needle', ApplicationRef('needle'),
+                     command_lines=[CommandLine('a.fa b.fa -gapo 10')])
+        self.assertEqual(qa_test.parse_command_lines(self.acd, self.parser),
+                         {'asequence': {'value': 'a.fa'},
+                          'bsequence': {'value': 'b.fa'},
+                          'gapopen': {'value': '10'}})
+
+    def test_cache(self):
+        parser = compile_parser(self.acd, cache_dir=self.cache_dir)
+        self.assertTrue(os.path.basename(parser.path).startswith('needle-'))
+        with open(parser.path) as source_fh:
+            self.assertEqual(source_fh.read(), generate_source(self.acd))
+        # the cached module is loaded rather than generated
+        with open(parser.path, 'a') as source_fh:
+            source_fh.write('\nOPTIONS = {}\n')
+        self.assertEqual(compile_parser(self.acd, cache_dir=self.cache_dir)
+                         .options, {})
+        # a different ACD is cached separately
+        other_acd = parse_acd(ACD_STRING.replace('gapopen', 'gapextend'),
+                              engine='fast')
+        other_parser = compile_parser(other_acd, cache_dir=self.cache_dir)
+        self.assertNotEqual(other_parser.path, parser.path)
+        self.assertIn('gapextend', other_parser.options)
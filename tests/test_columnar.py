@@ -0,0 +1,114 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyacd.parser import parse_acd
+from pyacd.columnar import build_tables, export_tables
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ACD_STRING = '''
+application: seqret [
+  documentation: "Read and write (return) sequences"
+  groups: "Data retrieval, Edit"
+  relations: "EDAM_topic:0091 Data handling"
+  relations: "EDAM_operation:0335 Format conversion"
+]
+
+section: input [
+  information: "Input section"
+  type: "page"
+]
+
+  seqall: sequence [
+    parameter: "Y"
+    nullok: "Y"
+  ]
+
+endsection: input
+
+section: output [
+  information: "Output section"
+  type: "page"
+]
+
+  seqoutall: outseq [
+    parameter: "Y"
+  ]
+
+endsection: output
+'''
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.acds = {'seqret': parse_acd(ACD_STRING, engine='fast')}
+        self.tables = build_tables(self.acds)
+
+    def test_build_tables(self):
+        self.assertEqual(list(self.tables['applications'].rows()),
+                         [('seqret', 'Read and write (return) sequences',
+                           'Data retrieval, Edit', '', 2, 2)])
+        self.assertEqual(list(self.tables['sections'].rows()),
+                         [('seqret', 'input', '', 0, 0, 'Input section',
+                           'page'),
+                          ('seqret', 'output', '', 0, 1, 'Output section',
+                           'page')])
+        self.assertEqual(list(self.tables['parameters'].rows()),
+                         [('seqret', 'sequence', 'seqall', 'input', 0,
+                           'input', True, False, False),
+                          ('seqret', 'outseq', 'seqoutall', 'output', 1,
+                           'output', True, False, False)])
+        attributes = {(row[1], row[2]): row[3:] for row in
+                      self.tables['attributes'].rows()}
+        self.assertEqual(attributes[('sequence', 'nullok')], ('Y', True))
+        self.assertEqual(attributes[('outseq', 'nullok')], ('N', False))
+        self.assertEqual(attributes[('', 'relations')],
+                         ('EDAM_topic:0091 Data handling\n'
+                          'EDAM_operation:0335 Format conversion', True))
+        qualifiers = set(row[2] for row in self.tables['qualifiers'].rows()
+                         if row[1] == 'sequence')
+        self.assertTrue('sbegin' in qualifiers)
+
+    def test_csv(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            paths = export_tables(self.acds, tmp_dir, 'csv')
+            self.assertEqual(len(paths), 5)
+            with open(os.path.join(tmp_dir, 'parameters.csv')) as csv_fh:
+                rows = list(csv.reader(csv_fh))
+            self.assertEqual(rows[0][:3],
+                             ['application', 'parameter', 'datatype'])
+            self.assertEqual(rows[1][:3], ['seqret', 'sequence', 'seqall'])
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertRaises(ValueError, export_tables, self.acds, tmp_dir,
+                          'xls')
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        parameters = self.tables['parameters'].to_numpy()
+        attributes = self.tables['attributes'].to_numpy()
+        nullok = attributes[(attributes['attribute'] == 'nullok') &
+                            (attributes['value'] == 'Y')]
+        seqall = parameters[parameters['datatype'] == 'seqall']
+        self.assertEqual(list(numpy.intersect1d(seqall['parameter'],
+                                                nullok['parameter'])),
+                         ['sequence'])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_arrow(self):
+        table = self.tables['parameters'].to_arrow()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column('datatype').to_pylist(),
+                         ['seqall', 'seqoutall'])
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from pyacd import main
+from pyacd.parser import parse_acd
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ACD_STRING = '''
+application: {0} [
+  documentation: "Test application {0}"
+  relations: "EDAM_operation:0292 Sequence alignment"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+    relations: "EDAM_data:0849 Sequence record"
+  ]
+
+  float: gapopen [
+    standard: "Y"
+    minimum: "0.0"
+  ]
+
+endsection: input
+'''
+
+QA_STRING = '''ID {0}-ex
+AP {0}
+CL a.fa -gapopen 10
+//
+ID {0}-bad
+AP {0}
+CL a.fa -foo
+//
+'''
+
+
+class TestCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ['needle', 'water']:
+            with open(os.path.join(self.directory, name + '.acd'),
+                      'w') as acd_fh:
+                acd_fh.write(ACD_STRING.format(name))
+        with open(os.path.join(self.directory, 'broken.acd'), 'w') as acd_fh:
+            acd_fh.write('application: broken [')
+        self.output = os.path.join(self.directory, 'output')
+        self.stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        # compiled parsers are cached in the user cache directory
+        self.cache_home = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.directory, 'cache')
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+        if self.cache_home is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.cache_home
+        shutil.rmtree(self.directory)
+
+    def read_output(self):
+        with open(self.output) as output_fh:
+            return [json.loads(line) for line in output_fh]
+
+    def write_file(self, name, string):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as input_fh:
+            input_fh.write(string)
+        return path
+
+    def test_parse(self):
+        for workers in ['1', '2']:
+            status = main(['parse', self.directory, '-o', self.output,
+                           '--workers', workers])
+            self.assertEqual(status, 1)
+            records = self.read_output()
+            self.assertEqual([record['application'] for record in records],
+                             ['broken', 'needle', 'water'])
+            self.assertIn('error', records[0])
+            self.assertEqual(records[1], parse_acd(
+                ACD_STRING.format('needle'), engine='fast').to_dict(
+                    compact=True))
+        self.assertEqual(records[1]['attributes']['relations'],
+                         ['EDAM_operation:0292 Sequence alignment'])
+        parameter = records[1]['sections'][0]['parameters'][1]
+        self.assertEqual(parameter, {'name': 'gapopen', 'datatype': 'float',
+                                     'attributes': {'standard': True,
+                                                    'minimum': 0.0},
+                                     'qualifiers': {}})
+
+    def test_translate(self):
+        path = self.write_file('command_lines.txt',
+                               'a.fa -gapopen 10\n-foo\n\n' * 400)
+        acd_path = os.path.join(self.directory, 'needle.acd')
+        for options in [['-j', '1'], ['-j', '2'], ['-j', '1', '--compiled']]:
+            status = main(['translate', acd_path, path, '-o',
+                           self.output] + options)
+            self.assertEqual(status, 1)
+            records = self.read_output()
+            self.assertEqual(len(records), 1200)
+            self.assertEqual([record['line'] for record in records],
+                             list(range(1, 1201)))
+            self.assertEqual(records[0]['job_order'],
+                             {'asequence': {'value': 'a.fa'},
+                              'gapopen': {'value': '10'}})
+            self.assertIn('UnknownOptionParseException', records[1]['error'])
+            self.assertEqual(records[2]['job_order'], {})
+            self.assertEqual(records[1198], dict(records[1], line=1199))
+
+    def test_validate(self):
+        qa_path = self.write_file('qatest.dat', QA_STRING.format('needle') +
+                                  QA_STRING.format('water'))
+        status = main(['validate', qa_path, self.directory, '-o',
+                       self.output, '-j', '1', '--profile'])
+        self.assertEqual(status, 1)
+        statuses = {record['test_id']: record['status'] for record in
+                    self.read_output()}
+        self.assertEqual(statuses, {'needle-ex': 'ok',
+                                    'needle-bad': 'unknown option',
+                                    'water-ex': 'ok',
+                                    'water-bad': 'unknown option'})
+        profile = json.loads(sys.stderr.getvalue())
+        self.assertEqual(profile['stages']['validate']['count'], 4)
+        self.assertEqual(profile['stages']['write']['count'], 4)
+
+    def test_success(self):
+        path = self.write_file('command_lines.txt', 'a.fa\n')
+        self.assertEqual(main(['translate', os.path.join(
+            self.directory, 'needle.acd'), path, '-o', self.output]), 0)
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        main(['parse', self.directory, '-o', self.output, '--format',
+              'msgpack', '-j', '1'])
+        with open(self.output, 'rb') as output_fh:
+            records = list(msgpack.Unpacker(output_fh, raw=False))
+        self.assertEqual(len(records), 3)
+
+    @unittest.skipIf(msgpack is not None, 'msgpack is installed')
+    def test_missing_msgpack(self):
+        self.assertEqual(main(['parse', self.directory, '--format',
+                               'msgpack']), 2)
+        self.assertIn('msgpack', sys.stderr.getvalue())
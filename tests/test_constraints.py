@@ -0,0 +1,167 @@
+import unittest
+import warnings
+
+from pyacd.parser import parse_acd
+from pyacd.constraints import JobOrderValidator, validate_job_orders
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ACD = '''
+application: sweep [
+  documentation: "Test application"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+  ]
+
+  integer: window [
+    standard: "Y"
+    minimum: "1"
+    maximum: "100"
+    default: "10"
+  ]
+
+  integer: shift [
+    additional: "Y"
+    minimum: "$(window)"
+    default: "1"
+  ]
+
+  float: threshold [
+    additional: "Y"
+    minimum: "0.0"
+    maximum: "1.0"
+  ]
+
+  array: weights [
+    additional: "Y"
+    size: "3"
+    minimum: "0.0"
+  ]
+
+  array: offsets [
+    additional: "Y"
+    sumtest: "N"
+  ]
+
+endsection: input
+'''
+
+
+def job(**values):
+    return {name: {'value': value} for name, value in values.items()}
+
+
+class TestConstraints(unittest.TestCase):
+
+    use_numpy = False
+
+    def setUp(self):
+        self.validator = JobOrderValidator(parse_acd(ACD, engine='fast'),
+                                           use_numpy=self.use_numpy)
+
+    def get_violations(self, *job_orders):
+        return [sorted((violation.parameter, violation.constraint)
+                       for violation in violations)
+                for violations in self.validator.validate_batch(job_orders)]
+
+    def test_table(self):
+        table = self.validator.table
+        self.assertEqual(table.names, ['window', 'shift', 'threshold'])
+        self.assertEqual(table.minimum[:1], [1])
+        # computed and default limits are not checked
+        self.assertEqual(table.minimum[1], float('-inf'))
+        self.assertEqual(table.maximum[1], float('inf'))
+        self.assertEqual(table.integer, [True, True, False])
+        weights, offsets = table.arrays
+        self.assertEqual((weights.size, weights.sum, weights.tolerance),
+                         (3, 1.0, 0.01))
+        self.assertIsNone(offsets.sum)
+
+    def test_valid(self):
+        self.assertEqual(self.get_violations(
+            job(window='10', threshold=0.5, weights='0.2 0.3 0.5',
+                offsets='-1,4'),
+            job(sequence='in.fasta'),
+            {}), [[], [], []])
+
+    def test_scalars(self):
+        self.assertEqual(self.get_violations(
+            job(window='0', threshold='0.5'),
+            job(window=101, threshold=1.5),
+            job(window='2.5', threshold='high'),
+            job(shift='-1000')),
+            [[('window', 'minimum')],
+             [('threshold', 'maximum'), ('window', 'maximum')],
+             [('threshold', 'type'), ('window', 'type')],
+             []])
+
+    def test_arrays(self):
+        self.assertEqual(self.get_violations(
+            job(weights='0.5 0.5'),
+            job(weights='0.5 0.6 0.1'),
+            job(weights='-0.5 0.5 1.0'),
+            job(weights='0.5 x 0.5'),
+            job(weights=[0.5, 0.25, 0.25], offsets='5 5')),
+            [[('weights', 'size')],
+             [('weights', 'sum')],
+             [('weights', 'minimum')],
+             [('weights', 'type')],
+             []])
+
+    def test_non_finite(self):
+        self.assertEqual(self.get_violations(
+            job(window='nan', threshold='nan'),
+            job(window='inf', threshold='-inf'),
+            job(window='1e400'),
+            job(window='1.5'),
+            job(window='5', threshold='0.5')),
+            [[('threshold', 'type'), ('window', 'type')],
+             [('threshold', 'type'), ('window', 'type')],
+             [('window', 'type')],
+             [('window', 'type')],
+             []])
+        # with a value which is not a number either
+        self.assertEqual(self.get_violations(
+            job(window='nan'), job(window='x'), job(window='inf')),
+            [[('window', 'type')]] * 3)
+
+    def test_non_finite_arrays(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertEqual(self.get_violations(
+                job(weights='nan 0.5 0.5'),
+                job(weights='0.5 inf -inf'),
+                job(weights=[0.5, 0.5, float('nan')], offsets='1e400 1'),
+                job(weights='0.2 0.3 0.5', offsets='nan')),
+                [[('weights', 'type')],
+                 [('weights', 'type')],
+                 [('offsets', 'type'), ('weights', 'type')],
+                 [('offsets', 'type')]])
+
+    def test_messages(self):
+        violations = self.validator.validate(job(window='0'))
+        self.assertEqual([str(violation) for violation in violations],
+                         ['window: 0 is below the minimum 1'])
+        self.assertEqual(violations[0].value, '0')
+
+    def test_validate_job_orders(self):
+        violations = validate_job_orders(self.validator.acd_def,
+                                         [job(window='1000'), job()])
+        self.assertEqual(len(violations), 2)
+        self.assertEqual(violations[0][0].constraint, 'maximum')
+        self.assertEqual(violations[1], [])
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestConstraintsNumpy(TestConstraints):
+
+    use_numpy = True
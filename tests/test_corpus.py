@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyacd.corpus import load_directory, Catalogue
+
+ACD_TEMPLATE = '''
+application: {0} [
+  documentation: "Test application {0}"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  seqall: sequence [
+    parameter: "Y"
+  ]
+
+endsection: input
+'''
+
+class TestLoadDirectory(unittest.TestCase):
+
+    def setUp(self):
+        self.acd_dir = tempfile.mkdtemp()
+        for name in ['app1', 'app2', 'app3']:
+            with open(os.path.join(self.acd_dir, name + '.acd'), 'w') as fh:
+                fh.write(ACD_TEMPLATE.format(name))
+        with open(os.path.join(self.acd_dir, 'broken.acd'), 'w') as fh:
+            fh.write(ACD_TEMPLATE.format('broken').replace('seqall',
+                                                           'unknown'))
+
+    def tearDown(self):
+        shutil.rmtree(self.acd_dir)
+
+    def check_results(self, acds, errors):
+        self.assertEqual(sorted(acds.keys()), ['app1', 'app2', 'app3'])
+        self.assertEqual(acds['app2'].application.name, 'app2')
+        self.assertEqual(list(errors.keys()),
+                         [os.path.join(self.acd_dir, 'broken.acd')])
+
+    def test_load_serial(self):
+        self.check_results(*load_directory(self.acd_dir, workers=1,
+                                           engine='fast'))
+
+    def test_load_parallel(self):
+        self.check_results(*load_directory(self.acd_dir, workers=2,
+                                           engine='fast'))
+
+
+class TestCatalogue(unittest.TestCase):
+
+    def setUp(self):
+        self.acd_dir = tempfile.mkdtemp()
+        for name in ['app1', 'app2', 'app3']:
+            self.write(name, ACD_TEMPLATE.format(name))
+
+    def tearDown(self):
+        shutil.rmtree(self.acd_dir)
+
+    def write(self, name, contents):
+        path = os.path.join(self.acd_dir, name + '.acd')
+        with open(path, 'w') as fh:
+            fh.write(contents)
+        return path
+
+    def test_refresh(self):
+        catalogue = Catalogue(self.acd_dir, engine='fast', workers=1)
+        changes = catalogue.refresh()
+        self.assertEqual(changes.added, ['app1', 'app2', 'app3'])
+        self.assertFalse(catalogue.refresh())
+        app1 = catalogue.acds['app1']
+        self.write('app2', ACD_TEMPLATE.format('app2').replace(
+            'Test application', 'Changed application'))
+        os.remove(os.path.join(self.acd_dir, 'app3.acd'))
+        self.write('app4', ACD_TEMPLATE.format('app4'))
+        broken_path = self.write('broken', ACD_TEMPLATE.format(
+            'broken').replace('seqall', 'unknown'))
+        changes = catalogue.refresh()
+        self.assertEqual(changes.added, ['app4'])
+        self.assertEqual(changes.changed, ['app2'])
+        self.assertEqual(changes.removed, ['app3'])
+        self.assertEqual(list(changes.errors.keys()), [broken_path])
+        self.assertEqual(sorted(catalogue.acds.keys()),
+                         ['app1', 'app2', 'app4'])
+        self.assertEqual(list(catalogue.errors.keys()), [broken_path])
+        # unchanged files are not parsed again
+        self.assertTrue(catalogue.acds['app1'] is app1)
+        self.assertEqual(catalogue.acds['app2'].application.attributes[
+            'documentation']['default_value'], 'Changed application app2')
+
+    def test_touched_file(self):
+        catalogue = Catalogue(self.acd_dir, engine='fast', workers=1)
+        catalogue.refresh()
+        app1 = catalogue.acds['app1']
+        path = os.path.join(self.acd_dir, 'app1.acd')
+        os.utime(path, (0, 0))
+        self.assertFalse(catalogue.refresh())
+        self.assertTrue(catalogue.acds['app1'] is app1)
+        self.assertEqual(catalogue.manifest[path].mtime, 0)
+
+    def test_state(self):
+        state_path = os.path.join(self.acd_dir, 'catalogue.pickle')
+        catalogue = Catalogue(self.acd_dir, engine='fast', workers=1,
+                              state_path=state_path)
+        catalogue.refresh()
+        catalogue = Catalogue(self.acd_dir, engine='fast', workers=1,
+                              state_path=state_path)
+        self.assertEqual(sorted(catalogue.acds.keys()),
+                         ['app1', 'app2', 'app3'])
+        self.write('app1', ACD_TEMPLATE.format('app1') + '\n')
+        self.assertEqual(catalogue.refresh().changed, ['app1'])
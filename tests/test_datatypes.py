@@ -0,0 +1,46 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from pyacd import datatypes
+
+class TestDatatypes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.compiled_path = os.path.join(self.tmp_dir, 'datatypes.pickle')
+        # datatypes definitions compiled on first use are written to the
+        # cache directory
+        self.cache_home = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.tmp_dir, 'cache')
+
+    def tearDown(self):
+        if self.cache_home is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.cache_home
+        shutil.rmtree(self.tmp_dir)
+
+    def test_compiled_datatypes(self):
+        datatypes.compile_datatypes(self.compiled_path)
+        self.assertEqual(datatypes.load_compiled_datatypes(self.compiled_path),
+                         datatypes.load_yaml_datatypes())
+        self.assertEqual(datatypes.load_datatypes(),
+                         datatypes.load_datatypes(use_compiled=False))
+        self.assertTrue(os.path.exists(
+            datatypes.get_cached_datatypes_path()) or
+            os.path.exists(datatypes.COMPILED_DATATYPES_PATH))
+        self.assertTrue(datatypes.get_cached_datatypes_path().startswith(
+            self.tmp_dir))
+
+    def test_outdated_compiled_datatypes(self):
+        with open(self.compiled_path, 'wb') as compiled_fh:
+            pickle.dump({'digest': 'outdated', 'datatypes': {}}, compiled_fh)
+        self.assertIsNone(
+            datatypes.load_compiled_datatypes(self.compiled_path))
+
+    def test_missing_compiled_datatypes(self):
+        self.assertIsNone(
+            datatypes.load_compiled_datatypes(self.compiled_path))
@@ -0,0 +1,194 @@
+import pickle
+import unittest
+
+from pyacd.expressions import CyclicExpressionException, \
+    ExpressionEvaluationException, ExpressionSyntaxException, \
+    UndefinedReferenceException, compile_expression, resolve_computed_values
+from pyacd.parser import parse_acd
+
+ACD_STRING = '''
+application: needle [
+  documentation: "Needleman-Wunsch global alignment of two sequences"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+    type: "any"
+  ]
+
+  seqall: bsequence [
+    parameter: "Y"
+    type: "@($(asequence.protein) ? stopprotein : nucleotide)"
+  ]
+
+endsection: input
+
+section: additional [
+  information: "Additional section"
+]
+
+  variable: gapdefault "@($(acdprotein) ? 10.0 : 15.0)"
+
+  float: gapopen [
+    additional: "Y"
+    minimum: "0.0"
+    default: "$(gapdefault)"
+  ]
+
+  float: gapextend [
+    additional: "Y"
+    default: "@($(gapopen) / 20)"
+    maximum: "$(gapopen)"
+  ]
+
+  integer: window [
+    additional: "Y"
+    default: "@($(asequence.length) / 2)"
+  ]
+
+endsection: additional
+'''
+
+
+class TestExpressions(unittest.TestCase):
+
+    def test_evaluate(self):
+        values = {'display': 'none', 'protein': 'Y', 'length': '10',
+                  'type': 'P', 'dual': False}
+        for source, expected in [
+                ('$(length)', '10'),
+                ('@($(display) == none)', True),
+                ('@($(display) != NONE)', False),
+                ('@($(protein) ? 0.5 : 1.0)', 0.5),
+                ('@( $(dual) ? 2 : 4)', 4),
+                ('@(!$(protein))', False),
+                ('@($(dual) == N)', True),
+                ('@($(length) / 2)', 5),
+                ('@($(length) / 4)', 2.5),
+                ('@(-$(length) + 3 * 2)', -4),
+                ('@(($(length) > 5) & !$(dual))', True),
+                ('@($(length) <= 5 | $(dual))', False),
+                ('@(@($(length) + 1) >= 11)', True),
+                ('@($(type) = p: protein, n: nucleotide, else: any)',
+                 'protein'),
+                ('@($(display) = data: D else: "no display")', 'no display'),
+                ('$(length).txt', '10.txt'),
+                ('plain', 'plain')]:
+            self.assertEqual(compile_expression(source).evaluate(values),
+                             expected, source)
+
+    def test_references(self):
+        expression = compile_expression(
+            '@($(sequence.length) > $(window) ? $(window) : 1)')
+        self.assertEqual(expression.references,
+                         frozenset(['sequence.length', 'window']))
+
+    def test_errors(self):
+        for source in ['@($(a) ==)', '@($(a)', '$(', '@(#)', '@($(a) ? 1)']:
+            with self.assertRaises(ExpressionSyntaxException):
+                compile_expression(source)
+        with self.assertRaises(UndefinedReferenceException):
+            compile_expression('$(missing)').evaluate({})
+        for source in ['@($(a) + 1)', '@($(a) ? 1 : 2)', '@(1 / 0)',
+                       '@($(a) = b: 1)']:
+            with self.assertRaises(ExpressionEvaluationException):
+                compile_expression(source).evaluate({'a': 'word'})
+
+
+class TestExpressionGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.acd_def = parse_acd(ACD_STRING, engine='fast')
+
+    def test_order(self):
+        graph = self.acd_def.get_expression_graph()
+        self.assertIs(self.acd_def.get_expression_graph(), graph)
+        order = graph.order
+        for node, dependencies in graph.dependencies.items():
+            for dependency in dependencies:
+                self.assertLess(order.index(dependency), order.index(node))
+        self.assertEqual(graph.dependencies['gapextend.maximum'],
+                         ['gapopen'])
+        self.assertEqual(graph.dependencies['gapopen'], ['gapopen.default'])
+        self.acd_def.reindex()
+        self.assertIsNot(self.acd_def.get_expression_graph(), graph)
+
+    def test_resolve(self):
+        values = resolve_computed_values(
+            self.acd_def, {'asequence': {'value': 'a.fa', 'length': 300,
+                                         'protein': True}},
+            environment={'acdprotein': True})
+        self.assertEqual(values['gapdefault'], 10.0)
+        self.assertEqual(values['gapopen'], '10.0')
+        self.assertEqual(values['gapextend.maximum'], 10.0)
+        self.assertEqual(values['gapextend'], '0.5')
+        self.assertEqual(values['window'], '150')
+        self.assertEqual(values['bsequence.type'], 'stopprotein')
+
+    def test_job_order_precedence(self):
+        values = resolve_computed_values(
+            self.acd_def, {'asequence': {'value': 'a.fa', 'length': 10},
+                           'gapopen': {'value': '20'},
+                           'bsequence': {'value': 'b.fa', 'type': 'dna'}},
+            environment={'acdprotein': False})
+        self.assertEqual(values['gapdefault'], 15.0)
+        self.assertEqual(values['gapopen'], '20')
+        self.assertEqual(values['gapextend.maximum'], 20.0)
+        self.assertEqual(values['gapextend'], '1')
+        self.assertEqual(values['bsequence.type'], 'dna')
+
+    def test_overridden_default(self):
+        # the default of window refers to asequence.length, which is unset
+        values = resolve_computed_values(
+            self.acd_def, {'window': {'value': '5'},
+                           'asequence': {'value': 'a.fa'}},
+            environment={'acdprotein': True, 'asequence.protein': True})
+        self.assertEqual(values['window'], '5')
+        self.assertNotIn('window.default', values)
+        graph = parse_acd(ACD_STRING.replace(
+            '"@($(gapopen) / 20)"', '"@($(gapopen.default) / 20)"'),
+            engine='fast').get_expression_graph()
+        values = graph.resolve({'gapopen': {'value': '20'},
+                                'window': {'value': '5'}},
+                               environment={'acdprotein': False,
+                                            'asequence.protein': False})
+        self.assertEqual(values['gapopen.default'], '15.0')
+        self.assertEqual(values['gapextend'], '0.75')
+
+    def test_environment_precedence(self):
+        values = resolve_computed_values(
+            self.acd_def, {'asequence': {'value': 'a.fa', 'length': 10,
+                                         'protein': False}},
+            environment={'acdprotein': False, 'asequence.length': 300,
+                         'asequence.protein': True})
+        self.assertEqual(values['window'], '5')
+        self.assertEqual(values['bsequence.type'], 'nucleotide')
+        values = resolve_computed_values(
+            self.acd_def, {'asequence': {'value': 'a.fa'}},
+            environment={'acdprotein': False, 'asequence.length': 300,
+                         'asequence.protein': True})
+        self.assertEqual(values['window'], '150')
+        self.assertEqual(values['bsequence.type'], 'stopprotein')
+
+    def test_undefined(self):
+        with self.assertRaises(UndefinedReferenceException):
+            self.acd_def.get_expression_graph().resolve(
+                {'asequence': {'value': 'a.fa', 'length': 10}})
+
+    def test_cycle(self):
+        acd_def = parse_acd(ACD_STRING.replace('"$(gapdefault)"',
+                                               '"$(gapextend)"'),
+                            engine='fast')
+        with self.assertRaises(CyclicExpressionException):
+            acd_def.get_expression_graph()
+
+    def test_pickle(self):
+        self.acd_def.get_expression_graph()
+        acd_def = pickle.loads(pickle.dumps(self.acd_def))
+        self.assertEqual(
+            acd_def.get_expression_graph().order,
+            self.acd_def.get_expression_graph().order)
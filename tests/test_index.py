@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyacd.parser import parse_acd
+from pyacd.index import build_sqlite, CatalogueIndex
+
+ACD_TEMPLATE = '''
+application: {0} [
+  documentation: "{1}"
+  groups: "Data retrieval, Edit"
+  keywords: "{0} keyword"
+  relations: "EDAM_topic:0091 Data handling"
+]
+
+section: input [
+  information: "Input section"
+  type: "page"
+]
+
+  seqall: sequence [
+    parameter: "Y"
+    relations: "EDAM_data:0849 Sequence record"
+  ]
+
+endsection: input
+
+section: output [
+  information: "Output section"
+  type: "page"
+]
+
+  outfile: outfile [
+    parameter: "Y"
+    knowntype: "{0} output"
+    help: "Output file of the {0} report"
+  ]
+
+endsection: output
+'''
+
+class TestCatalogueIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'catalogue.db')
+        self.acds = {
+            'seqret': parse_acd(ACD_TEMPLATE.format(
+                'seqret', 'Read and write sequences'), engine='fast'),
+            'infoseq': parse_acd(ACD_TEMPLATE.format(
+                'infoseq', 'Display basic information about sequences'),
+                engine='fast')}
+        self.index = build_sqlite(self.acds, self.db_path)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_tables(self):
+        self.assertEqual(self.index.execute(
+            'SELECT application, sections, parameters FROM applications '
+            'ORDER BY application'), [('infoseq', 2, 2), ('seqret', 2, 2)])
+        self.assertEqual([handle.name for handle in
+                          self.index.applications_in_group('Edit')],
+                         ['infoseq', 'seqret'])
+        self.assertEqual(self.index.applications_with_keyword(
+            'seqret keyword'), [self.index.application('seqret')])
+        self.assertEqual(len(self.index.applications_with_relation(
+            'EDAM_topic:0091 Data handling')), 2)
+        self.assertEqual(len(self.index.applications_with_relation(
+            'EDAM_topic:0091')), 2)
+
+    def test_renamed_file(self):
+        # the catalogue names ACDs after their file, not their application
+        self.acds['seqret2'] = self.acds.pop('seqret')
+        db_path = os.path.join(self.tmp_dir, 'renamed.db')
+        index = build_sqlite(self.acds, db_path)
+        try:
+            self.assertEqual(index.execute(
+                'SELECT application, sections, parameters FROM '
+                'applications ORDER BY application'),
+                [('infoseq', 2, 2), ('seqret2', 2, 2)])
+            self.assertEqual(index.execute(
+                'SELECT DISTINCT application FROM parameters ORDER BY '
+                'application'), [('infoseq',), ('seqret2',)])
+            handle, = index.parameters_with_attribute('knowntype',
+                                                      'seqret output')
+            self.assertEqual(handle.application.name, 'seqret2')
+            self.assertTrue(handle.parameter is
+                            self.acds['seqret2'].sections[1].parameters[0])
+        finally:
+            index.close()
+
+    def test_parameters(self):
+        handles = self.index.parameters_with_datatype('seqall')
+        self.assertEqual([(handle.application.name, handle.name) for handle
+                          in handles], [('infoseq', 'sequence'),
+                                        ('seqret', 'sequence')])
+        handle, = self.index.parameters_with_attribute('knowntype',
+                                                       'seqret output')
+        self.assertEqual(handle.name, 'outfile')
+        self.assertTrue(handle.parameter is
+                        self.acds['seqret'].sections[1].parameters[0])
+        self.assertEqual(len(self.index.parameters_with_relation(
+            'EDAM_data:0849 Sequence record')), 2)
+        self.assertEqual(len(self.index.parameters_with_relation(
+            'EDAM_data:0849')), 2)
+
+    def test_search(self):
+        self.assertEqual([handle.name for handle in
+                          self.index.search('information')], ['infoseq'])
+        self.assertEqual([handle.name for handle in
+                          self.index.search('report')],
+                         ['infoseq', 'seqret'])
+
+    def test_lazy_loading(self):
+        index = CatalogueIndex(self.db_path)
+        try:
+            handle = index.application('seqret')
+            self.assertTrue(handle._acd is None)
+            self.assertEqual(handle.acd.application.name, 'seqret')
+            parameter, = [handle for handle in
+                          index.parameters_with_datatype('outfile')
+                          if handle.application.name == 'infoseq']
+            self.assertEqual(parameter.parameter.datatype, 'outfile')
+        finally:
+            index.close()
@@ -6,30 +6,18 @@ from nose_parameterized import parameterized
 from ruamel.yaml import load
 import six
 
-from pyacd.qaparser import parse_qa
+from pyacd.qaparser import parse_qa, iter_qa_records
 from pyacd.parser import parse_acd
 
 QATEST_PATH = '/usr/share/EMBOSS/test/qatest.dat'
 ACDTEST_DIR = '/usr/share/EMBOSS/acd'
 
 def get_tests():
-    qa_string = ''
-    qa_name = ''
-    app_name = ''
     tests = []
     with open(QATEST_PATH, 'r') as qa_lines:
-        for qa_line in qa_lines:
-            if qa_line.startswith('ID '):
-                qa_name = qa_line[3:-1]
-            if qa_line.startswith('AP '):
-                app_name = qa_line[3:-1]
-            qa_string += qa_line
-            if qa_line.startswith('//'):
-                acd_path = ACDTEST_DIR + '/' + app_name + '.acd'
-                tests.append([acd_path, qa_string, qa_name, app_name])
-                qa_string = ''
-                qa_name = ''
-                app_name = ''
+        for qa_name, app_name, qa_string in iter_qa_records(qa_lines):
+            acd_path = ACDTEST_DIR + '/' + (app_name or '') + '.acd'
+            tests.append([acd_path, qa_string, qa_name, app_name])
     return  tests
 
 
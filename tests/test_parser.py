@@ -1,6 +1,7 @@
 import unittest
 
 import six
+from pyparsing import ParseException
 
 from pyacd.parser import parse_attribute, parse_attributes, parse_parameter, \
     parse_parameters, parse_section, parse_sections, parse_application, parse_acd
@@ -77,6 +78,51 @@ class TestParser(unittest.TestCase):
             ]""")
         self.assertRaises(acd.InvalidAcdPropertyValue, bad_value_parse)
 
+    def test_parameter_values_not_shared(self):
+        parameters_list = parse_parameters("""
+        seqout: outseq [
+            osformat: "fasta"
+            information: "parameter information"
+        ]
+
+        seqout: outseq2 [
+        ]
+        """)
+        first, second = parameters_list
+        self.assertEqual(first.qualifiers['osformat']['default_value'],
+                         'fasta')
+        self.assertEqual(second.qualifiers['osformat']['default_value'], '')
+        self.assertEqual(second.attributes['information']['default_value'],
+                         '')
+        self.assertTrue(first.attributes.is_set('information'))
+        self.assertFalse(second.attributes.is_set('information'))
+        self.assertEqual(sorted(first.attributes.keys()),
+                         sorted(acd.SeqoutParameter.attributes_schema.keys()))
+
+    def test_compact_objects(self):
+        acd_object = parse_acd(ACD_STRING)
+        section = acd_object.sections[2]
+        for element in [acd_object, acd_object.application, section,
+                        section.parameters[0], section.variables[0],
+                        section.properties[0]]:
+            self.assertFalse(hasattr(element, '__dict__'))
+
+    def test_parse_application_relations(self):
+        application = parse_application("""
+        application: seqret [
+            relations: "EDAM_topic:0090 Data search and retrieval"
+            relations: "EDAM_operation:1813 Sequence retrieval"
+        ]""")
+        relations = application.attributes['relations']['default_value']
+        self.assertEqual(relations,
+                         [('EDAM_topic', '0090', 'Data search and retrieval'),
+                          ('EDAM_operation', '1813', 'Sequence retrieval')])
+        self.assertEqual(relations[1].term, 'EDAM_operation:1813')
+        self.assertEqual(str(relations[1]),
+                         'EDAM_operation:1813 Sequence retrieval')
+        self.assertEqual(acd.Application.attributes_schema['relations']
+                         ['default_value'], [])
+
     def test_parse_parameters(self):
         parameters_list = parse_parameters("""
         string: myparameter [
@@ -146,3 +192,114 @@ variable: isdual "@($(display) == D)"
 endsection: output
 ''')
         six.print_(section)
+
+ACD_STRING = '''
+# ACD comments are ignored
+application: density [
+  documentation: "Draw a nucleic acid density plot"
+  groups: "Nucleic:Composition"
+  relations: "EDAM_topic:0157 Sequence composition analysis"
+  relations: "EDAM_operation:0236 Sequence composition calculation"
+]
+
+section: input [
+  information: "Input section"
+  type: "page"
+]
+
+  seqall: seqall [
+    parameter: "Y"
+    type: "dna"
+    relations: "EDAM_data:2887 Sequence record (nucleic acid)"
+  ]
+
+endsection: input
+
+section: additional [
+  information: "Additional section"
+  type: "page"
+]
+
+  integer: window [
+    additional: "Y"
+    default: "100"
+    minimum: "1"
+    information: "Window length"
+    help: "Length of the window # used
+           to compute the density"
+    relations: "EDAM_data:1251 Window size"
+  ]
+
+  section: plot [
+    information: "Plot section"
+  ]
+
+    list: display [
+      additional: "Y"
+      default: "none"
+      values: "none:No graph; D:Dual; Q:Quad"
+      delimiter: ";"
+      information: "Display type"
+    ]
+
+  endsection: plot
+
+endsection: additional
+
+section: output [
+  information: "Output section"
+  type: "page"
+]
+
+variable: isdual "@($(display) == D)"
+
+  xygraph: graph [
+    standard: "@($(display) != none)"
+    multiple: "@( $(isdual) ? 2 : 4)"
+    nullok: "Y"
+    nulldefault: "@($(display) == none)"
+    sequence: "Y"
+  ]
+
+  report: outfile [
+    standard: "@($(display) == none)"
+    taglist: "float:a float:c float:g float:t float:at float:gc"
+    rformat: "table" # trailing comment
+  ]
+
+endsection: output
+'''
+
+def _describe_section(section):
+    return (section.name,
+            [(p.name, p.value) for p in section.properties],
+            [_describe_section(s) for s in section.subsections],
+            [(p.__class__, p.name, p.attributes, p.qualifiers)
+             for p in section.parameters],
+            [(v.name, v.expression) for v in section.variables])
+
+def _describe_acd(acd_object):
+    return (acd_object.application.name, acd_object.application.attributes,
+            [_describe_section(s) for s in acd_object.sections])
+
+class TestFastParser(unittest.TestCase):
+
+    def test_same_objects_as_pyparsing(self):
+        reference = parse_acd(ACD_STRING)
+        fast = parse_acd(ACD_STRING, engine='fast')
+        self.assertEqual(_describe_acd(reference), _describe_acd(fast))
+        self.assertEqual(len(fast.desc_parameters()), 5)
+        self.assertEqual(fast.sections[1].subsections[0].name, 'plot')
+        self.assertEqual(fast.sections[2].variables[0].expression,
+                         '@($(display) == D)')
+        self.assertEqual(
+            fast.parameter_by_name('window').attributes['help']
+            ['default_value'],
+            'Length of the window # used\n           to compute the density')
+
+    def test_unknown_datatype(self):
+        bad_acd = ACD_STRING.replace('integer: window', 'integr: window')
+        self.assertRaises(ParseException, parse_acd, bad_acd, engine='fast')
+
+    def test_unknown_engine(self):
+        self.assertRaises(ValueError, parse_acd, ACD_STRING, engine='foo')
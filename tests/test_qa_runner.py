@@ -0,0 +1,219 @@
+import io
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+
+from pyacd import qa_runner
+from pyacd.qa_runner import validate_qa_file, validate_qa_records, run, \
+    schedule, load_durations, save_durations
+from pyacd.qaparser import iter_qa, parse_qa
+
+ACD_TEMPLATE = '''
+application: {0} [
+  documentation: "Test application {0}"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  seqall: asequence [
+    parameter: "Y"
+  ]
+
+endsection: input
+'''
+
+QA_DATABASE = '''ID app1-ok
+AP app1
+CL tsw:opsd_human -sbegin 10
+//
+ID app1-unknown
+AP app1
+CL tsw:opsd_human -zzz
+//
+ID app1-ambiguous
+AP app1
+CL tsw:opsd_human -s 10
+//
+ID app2-ok
+AP app2
+IN tsw:opsd_human
+//
+ID app3-noacd
+AP app3
+CL tsw:opsd_human
+//
+ID broken-acd
+AP broken
+CL tsw:opsd_human
+//
+'''
+
+class TestValidateQa(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        for name in ['app1', 'app2']:
+            with open(os.path.join(self.tmp_dir, name + '.acd'), 'w') as fh:
+                fh.write(ACD_TEMPLATE.format(name))
+        with open(os.path.join(self.tmp_dir, 'broken.acd'), 'w') as fh:
+            fh.write(ACD_TEMPLATE.format('broken').replace('seqall',
+                                                           'unknown'))
+        self.qa_path = os.path.join(self.tmp_dir, 'qatest.dat')
+        with open(self.qa_path, 'w') as fh:
+            fh.write(QA_DATABASE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def check_results(self, results):
+        statuses = {result.test_id: result.status for result in results}
+        self.assertEqual(statuses, {
+            'app1-ok': qa_runner.OK,
+            'app1-unknown': qa_runner.UNKNOWN_OPTION,
+            'app1-ambiguous': qa_runner.AMBIGUOUS_OPTION,
+            'app2-ok': qa_runner.OK,
+            'app3-noacd': qa_runner.NO_ACD,
+            'broken-acd': qa_runner.ACD_ERROR})
+
+    def test_validate_serial(self):
+        self.check_results(list(validate_qa_file(self.qa_path, self.tmp_dir,
+                                                 workers=1)))
+
+    def test_validate_parallel(self):
+        self.check_results(list(validate_qa_file(self.qa_path, self.tmp_dir,
+                                                 workers=2)))
+
+    def test_results(self):
+        records = [('app1-unknown', 'app1',
+                    'ID app1-unknown\nAP app1\nCL -zzz\n')]
+        result, = validate_qa_records(records, self.tmp_dir, workers=1)
+        self.assertEqual(result.application, 'app1')
+        self.assertTrue('zzz' in result.message)
+        self.assertTrue(result.seconds >= 0)
+
+STUBS = {
+    'seqret': '#!/bin/sh\n'
+              'read name\n'
+              'echo ">$name" > out.fasta\n'
+              'echo "$@"\n'
+              'echo "Read and write sequences" >&2\n',
+    'slow': '#!/bin/sh\nsleep 10\n',
+    'wrapper': '#!/bin/sh\nsleep 10 &\necho $! > "$0.pid"\nwait\n',
+    'fails': '#!/bin/sh\nexit 1\n',
+}
+
+QA_TESTS = ['''ID seqret-ok
+AP seqret
+CL -osformat "fasta format" stdout
+IN opsd_human
+FI stdout
+FP 1 /^-osformat fasta format stdout$/
+FI stderr
+FC = 1
+FI out.fasta
+FP /^>opsd_human$/
+FZ = 12
+''', '''ID seqret-fail
+AP seqret
+IN opsd_human
+FI out.fasta
+FP /^>opsd_mouse$/
+''', '''ID slow-timeout
+AP slow
+TI 1
+''', '''ID fails-expected
+AP fails
+ER 1
+''', '''ID fails-unexpected
+AP fails
+''', '''ID noexec
+AP noexec
+''']
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.bin_dir = tempfile.mkdtemp()
+        for name, script in STUBS.items():
+            path = os.path.join(self.bin_dir, name)
+            with open(path, 'w') as fh:
+                fh.write(script)
+            os.chmod(path, stat.S_IRWXU)
+        self.qa_tests = [parse_qa(qa_text, engine='fast') for qa_text in
+                         QA_TESTS]
+
+    def tearDown(self):
+        shutil.rmtree(self.bin_dir)
+
+    def check_results(self, results):
+        statuses = {result.test_id: result.status for result in results}
+        self.assertEqual(statuses, {
+            'seqret-ok': qa_runner.PASSED,
+            'seqret-fail': qa_runner.FAILED,
+            'slow-timeout': qa_runner.TIMED_OUT,
+            'fails-expected': qa_runner.PASSED,
+            'fails-unexpected': qa_runner.FAILED,
+            'noexec': qa_runner.NO_EXECUTABLE})
+
+    def test_run_serial(self):
+        start = time.time()
+        results = list(run(self.qa_tests, workers=1, bin_dir=self.bin_dir))
+        self.assertTrue(time.time() - start < 5)
+        self.check_results(results)
+        failed, = [result for result in results
+                   if result.test_id == 'seqret-fail']
+        self.assertEqual(failed.errors,
+                         ['out.fasta: pattern /^>opsd_mouse$/ not found'])
+
+    def test_run_parallel(self):
+        self.check_results(run(self.qa_tests, workers=2,
+                               bin_dir=self.bin_dir))
+
+    def test_run_default_engine(self):
+        # the TI and ER lines apply to the tests parsed with pyparsing
+        qa_tests = list(iter_qa(io.StringIO('//\n'.join(QA_TESTS))))
+        start = time.time()
+        results = list(run(qa_tests, workers=1, bin_dir=self.bin_dir))
+        self.assertTrue(time.time() - start < 5)
+        self.check_results(results)
+        timed_out, = [result for result in results
+                      if result.test_id == 'slow-timeout']
+        self.assertEqual(timed_out.errors, ['killed after 1 s'])
+
+    @unittest.skipIf(os.name != 'posix', 'process groups are POSIX')
+    def test_timeout_kills_children(self):
+        qa_test = parse_qa('ID wrapper-timeout\nAP wrapper\nTI 1\n',
+                           engine='fast')
+        start = time.time()
+        result = qa_runner.run_qa_test(qa_test, self.bin_dir)
+        self.assertEqual(result.status, qa_runner.TIMED_OUT)
+        self.assertTrue(time.time() - start < 5)
+        with open(os.path.join(self.bin_dir, 'wrapper.pid')) as pid_fh:
+            pid = int(pid_fh.read())
+        for _ in range(50):
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                break
+            time.sleep(0.1)
+        else:
+            self.fail('the child of the test is still running')
+
+    def test_schedule(self):
+        durations = {'fails-expected': 10.0, 'seqret-ok': 2.0}
+        self.assertEqual([qa_test.id for qa_test in
+                          schedule(self.qa_tests, durations)][:3],
+                         ['fails-expected', 'seqret-fail', 'slow-timeout'])
+
+    def test_durations(self):
+        path = os.path.join(self.bin_dir, 'durations.json')
+        self.assertEqual(load_durations(path), {})
+        results = run(self.qa_tests[3:], workers=1, bin_dir=self.bin_dir)
+        save_durations(path, results, {'seqret-ok': 2.0})
+        self.assertEqual(sorted(load_durations(path).keys()),
+                         ['fails-expected', 'fails-unexpected', 'seqret-ok'])
@@ -0,0 +1,108 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyacd import qacheck
+from pyacd.qa import FileGroup, FilePattern
+from pyacd.qacheck import check_file, check_file_groups, compile_pattern
+
+FASTA = b'''>OPSD_HUMAN P08100 Rhodopsin
+MNGTEGPNFYVPFSNATGVVRSPFEYPQYYLAEPWQFSMLAAYMFLLIVLGFPINFLTLY
+VTVQHKKLRTPLNYILLNLAVADLFMVLGGFTSTLYTSLHGYFVFGPTGCNLEGFFATLG
+>OPSD_MOUSE
+MNGTEGPNFYVPFSNVTGVVRSPFEQPQYYLAEPWQFSMLAAYMFLLIVLGFPINFLTLY
+'''
+
+class TestCheckFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'opsd.fasta')
+        with open(self.path, 'wb') as fh:
+            fh.write(FASTA)
+        with open(os.path.join(self.tmp_dir, 'stderr'), 'wb') as fh:
+            fh.write(b'Read and write sequences\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_compile_pattern(self):
+        regex, multiline = compile_pattern('/^>OPSD/')
+        self.assertTrue(regex.search(b'>OPSD_HUMAN'))
+        self.assertFalse(multiline)
+        self.assertFalse(compile_pattern('/^Created abiview\\.ps\\n/')[1])
+        self.assertTrue(compile_pattern('/LY\\nVTV/')[1])
+        self.assertTrue(compile_pattern('/^>opsd/i')[0].search(b'>OPSD'))
+        self.assertFalse(compile_pattern('/Rhodopsin\\s+MNG/')[1])
+        self.assertFalse(compile_pattern('/[^\\n]+\\n/')[1])
+        self.assertFalse(compile_pattern('/a\\\\nb/')[1])
+        self.assertTrue(compile_pattern('/(TLY|TLY\\n)VTV/')[1])
+        self.assertTrue(compile_pattern('/TLY.VTV/s')[1])
+
+    def test_passing_checks(self):
+        file_group = FileGroup('opsd.fasta',
+                               line_count_test={'operator': '=', 'value': 5},
+                               size_test={'operator': '=',
+                                          'value': len(FASTA)},
+                               patterns=[FilePattern('/^>OPSD_HUMAN/'),
+                                         FilePattern('/^>/', 2),
+                                         FilePattern('/MNGTEG/', 2),
+                                         FilePattern('/Error: /', 0),
+                                         FilePattern('/TLY\\nVTV/', 1),
+                                         FilePattern('/TLY\\n/'),
+                                         FilePattern('/L/', 3)])
+        self.assertEqual(check_file(file_group, self.path), [])
+
+    def test_failing_checks(self):
+        file_group = FileGroup('opsd.fasta',
+                               line_count_test={'operator': '<', 'value': 5},
+                               size_test={'operator': '>', 'value': 1000},
+                               patterns=[FilePattern('/^>OPSD_RAT/'),
+                                         FilePattern('/^>/', 1),
+                                         FilePattern('/TLY\\nMNG/', 1)])
+        errors = check_file(file_group, self.path)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(errors[0],
+                         'opsd.fasta: size is {0}, expected > 1000'.format(
+                             len(FASTA)))
+        self.assertTrue('line count is 5' in errors[1])
+        self.assertTrue('/^>OPSD_RAT/ not found' in errors[2])
+        self.assertTrue('found 2 times instead of 1' in errors[3])
+
+    def test_line_count_only(self):
+        file_group = FileGroup('stderr',
+                               line_count_test={'operator': '=', 'value': 1})
+        self.assertEqual(check_file_groups([file_group], self.tmp_dir), [])
+
+    def test_missing_file(self):
+        self.assertEqual(check_file_groups([FileGroup('stdout')],
+                                           self.tmp_dir),
+                         ['file stdout not found'])
+
+    def test_patterns_match_single_lines(self):
+        file_group = FileGroup('opsd.fasta',
+                               patterns=[FilePattern('/Rhodopsin\\s+MNG/', 0),
+                                         FilePattern('/Rhodopsin\\s*$/', 1),
+                                         FilePattern('/LY[^V]+VTV/', 0),
+                                         FilePattern('/TLY\\W/', 2),
+                                         FilePattern('/^>OPSD_MOUSE\\n\\Z/')])
+        self.assertEqual(check_file(file_group, self.path), [])
+        file_group = FileGroup('opsd.fasta',
+                               patterns=[FilePattern('/Rhodopsin\\s+MNG/')])
+        self.assertEqual(check_file(file_group, self.path),
+                         ['opsd.fasta: pattern /Rhodopsin\\s+MNG/ not found'])
+
+    def test_long_lines(self):
+        block_size, max_line_size = qacheck._BLOCK_SIZE, \
+            qacheck._MAX_LINE_SIZE
+        qacheck._BLOCK_SIZE, qacheck._MAX_LINE_SIZE = 4, 8
+        try:
+            blocks = list(qacheck._iter_blocks(io.BytesIO(
+                b'ab\n' + b'x' * 30 + b'\ncd\n')))
+        finally:
+            qacheck._BLOCK_SIZE, qacheck._MAX_LINE_SIZE = block_size, \
+                max_line_size
+        self.assertEqual(b''.join(blocks), b'ab\n' + b'x' * 30 + b'\ncd\n')
+        self.assertTrue(all(len(block) < 16 for block in blocks))
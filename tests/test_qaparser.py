@@ -1,8 +1,10 @@
+import io
 import unittest
 from pyacd.qaparser import parse_cl_line, parse_cl_lines, parse_app_ref, \
     parse_file_group, parse_qa, parse_file_pattern, parse_in_line, \
     parse_in_lines, parse_ti_line, parse_uc_line, parse_rq_line, \
-    parse_cc_line, parse_cc_lines
+    parse_cc_line, parse_cc_lines, iter_qa, iter_qa_records
+from pyparsing import ParseException
 from pyacd.parser import parse_acd
 
 
@@ -272,4 +274,193 @@ class TestParser(unittest.TestCase):
         FI stdout
         FP /BX649216/
         FP /Aspergillus fumigatus BAC pilot project supercontig/
-        ''')
\ No newline at end of file
+        ''')
+
+QA_DATABASE = u"""ID seqret-ex
+AP seqret
+CL tsw:opsd_human stdout -auto
+FI stdout
+FP /^>OPSD_HUMAN/
+//
+# comment line
+ID needle-ex
+AP needle
+CL tsw:hba_human tsw:hbb_human -auto
+FI hba_human.needle
+//
+ID seqret-fasta
+AP seqret
+CL -osformat fasta tsw:opsd_human stdout -auto
+FI stdout
+"""
+
+class TestIterQa(unittest.TestCase):
+
+    def test_iter_qa_records(self):
+        records = list(iter_qa_records(io.StringIO(QA_DATABASE)))
+        self.assertEqual([(test_id, app_name) for test_id, app_name, _ in
+                          records], [('seqret-ex', 'seqret'),
+                                     ('needle-ex', 'needle'),
+                                     ('seqret-fasta', 'seqret')])
+        self.assertFalse('//' in records[0][2])
+
+    def test_blank_records(self):
+        database = QA_DATABASE.replace('//\n', '//\n\n  \n//\n//\n')
+        records = list(iter_qa_records(io.StringIO(database)))
+        self.assertEqual([test_id for test_id, _, _ in records],
+                         ['seqret-ex', 'needle-ex', 'seqret-fasta'])
+        self.assertEqual(len(list(iter_qa(io.StringIO(database)))), 3)
+
+    def test_iter_qa(self):
+        tests = list(iter_qa(io.StringIO(QA_DATABASE)))
+        self.assertEqual([test.id for test in tests],
+                         ['seqret-ex', 'needle-ex', 'seqret-fasta'])
+        self.assertEqual(tests[1].application_ref.name, 'needle')
+
+    def test_iter_qa_filters(self):
+        tests = iter_qa(io.StringIO(QA_DATABASE), applications=['seqret'])
+        self.assertEqual([test.id for test in tests],
+                         ['seqret-ex', 'seqret-fasta'])
+        tests = iter_qa(io.StringIO(QA_DATABASE), test_ids=['needle-ex'])
+        self.assertEqual([test.id for test in tests], ['needle-ex'])
+
+class TestFastQaParser(unittest.TestCase):
+
+    def assertSameQa(self, first, second):
+        self.assertEqual((first.id, first.uc, first.time_limit,
+                          first.error_code),
+                         (second.id, second.uc, second.time_limit,
+                          second.error_code))
+        self.assertEqual(
+            (first.application_ref.name,
+             getattr(first.application_ref, 'embassy_package', None)),
+            (second.application_ref.name,
+             getattr(second.application_ref, 'embassy_package', None)))
+        self.assertEqual([line.command_line for line in first.command_lines],
+                         [line.command_line for line in
+                          second.command_lines])
+        self.assertEqual([line.input_line for line in first.input_lines],
+                         [line.input_line for line in second.input_lines])
+        self.assertEqual(len(first.file_groups), len(second.file_groups))
+        for group, other_group in zip(first.file_groups,
+                                      second.file_groups):
+            self.assertEqual((group.file, group.line_count_test,
+                              group.size_test),
+                             (other_group.file, other_group.line_count_test,
+                              other_group.size_test))
+            self.assertEqual([(pattern.pattern, getattr(pattern, 'count',
+                                                        None))
+                              for pattern in group.patterns],
+                             [(pattern.pattern, getattr(pattern, 'count',
+                                                        None))
+                              for pattern in other_group.patterns])
+
+    def test_engines(self):
+        qa_text = '''ID cai-ex
+        TI 120
+        UC first line
+        UC second line
+        RQ soapws
+        CC comment
+        AP cai
+        AB myemboss
+        CL AB009602
+        CL -outfile ab009602.cai
+        ER 2
+        IN
+        IN  indented
+        # comment line
+        FI stderr
+        FC = 2
+        FP 0 /Warning: /
+        FP 0 /Error: /
+        FI ab009602.cai
+        FZ > 10
+        FP /0\\.188/
+        FC < 5
+        //
+        '''
+        res = parse_qa(qa_text)
+        self.assertSameQa(res, parse_qa(qa_text, engine='fast'))
+        self.assertEqual(res.id, 'cai-ex')
+        self.assertEqual(res.uc, 'first line\nsecond line')
+        self.assertEqual((res.time_limit, res.error_code), (120, 2))
+        self.assertEqual(res.application_ref.embassy_package, 'myemboss')
+        self.assertEqual([line.input_line for line in res.input_lines],
+                         ['', ' indented'])
+        stderr, cai = res.file_groups
+        self.assertEqual([(pattern.pattern, pattern.count)
+                          for pattern in stderr.patterns],
+                         [('/Warning: /', 0), ('/Error: /', 0)])
+        self.assertEqual(cai.size_test, {'operator': '>', 'value': 10})
+        self.assertEqual(cai.line_count_test, {'operator': '<', 'value': 5})
+        self.assertEqual(cai.patterns[0].pattern, '/0\\.188/')
+
+    def test_parse_file_groups(self):
+        res = parse_qa('''
+        ID abiview-ex
+        AP abiview
+        CL -graph cps
+        IN ../../data/abiview.abi
+        IN
+        FI stderr
+        FC = 2
+        FP 0 /Warning: /
+        FI abiview.fasta
+        FP /^>abiview\\n/
+        FZ = 861
+        FI stdout
+        FP /Aspergillus fumigatus BAC pilot/
+        //
+        ''', engine='fast')
+        self.assertEqual([line.input_line for line in res.input_lines],
+                         ['../../data/abiview.abi', ''])
+        self.assertEqual([group.file for group in res.file_groups],
+                         ['stderr', 'abiview.fasta', 'stdout'])
+        stderr, fasta, stdout = res.file_groups
+        self.assertEqual(stderr.line_count_test,
+                         {'operator': '=', 'value': 2})
+        self.assertEqual(stderr.patterns[0].pattern, '/Warning: /')
+        self.assertEqual(stderr.patterns[0].count, 0)
+        self.assertEqual(fasta.size_test, {'operator': '=', 'value': 861})
+        self.assertFalse(hasattr(fasta.patterns[0], 'count'))
+        self.assertEqual(stdout.patterns[0].pattern,
+                         '/Aspergillus fumigatus BAC pilot/')
+
+    def test_parse_ti_er_uc(self):
+        res = parse_qa('''ID wsdbfetch-noentry
+        RQ soapws
+        TI 120
+        UC first line
+        UC second line
+        CC requires (axis2C) SOAP webservices library enabled
+        AP seqret
+        AB myemboss
+        CL fasta::twsdbfetch:uniprotkb:abcdefg stdout -auto
+        ER 1
+        FI stderr
+        FC > 1
+        FP 1 /Unable to read sequence/
+        ''', engine='fast')
+        self.assertEqual(res.time_limit, 120)
+        self.assertEqual(res.error_code, 1)
+        self.assertEqual(res.uc, 'first line\nsecond line')
+        self.assertEqual(res.application_ref.embassy_package, 'myemboss')
+        self.assertEqual(res.file_groups[0].line_count_test,
+                         {'operator': '>', 'value': 1})
+
+    def test_parse_errors(self):
+        for engine in ['pyparsing', 'fast']:
+            for qa_text in ['AP seqret\nCL -auto', 'ID test-1\nCL -auto',
+                            'ID test-1\nAP seqret\nFC = 2',
+                            'ID test-1\nAP seqret\nTI soon']:
+                with self.assertRaises(ParseException):
+                    parse_qa(qa_text, engine=engine)
+        with self.assertRaises(ValueError):
+            parse_qa('ID test-1\nAP seqret', engine='unknown')
+
+    def test_iter_qa(self):
+        tests = list(iter_qa(io.StringIO(QA_DATABASE), engine='fast'))
+        self.assertEqual([test.id for test in tests],
+                         ['seqret-ex', 'needle-ex', 'seqret-fasta'])
+        self.assertEqual(tests[1].file_groups[0].file, 'hba_human.needle')
@@ -0,0 +1,117 @@
+import unittest
+
+from pyacd.acd import Relation
+from pyacd.parser import parse_acd
+from pyacd.corpus import CatalogueChanges
+from pyacd.relations import RelationIndex, RelationEntry
+
+ACD_TEMPLATE = '''
+application: {0} [
+  documentation: "Test application {0}"
+  relations: "EDAM_topic:0091 Data handling"
+  relations: "EDAM_operation:{1}"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  seqall: sequence [
+    parameter: "Y"
+    relations: "EDAM_data:0849 Sequence record"
+    relations: "EDAM_format:1929 FASTA"
+  ]
+
+endsection: input
+
+section: output [
+  information: "Output section"
+]
+
+  seqoutall: outseq [
+    parameter: "Y"
+    relations: "EDAM_data:0849 Sequence record"
+  ]
+
+endsection: output
+'''
+
+class FakeCatalogue(object):
+
+    def __init__(self, acds):
+        self.acds = acds
+
+
+class TestRelations(unittest.TestCase):
+
+    def setUp(self):
+        self.acds = {
+            'seqret': parse_acd(ACD_TEMPLATE.format(
+                'seqret', '1813 Sequence retrieval'), engine='fast'),
+            'infoseq': parse_acd(ACD_TEMPLATE.format(
+                'infoseq', '0236 Sequence composition calculation'),
+                engine='fast')}
+        self.index = RelationIndex(self.acds)
+
+    def test_parse_relation(self):
+        relation = Relation.parse('EDAM_operation:1813 Sequence retrieval')
+        self.assertEqual(relation, ('EDAM_operation', '1813',
+                                    'Sequence retrieval'))
+        self.assertEqual(relation.term, 'EDAM_operation:1813')
+        self.assertEqual(Relation.parse('no term'), (None, None, 'no term'))
+        parameter = self.acds['seqret'].sections[0].parameters[0]
+        self.assertEqual(parameter.attributes.get_value('relations'),
+                         [('EDAM_data', '0849', 'Sequence record'),
+                          ('EDAM_format', '1929', 'FASTA')])
+
+    def test_lookup(self):
+        self.assertEqual(self.index.applications('EDAM_topic:0091'),
+                         ['infoseq', 'seqret'])
+        self.assertEqual(self.index.applications('EDAM_operation:1813'),
+                         ['seqret'])
+        self.assertEqual(self.index.lookup('EDAM_data:9999'), [])
+        self.assertEqual(self.index.labels['EDAM_format:1929'], 'FASTA')
+        self.assertEqual(self.index.terms('EDAM_operation'),
+                         ['EDAM_operation:0236', 'EDAM_operation:1813'])
+
+    def test_consumers_producers(self):
+        consumers = self.index.consumers(
+            Relation('EDAM_data', '0849', 'Sequence record'))
+        self.assertEqual(sorted((entry.application, entry.parameter)
+                                for entry in consumers),
+                         [('infoseq', 'sequence'), ('seqret', 'sequence')])
+        producers = self.index.producers('EDAM_data:0849')
+        self.assertEqual(sorted((entry.application, entry.parameter)
+                                for entry in producers),
+                         [('infoseq', 'outseq'), ('seqret', 'outseq')])
+        self.assertEqual(self.index.producers('EDAM_format:1929'), [])
+
+    def test_update(self):
+        self.acds['seqret'] = parse_acd(ACD_TEMPLATE.format(
+            'seqret', '2121 Sequence file editing'), engine='fast')
+        del self.acds['infoseq']
+        self.index.update(FakeCatalogue(self.acds), CatalogueChanges(
+            changed=['seqret'], removed=['infoseq']))
+        self.assertEqual(self.index.applications('EDAM_operation:1813'), [])
+        self.assertEqual(self.index.applications('EDAM_operation:2121'),
+                         ['seqret'])
+        self.assertEqual(self.index.applications('EDAM_topic:0091'),
+                         ['seqret'])
+        self.assertFalse('EDAM_operation:0236' in self.index.labels)
+
+    def test_update_renamed_file(self):
+        # the catalogue names ACDs after their file, not their application
+        self.acds['seqret2'] = self.acds.pop('seqret')
+        index = RelationIndex(self.acds)
+        del self.acds['seqret2']
+        index.update(FakeCatalogue(self.acds), CatalogueChanges(
+            removed=['seqret2']))
+        self.assertEqual(index.applications('EDAM_operation:1813'), [])
+        self.assertEqual(index.applications('EDAM_topic:0091'),
+                         ['infoseq'])
+        self.index.remove('seqret')
+        self.index.add(parse_acd(ACD_TEMPLATE.format(
+            'seqret', '2121 Sequence file editing'), engine='fast'),
+            'seqret2')
+        self.index.remove('seqret2')
+        self.assertEqual(self.index.applications('EDAM_operation:2121'), [])
@@ -0,0 +1,142 @@
+import unittest
+
+from pyacd.acd import Acd, Relation, UnknownAcdPropertyException
+from pyacd.cli import parse_command_line
+from pyacd.parser import parse_acd
+from pyacd.serialization import acd_from_dict, dumps, loads
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ACD_STRING = '''
+application: needle [
+  documentation: "Needleman-Wunsch global alignment of two sequences"
+  groups: "Alignment:Global"
+  relations: "EDAM_topic:0182 Sequence alignment"
+  relations: "EDAM_operation:0496 Global alignment"
+]
+
+section: input [
+  information: "Input section"
+  type: "page"
+]
+
+  sequence: asequence [
+    parameter: "Y"
+    type: "any"
+    relations: "EDAM_data:0849 Sequence record"
+  ]
+
+  seqall: bsequence [
+    parameter: "Y"
+    type: "@($(asequence.protein) ? stopprotein : nucleotide)"
+  ]
+
+endsection: input
+
+section: additional [
+  information: "Additional section"
+  type: "page"
+]
+
+  variable: gapdefault "$(acdprotein) ? 10.0 : 10.0"
+
+  float: gapopen [
+    standard: "Y"
+    minimum: "0.0"
+    maximum: "100.0"
+    default: "$(gapdefault)"
+  ]
+
+  section: extension [
+    information: "Extension section"
+  ]
+
+    boolean: endweight [
+      additional: "Y"
+      default: "N"
+    ]
+
+  endsection: extension
+
+endsection: additional
+'''
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.acd_def = parse_acd(ACD_STRING, engine='fast')
+
+    def assertRoundTrip(self, compact):
+        data = self.acd_def.to_dict(compact=compact)
+        acd_def = Acd.from_dict(data)
+        self.assertEqual(acd_def.to_dict(compact=compact), data)
+        return acd_def
+
+    def test_compact(self):
+        data = self.acd_def.to_dict(compact=True)
+        self.assertEqual(data['attributes']['relations'],
+                         ['EDAM_topic:0182 Sequence alignment',
+                          'EDAM_operation:0496 Global alignment'])
+        parameter = data['sections'][1]['parameters'][0]
+        self.assertEqual(parameter, {'name': 'gapopen', 'datatype': 'float',
+                                     'attributes': {'standard': True,
+                                                    'default': '$(gapdefault)',
+                                                    'minimum': 0.0,
+                                                    'maximum': 100.0},
+                                     'qualifiers': {}})
+        self.assertEqual(data['sections'][1]['variables'],
+                         {'gapdefault': '$(acdprotein) ? 10.0 : 10.0'})
+        self.assertEqual(data['sections'][1]['sections'][0]['name'],
+                         'extension')
+
+    def test_full(self):
+        data = self.acd_def.to_dict()
+        attributes = data['sections'][1]['parameters'][0]['attributes']
+        self.assertEqual(attributes['minimum'], 0.0)
+        self.assertEqual(attributes['additional'], False)
+        self.assertEqual(data['attributes']['version'], '')
+        self.assertNotIn('description', attributes)
+
+    def test_round_trip(self):
+        for compact in [True, False]:
+            acd_def = self.assertRoundTrip(compact)
+            gapopen = acd_def.parameter_by_name('gapopen')
+            self.assertTrue(gapopen.attributes.is_set('minimum'))
+            self.assertFalse(gapopen.attributes.is_set('additional'))
+            self.assertEqual(
+                acd_def.parameter_by_name('asequence').attributes.get_value(
+                    'relations'),
+                [Relation('EDAM_data', '0849', 'Sequence record')])
+            self.assertEqual(acd_def.sections[1].properties[0].value,
+                             'Additional section')
+            self.assertEqual(
+                parse_command_line(acd_def, ['a.fa', 'b.fa', '-gapopen',
+                                             '12', '-noendweight']),
+                parse_command_line(self.acd_def, ['a.fa', 'b.fa', '-gapopen',
+                                                  '12', '-noendweight']))
+
+    def test_unknown_attribute(self):
+        data = self.acd_def.to_dict(compact=True)
+        data['sections'][0]['parameters'][0]['attributes']['foo'] = 'bar'
+        with self.assertRaises(UnknownAcdPropertyException):
+            acd_from_dict(data)
+
+    def test_json(self):
+        data = dumps(self.acd_def, compact=True)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(loads(data).to_dict(compact=True),
+                         self.acd_def.to_dict(compact=True))
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        data = dumps(self.acd_def, format='msgpack')
+        self.assertEqual(loads(data, format='msgpack').to_dict(),
+                         self.acd_def.to_dict())
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            dumps(self.acd_def, format='xml')
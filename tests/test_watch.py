@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pyacd.corpus import Catalogue
+from pyacd.watch import CatalogueWatcher, inotify_available
+
+ACD_TEMPLATE = '''
+application: {0} [
+  documentation: "Test application {0}"
+]
+
+section: input [
+  information: "Input section"
+]
+
+  seqall: sequence [
+    parameter: "Y"
+  ]
+
+endsection: input
+'''
+
+class TestCatalogueWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.acd_dir = tempfile.mkdtemp()
+        self.write('app1')
+        self.catalogue = Catalogue(self.acd_dir, engine='fast', workers=1)
+        self.changes = []
+        self.changed = threading.Event()
+
+    def tearDown(self):
+        shutil.rmtree(self.acd_dir)
+
+    def write(self, name):
+        path = os.path.join(self.acd_dir, name + '.acd')
+        with open(path, 'w') as fh:
+            fh.write(ACD_TEMPLATE.format(name))
+
+    def on_change(self, changes):
+        self.changes.append(changes)
+        self.changed.set()
+
+    def check_watcher(self, use_inotify):
+        with CatalogueWatcher(self.catalogue, callback=self.on_change,
+                              use_inotify=use_inotify, interval=0.05,
+                              delay=0.01):
+            self.assertEqual(list(self.catalogue.acds.keys()), ['app1'])
+            self.assertEqual(self.changes[0].added, ['app1'])
+            self.changed.clear()
+            self.write('app2')
+            self.assertTrue(self.changed.wait(5))
+            self.assertTrue('app2' in self.catalogue.acds)
+            self.changed.clear()
+            os.remove(os.path.join(self.acd_dir, 'app1.acd'))
+            self.assertTrue(self.changed.wait(5))
+            self.assertEqual(list(self.catalogue.acds.keys()), ['app2'])
+        self.assertEqual([changes.removed for changes in self.changes][-1],
+                         ['app1'])
+
+    def test_polling(self):
+        self.check_watcher(False)
+
+    @unittest.skipUnless(inotify_available(), 'inotify is not available')
+    def test_inotify(self):
+        self.check_watcher(True)
+
+    @unittest.skipUnless(inotify_available(), 'inotify is not available')
+    def test_directory_recreated(self):
+        with CatalogueWatcher(self.catalogue, callback=self.on_change,
+                              use_inotify=True, interval=0.05, delay=0.01):
+            self.changed.clear()
+            shutil.rmtree(self.acd_dir)
+            self.assertTrue(self.changed.wait(5))
+            self.assertEqual(list(self.catalogue.acds.keys()), [])
+            self.changed.clear()
+            os.mkdir(self.acd_dir)
+            self.write('app2')
+            self.assertTrue(self.changed.wait(5))
+            self.assertEqual(list(self.catalogue.acds.keys()), ['app2'])
+            # the directory is watched again
+            self.changed.clear()
+            self.write('app3')
+            self.assertTrue(self.changed.wait(5))
+            self.assertTrue('app3' in self.catalogue.acds)
+
+    def test_refresh_error(self):
+        errors = []
+        failed = threading.Event()
+
+        def on_error(exc):
+            errors.append(exc)
+            failed.set()
+
+        def refresh(paths=None):
+            raise IOError('refresh failed')
+        with CatalogueWatcher(self.catalogue, use_inotify=False,
+                              interval=0.05, error_callback=on_error) as \
+                watcher:
+            self.catalogue.refresh = refresh
+            self.assertTrue(failed.wait(5))
+        self.assertIs(watcher.exception, errors[0])
+        self.assertEqual(str(errors[0]), 'refresh failed')